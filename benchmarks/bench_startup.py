@@ -0,0 +1,95 @@
+"""Measure cold-start time of a price-only run against a budget.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget 1.0 --top 10
+
+Each run starts a fresh interpreter, imports main and resolves the price
+collector class through the registry, which is everything a
+`python main.py --sources price` run does before its first exchange request.
+The script also checks that no other source's heavy dependency was imported,
+and exits non-zero when the median start-up time exceeds the budget.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a price-only run must not load
+HEAVY_MODULES = [
+    'praw', 'tweepy', 'newsapi', 'pytrends', 'selenium',
+    'matplotlib', 'seaborn', 'textblob', 'nltk', 'dotenv'
+]
+
+PROBE = f"""
+import sys, json, time
+start = time.perf_counter()
+import main
+from collectors import get_collector_class
+get_collector_class('price')
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def run_probe(extra_args=()):
+    result = subprocess.run(
+        [sys.executable, *extra_args, '-c', PROBE],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(top):
+    """Parse -X importtime output and return the slowest (cumulative us, module) pairs"""
+    _, stderr = run_probe(['-X', 'importtime'])
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument('--budget', type=float, default=1.5, help="Allowed median start-up time in seconds")
+    parser.add_argument('--top', type=int, default=0, help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    timings = []
+    loaded = set()
+    for _ in range(args.runs):
+        probe, _ = run_probe()
+        timings.append(probe['seconds'])
+        loaded.update(probe['loaded'])
+
+    median = statistics.median(timings)
+    print(f"Price-only cold start over {args.runs} runs:")
+    print(f"  median {median:.3f}s  min {min(timings):.3f}s  max {max(timings):.3f}s  budget {args.budget:.3f}s")
+
+    if args.top:
+        print(f"\nSlowest imports (cumulative):")
+        for micros, name in slowest_imports(args.top):
+            print(f"  {micros / 1e6:8.3f}s  {name}")
+
+    failed = False
+    if loaded:
+        print(f"\nFAIL: price-only start imported {', '.join(sorted(loaded))}")
+        failed = True
+    if median > args.budget:
+        print(f"\nFAIL: median start-up {median:.3f}s is over the {args.budget:.3f}s budget")
+        failed = True
+    if not failed:
+        print("\nOK: within budget and no other source's dependencies were imported")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
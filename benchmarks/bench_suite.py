@@ -0,0 +1,353 @@
+"""Reproducible benchmark suite for the analysis, scoring and collector hot paths.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --quick --filter impact
+    python benchmarks/bench_suite.py --compare benchmarks/results/baseline.json
+
+Inputs come from the seeded generators in synthetic.py, and collectors run
+against the in-process fakes in fakes.py, so no network or credentials are
+needed and every run sees the same data. Each case runs in a fresh temporary
+working directory (stores and caches start empty) with rate limiting lifted.
+Results are written as JSON; with --compare, cases whose median time grew by
+more than --threshold are reported and the script exits non-zero.
+"""
+import os
+import sys
+import io
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_DIR, BENCH_DIR]
+
+import fakes
+import synthetic
+
+# Fakes must be in place before any collector module is imported
+fakes.install()
+os.environ.setdefault('NEWSAPI_KEY', 'benchmark')
+os.environ.setdefault('REDDIT_CLIENT_ID', 'benchmark')
+os.environ.setdefault('REDDIT_CLIENT_SECRET', 'benchmark')
+
+import pandas as pd
+
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def benchmark(name, quick=True):
+    """Register a case. The function does its (untimed) setup and returns (run, items)."""
+    def register(func):
+        BENCHMARKS[name] = (func, quick)
+        return func
+    return register
+
+
+@lru_cache(maxsize=None)
+def _candles(years, timeframe, recent=False):
+    start = datetime.now() - timedelta(days=365 * years) if recent else datetime(2025, 1, 1)
+    return synthetic.candles(years, timeframe, seed=1, start=start)
+
+
+def price_frame(years, timeframe):
+    return synthetic.price_frame(_candles(years, timeframe))
+
+
+# Impact analysis
+
+def _impact_case(years, timeframe, events):
+    from impact_engine import event_impact_frame
+    prices = price_frame(years, timeframe)
+    posts = synthetic.truth_posts(events, seed=2, end=datetime(2025, 1, 1) + timedelta(days=365 * years))
+    return lambda: event_impact_frame(posts, 'created_at', prices, {'text': 'text'}), events
+
+
+@benchmark('impact.event_impact_frame.1h_1y')
+def bench_impact_1h_1y():
+    return _impact_case(1, '1h', 2000)
+
+
+@benchmark('impact.event_impact_frame.1h_5y', quick=False)
+def bench_impact_1h_5y():
+    return _impact_case(5, '1h', 10000)
+
+
+@benchmark('impact.event_impact_frame.1m_1y', quick=False)
+def bench_impact_1m_1y():
+    return _impact_case(1, '1m', 2000)
+
+
+@benchmark('impact.event_study.50_horizons')
+def bench_event_study():
+    from impact_engine import event_study
+    prices = price_frame(1, '1h')
+    posts = synthetic.truth_posts(2000, seed=2)
+    return lambda: event_study(posts, 'created_at', prices, offsets=range(-24, 26)), 2000 * 50
+
+
+@benchmark('impact.significance.10k_permutations')
+def bench_significance():
+    from significance import impact_significance
+    prices = price_frame(1, '1h')
+    posts = synthetic.truth_posts(300, seed=3)
+    return lambda: impact_significance(posts, 'created_at', prices, n_permutations=10000, n_bootstrap=10000), 10000
+
+
+@benchmark('impact.analyze_truth_impact.1h_1y')
+def bench_analyze_truth_impact():
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+    except ImportError:
+        raise SkipBenchmark("matplotlib is not installed")
+    import main
+    main.create_directories()
+    prices = price_frame(1, '1h')
+    posts = synthetic.truth_posts(1000, seed=4)
+    return lambda: main.analyze_truth_impact(posts.copy(), prices.copy()), 1000
+
+
+@benchmark('live.replay.1h_1y')
+def bench_live_replay():
+    from live import LiveImpactTracker, replay
+    prices = price_frame(1, '1h')
+    posts = synthetic.truth_posts(2000, seed=5)
+    return lambda: replay(LiveImpactTracker(), prices, posts, 'created_at'), len(prices) + 2000
+
+
+# Categorization and sentiment
+
+@benchmark('categorize.categorize_announcement')
+def bench_categorize_announcement():
+    from trump_collector import TrumpCollector
+    collector = TrumpCollector()
+    rows = synthetic.announcements(500, seed=6)
+    pairs = list(zip(rows['title'], rows['description']))
+    return lambda: [collector.categorize_announcement(title, text) for title, text in pairs], len(pairs)
+
+
+@benchmark('categorize.categorize_many')
+def bench_categorize_many():
+    from trump_collector import TrumpCollector
+    collector = TrumpCollector()
+    rows = synthetic.announcements(5000, seed=7)
+    return lambda: collector.categorize_many(rows['title'], rows['description']), len(rows)
+
+
+@benchmark('sentiment.textblob.uncached')
+def bench_sentiment():
+    from sentiment import score_texts
+    texts = synthetic.articles(2000, seed=8)
+    texts = [article['description'] for article in texts]
+    return lambda: score_texts(texts, use_cache=False), len(texts)
+
+
+# Collector loops against fake clients
+
+def _price_case(years, timeframe):
+    from price_collector import PriceCollector
+    candles = _candles(years, timeframe, recent=True)
+    collector = PriceCollector(exchange=fakes.FakeExchange(candles=candles))
+    start = datetime.fromtimestamp(candles['timestamp'].iloc[0] / 1000)
+    return lambda: collector.get_historical_prices(timeframe=timeframe, start_date=start), len(candles)
+
+
+@benchmark('collect.price.1h_1y')
+def bench_collect_price_1h():
+    return _price_case(1, '1h')
+
+
+@benchmark('collect.price.1m_1y', quick=False)
+def bench_collect_price_1m():
+    return _price_case(1, '1m')
+
+
+@benchmark('collect.reddit.ingest')
+def bench_collect_reddit():
+    from reddit_collector import RedditCollector, SUBREDDITS
+    from config import MAX_REDDIT_POSTS
+    fakes.FakeReddit.posts = synthetic.posts(MAX_REDDIT_POSTS, seed=9)
+    collector = RedditCollector()
+    return collector.ingest_bitcoin_posts, MAX_REDDIT_POSTS * len(SUBREDDITS)
+
+
+@benchmark('collect.news.paged')
+def bench_collect_news():
+    from news_collector import NewsCollector
+    fakes.FakeNewsApiClient.articles = synthetic.articles(500, seed=10)
+    collector = NewsCollector()
+    return lambda: collector.get_news(max_articles=500), 500
+
+
+@benchmark('collect.trends.stitched_90d')
+def bench_collect_trends():
+    from trends_collector import TrendsCollector
+    collector = TrendsCollector()
+    start = datetime(2025, 1, 1)
+    return lambda: collector.get_trends_range(start, start + timedelta(days=90)), 90 * 24
+
+
+@benchmark('collect.trends.now_1d')
+def bench_collect_trends_default():
+    from trends_collector import TrendsCollector
+    collector = TrendsCollector()
+    return collector.collect_bitcoin_trends, 181
+
+
+@benchmark('collect.truth.pages')
+def bench_collect_truth():
+    from truth_collector import TruthCollector
+    pages = synthetic.truth_pages(50, seed=11)
+    # Nothing listens on port 9, so the robots.txt check fails immediately
+    collector = TruthCollector(base_url='http://127.0.0.1:9', use_http_cache=False)
+    collector.session = fakes.FakeTruthSession(pages)
+    return lambda: collector.get_trump_posts(start_date=datetime(2020, 1, 1), max_posts=1000), 1000
+
+
+def unthrottle():
+    """Lift every rate-limit ceiling so cases measure code, not pacing"""
+    from rate_limiter import get_rate_limiter
+    limiter = get_rate_limiter()
+    limiter.default = (1e9, 1e9)
+    for host in list(limiter.limits):
+        limiter.configure(host, 1e9, 1e9)
+    return limiter
+
+
+def run_case(name, runs):
+    func, _ = BENCHMARKS[name]
+    timings = []
+    items = 0
+    calls = 0
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix='bench-') as workdir:
+            os.chdir(workdir)
+            try:
+                # Fresh stores and caches for every run
+                import sentiment
+                sentiment._cache = None
+                unthrottle()
+                fakes.reset_counters()
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run, items = func()
+                    unthrottle()
+                    fakes.reset_counters()
+                    started = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - started)
+                    calls = fakes.api_calls()
+            finally:
+                os.chdir(REPO_DIR)
+
+    median = statistics.median(timings)
+    return {
+        'runs': runs,
+        'median_s': median,
+        'min_s': min(timings),
+        'max_s': max(timings),
+        'items': items,
+        'items_per_s': items / median if median else None,
+        'fake_api_calls': calls
+    }
+
+
+def environment(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import numpy
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pd.__version__,
+        'quick': args.quick,
+        'runs': args.runs
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-case ratios against a baseline file; return the names that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['benchmarks']
+
+    print(f"\nComparison with {baseline_path} (regression above {1 + threshold:.2f}x):")
+    regressed = []
+    for name, result in results.items():
+        before = baseline.get(name, {}).get('median_s')
+        if before is None or result.get('median_s') is None:
+            continue
+        ratio = result['median_s'] / before
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressed.append(name)
+        print(f"  {name:<44} {before:9.4f}s -> {result['median_s']:9.4f}s  {ratio:5.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help="Timed runs per case (median is reported)")
+    parser.add_argument('--quick', action='store_true', help="Skip the multi-year and 1m-candle cases")
+    parser.add_argument('--filter', default='', help="Only run cases whose name contains this text")
+    parser.add_argument('--output', help="Results file (default benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument('--compare', help="Baseline results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument('--list', action='store_true', help="List the cases and exit")
+    args = parser.parse_args()
+
+    names = [name for name, (_, quick) in BENCHMARKS.items()
+             if args.filter in name and (quick or not args.quick)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    # Collectors log every page fetched; keep the report readable
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for name in names:
+        try:
+            result = run_case(name, args.runs)
+        except SkipBenchmark as e:
+            results[name] = {'skipped': str(e)}
+            print(f"{name:<44} skipped: {e}")
+            continue
+        results[name] = result
+        rate = f"{result['items_per_s']:12.0f}/s" if result['items_per_s'] else ''
+        print(f"{name:<44} {result['median_s']:9.4f}s  (min {result['min_s']:.4f}s)  {result['items']:>9} items {rate}")
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'environment': environment(args), 'benchmarks': results}, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
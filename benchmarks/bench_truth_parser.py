@@ -0,0 +1,98 @@
+"""Compare the BeautifulSoup and lxml status-card parsers on a corpus of saved pages.
+
+Usage:
+    python benchmarks/bench_truth_parser.py --pages data/truth_archive
+    python benchmarks/bench_truth_parser.py --synthetic 200
+
+With --pages, every *.html file in the directory is parsed (for example an
+archive written by TruthCollector(archive_dir=...)). Without it a synthetic
+corpus shaped like trumpstruth.org listing pages is generated.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from truth_parser import parse_page_bs4, parse_page_fast, parse_pages, load_archive
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+
+def synthetic_page(page, cards_per_page=20, seed=0):
+    """Build a listing page with status cards, navigation and filler markup"""
+    rng = random.Random(seed + page)
+    start = datetime(2025, 6, 1) - timedelta(days=page)
+    cards = []
+    for i in range(cards_per_page):
+        post_time = start - timedelta(minutes=37 * i)
+        if rng.random() < 0.7:
+            url = f"https://truthsocial.com/@realDonaldTrump/{post_time.year}/{MONTHS[post_time.month - 1]}/{post_time.day:02d}/{page}{i}"
+        else:
+            # Some cards only carry their date in the card body
+            url = f"https://truthsocial.com/@realDonaldTrump/posts/{page}{i:03d}"
+        body = ' '.join(rng.choice(['Bitcoin', 'tariffs', 'great', 'America', 'markets', 'crypto', 'the', 'and']) for _ in range(rng.randint(20, 80)))
+        cards.append(
+            f'<a class="status-card status-card--link" href="{url}">'
+            f'<div class="status-card__overline">Truth Social &middot; @realDonaldTrump</div>'
+            f'<div class="status-card__title">Post {page}-{i}</div>'
+            f'<div class="status-card__description"><p>{body}</p></div>'
+            f'<span class="status-card__date">{post_time.strftime("%B %d, %Y")}</span>'
+            f'<div class="status-card__stats"><span>12</span><span>340</span></div></a>'
+        )
+    filler = ''.join(f'<li><a href="/archive/{n}">Archive {n}</a></li>' for n in range(150))
+    return (f'<!DOCTYPE html><html><head><title>Trump\'s Truth</title>'
+            f'<script>var x = 1;</script><style>.a {{ color: red; }}</style></head>'
+            f'<body><nav><ul>{filler}</ul></nav><main>{"".join(cards)}</main>'
+            f'<footer>{filler}</footer></body></html>')
+
+
+def time_parser(parse, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            parse(html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', help='Directory of saved *.html pages')
+    parser.add_argument('--synthetic', type=int, default=200, help='Synthetic pages to generate when --pages is not given')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Process pool size for the parallel run')
+    args = parser.parse_args()
+
+    pages = load_archive(args.pages) if args.pages else [synthetic_page(n) for n in range(1, args.synthetic + 1)]
+    if not pages:
+        print("No pages to parse")
+        return
+    print(f"Corpus: {len(pages)} pages, {sum(len(html) for html in pages) / 1e6:.1f} MB")
+
+    # Both parsers must agree before their timings mean anything
+    mismatches = sum(parse_page_bs4(html) != parse_page_fast(html) for html in pages)
+    print(f"Pages where parsers disagree: {mismatches}")
+
+    bs4_time = time_parser(parse_page_bs4, pages, args.repeat)
+    fast_time = time_parser(parse_page_fast, pages, args.repeat)
+
+    started = time.perf_counter()
+    parse_pages(pages, max_workers=args.workers)
+    parallel_time = time.perf_counter() - started
+
+    print(f"\n{'Parser':<28}{'Total (s)':>12}{'Per page (ms)':>16}{'Speedup':>10}")
+    for name, elapsed in [
+        ('BeautifulSoup html.parser', bs4_time),
+        ('lxml fast path', fast_time),
+        (f'lxml fast path, {args.workers} procs', parallel_time)
+    ]:
+        print(f"{name:<28}{elapsed:>12.3f}{elapsed / len(pages) * 1000:>16.2f}{bs4_time / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""In-process fake clients for the benchmark suite.
+
+install() registers fake ccxt, praw, newsapi and pytrends modules before any
+collector is imported, so the real collector code runs end to end against
+synthetic data with no network access. Each fake counts its calls and can
+add a fixed per-call latency to model a slow API.
+"""
+import sys
+import time
+import types
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+
+
+def _sleep(latency):
+    if latency:
+        time.sleep(latency)
+
+
+class FakeExchange:
+    """ccxt exchange serving fetch_ohlcv from a candle DataFrame"""
+
+    id = 'fakeexchange'
+    rateLimit = 0
+
+    def __init__(self, config=None, candles=None, latency=0.0):
+        self.candles = candles.to_numpy() if candles is not None else np.empty((0, 6))
+        self.timestamps = self.candles[:, 0].astype(np.int64) if len(self.candles) else np.empty(0, dtype=np.int64)
+        self.latency = latency
+        self.calls = 0
+        self.last_response_headers = {}
+
+    def parse_timeframe(self, timeframe):
+        return int(pd.Timedelta(timeframe.replace('m', 'min') if timeframe.endswith('m') else timeframe).total_seconds())
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=1000):
+        self.calls += 1
+        _sleep(self.latency)
+        lo = np.searchsorted(self.timestamps, since or 0, side='left')
+        return self.candles[lo:lo + limit].tolist()
+
+
+class FakeReddit:
+    """praw.Reddit whose subreddits list, and search, one shared pool of synthetic posts"""
+
+    posts = []
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, **kwargs):
+        self.user = SimpleNamespace(me=lambda: SimpleNamespace(name='benchmark'))
+        self.auth = SimpleNamespace(limits={})
+
+    def subreddit(self, name):
+        return FakeSubreddit(name)
+
+
+class FakeSubreddit:
+    def __init__(self, name):
+        self.display_name = name
+
+    def _listing(self, limit):
+        for i, post in enumerate(FakeReddit.posts[:limit]):
+            # One API call per 100-post page, as praw does
+            if i % 100 == 0:
+                FakeReddit.calls += 1
+                _sleep(FakeReddit.latency)
+            author = SimpleNamespace(name=post['author'])
+            yield SimpleNamespace(author=author, **{k: v for k, v in post.items() if k != 'author'})
+
+    def new(self, limit=100):
+        return self._listing(limit)
+
+    def hot(self, limit=100):
+        return self._listing(limit)
+
+    def search(self, query, time_filter='all', limit=100):
+        return self._listing(limit)
+
+
+class FakeNewsApiClient:
+    """newsapi.NewsApiClient paging through synthetic articles"""
+
+    articles = []
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def get_everything(self, q=None, from_param=None, to=None, language=None, sort_by=None, page_size=20, page=1):
+        FakeNewsApiClient.calls += 1
+        _sleep(FakeNewsApiClient.latency)
+        start = (page - 1) * page_size
+        return {
+            'status': 'ok',
+            'totalResults': len(self.articles),
+            'articles': self.articles[start:start + page_size]
+        }
+
+
+class FakeNewsAPIException(Exception):
+    """newsapi.newsapi_exception.NewsAPIException"""
+
+    def __init__(self, exception):
+        self.exception = exception
+
+    def get_code(self):
+        return self.exception.get('code')
+
+
+class FakeTrendReq:
+    """pytrends TrendReq returning deterministic hourly interest scaled to 100 per window"""
+
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, hl='en-US', tz=360, **kwargs):
+        self.kw_list = []
+        self.timeframe = None
+
+    def build_payload(self, kw_list, timeframe='today 5-y', geo='', **kwargs):
+        # Only stores the payload; pytrends makes the request in interest_over_time
+        self.kw_list = list(kw_list)
+        self.timeframe = timeframe
+
+    def _index(self):
+        """Time points for the payload's timeframe: an explicit hour range or 'now N-d' / 'now N-H'"""
+        if self.timeframe.startswith('now '):
+            count, unit = self.timeframe.split()[1].split('-')
+            span = pd.Timedelta(days=int(count)) if unit == 'd' else pd.Timedelta(hours=int(count))
+            # Google's resolution for short ranges: per minute up to 4 hours, 8 minutes up to a day
+            freq = 'min' if span <= pd.Timedelta(hours=4) else '8min' if span <= pd.Timedelta(days=1) else 'h'
+            end = pd.Timestamp.utcnow().tz_localize(None).floor(freq)
+            return pd.date_range(end - span, end, freq=freq, name='date')
+        start, end = (datetime.strptime(part, '%Y-%m-%dT%H') for part in self.timeframe.split())
+        return pd.date_range(start, end, freq='h', name='date')
+
+    def interest_over_time(self):
+        FakeTrendReq.calls += 1
+        _sleep(FakeTrendReq.latency)
+        index = self._index()
+        hours = (index - pd.Timestamp('2020-01-01')) / pd.Timedelta(hours=1)
+
+        # A fixed underlying popularity per keyword, like Google's, rescaled within the window
+        raw = {}
+        for keyword in self.kw_list:
+            weight = 1 + zlib.crc32(keyword.encode('utf-8')) % 50
+            raw[keyword] = weight * (2 + np.sin(hours.to_numpy() / 24 * 2 * np.pi) + np.sin(hours.to_numpy() / 500))
+        df = pd.DataFrame(raw, index=index)
+        df = (df / df.to_numpy().max() * 100).round()
+        df['isPartial'] = False
+        return df
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+
+class FakeTruthSession:
+    """requests.Session stand-in serving synthetic Truth Social listing pages by ?page=N"""
+
+    def __init__(self, pages, latency=0.0):
+        self.pages = pages
+        self.latency = latency
+        self.headers = {}
+        self.calls = 0
+        self.bytes = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        _sleep(self.latency)
+        page = int(parse_qs(urlparse(url).query).get('page', ['1'])[0])
+        body = self.pages[page - 1] if page <= len(self.pages) else '<html><body>No posts</body></html>'
+        self.bytes += len(body)
+        return FakeResponse(200, body)
+
+
+def install():
+    """Register the fake client modules in sys.modules (idempotent)"""
+    ccxt = types.ModuleType('ccxt')
+    ccxt.binance = FakeExchange
+
+    praw = types.ModuleType('praw')
+    praw.Reddit = FakeReddit
+
+    newsapi = types.ModuleType('newsapi')
+    newsapi.NewsApiClient = FakeNewsApiClient
+    newsapi_exception = types.ModuleType('newsapi.newsapi_exception')
+    newsapi_exception.NewsAPIException = FakeNewsAPIException
+    newsapi.newsapi_exception = newsapi_exception
+
+    pytrends = types.ModuleType('pytrends')
+    pytrends_request = types.ModuleType('pytrends.request')
+    pytrends_request.TrendReq = FakeTrendReq
+    pytrends.request = pytrends_request
+
+    sys.modules.update({
+        'ccxt': ccxt,
+        'praw': praw,
+        'newsapi': newsapi,
+        'newsapi.newsapi_exception': newsapi_exception,
+        'pytrends': pytrends,
+        'pytrends.request': pytrends_request
+    })
+
+
+def reset_counters():
+    for fake in (FakeReddit, FakeNewsApiClient, FakeTrendReq):
+        fake.calls = 0
+
+
+def api_calls():
+    """Requests made to the shared fake clients since the last reset"""
+    return FakeReddit.calls + FakeNewsApiClient.calls + FakeTrendReq.calls
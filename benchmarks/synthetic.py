@@ -0,0 +1,154 @@
+"""Seeded synthetic data for the benchmark suite.
+
+Every generator takes a seed and returns the same data for the same
+arguments, so benchmark runs on different machines or commits see identical
+inputs. Shapes match what the collectors and analysis functions consume.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+TIMEFRAME_MS = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000}
+
+# Word pools mixing neutral filler with the keywords the classifiers and matchers look for
+FILLER = ('market', 'today', 'price', 'report', 'traders', 'analysts', 'week', 'said', 'new', 'big',
+          'strong', 'weak', 'rally', 'drop', 'volume', 'investors', 'policy', 'growth', 'record', 'fear')
+CRYPTO = ('bitcoin', 'btc', 'crypto', 'blockchain', 'ethereum', 'halving', 'etf', 'mining')
+TRUMP = ('trump', 'president trump', 'donald trump', 'white house', 'tariffs', 'executive order',
+         'truth social', 'announces', 'says', 'statement')
+SENTIMENT = ('great', 'terrible', 'amazing', 'bad', 'good', 'worst', 'best', 'happy', 'sad', 'wonderful')
+NEWS_SOURCES = ('Reuters', 'Bloomberg', 'CoinDesk', 'CNBC', 'The Block', 'Fox News', 'AP')
+
+
+def _texts(rng, n, words=12, pools=(FILLER, CRYPTO, TRUMP, SENTIMENT), weights=(0.55, 0.2, 0.15, 0.1)):
+    """n pseudo-sentences drawn from the word pools"""
+    pools = [np.array(pool, dtype=object) for pool in pools]
+    choice = rng.choice(len(pools), size=(n, words), p=weights)
+    texts = []
+    for row in choice:
+        texts.append(' '.join(pools[p][rng.integers(len(pools[p]))] for p in row).capitalize())
+    return texts
+
+
+def candles(years=1, timeframe='1h', seed=0, start=datetime(2025, 1, 1), price=30000.0, annual_vol=0.6):
+    """OHLCV rows (exchange-style ms timestamps) from a geometric random walk"""
+    rng = np.random.default_rng(seed)
+    step_ms = TIMEFRAME_MS[timeframe]
+    n = int(years * 365 * 86_400_000 // step_ms)
+    step_vol = annual_vol * np.sqrt(step_ms / (365 * 86_400_000))
+
+    close = price * np.exp(np.cumsum(rng.normal(0, step_vol, n)))
+    open_ = np.concatenate([[price], close[:-1]])
+    wick = np.abs(rng.normal(0, step_vol / 2, (2, n)))
+    start_ms = int(start.timestamp() * 1000) // step_ms * step_ms
+    return pd.DataFrame({
+        'timestamp': start_ms + np.arange(n, dtype=np.int64) * step_ms,
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + wick[0]),
+        'low': np.minimum(open_, close) * (1 - wick[1]),
+        'close': close,
+        'volume': rng.gamma(2.0, 50.0, n)
+    })
+
+
+def price_frame(candle_df):
+    """Candles with datetime timestamps, as the analysis functions receive them"""
+    df = candle_df.copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+def _times(rng, n, start, end):
+    seconds = np.sort(rng.uniform(0, (end - start).total_seconds(), n))
+    return [start + timedelta(seconds=float(s)) for s in seconds]
+
+
+def posts(n, seed=0, start=None, end=None):
+    """Reddit-style submissions as dicts (created_utc in epoch seconds)"""
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now()
+    start = start or end - timedelta(hours=20)
+    titles = _texts(rng, n, words=8)
+    bodies = _texts(rng, n, words=40)
+    times = _times(rng, n, start, end)[::-1]  # listings are newest first
+    return [{
+        'id': f"p{seed}_{i}",
+        'created_utc': times[i].timestamp(),
+        'title': titles[i],
+        'selftext': bodies[i] if rng.random() > 0.3 else '',
+        'author': f"user{rng.integers(10_000)}",
+        'score': int(rng.integers(0, 5000)),
+        'num_comments': int(rng.integers(0, 800)),
+        'url': f"https://reddit.com/r/Bitcoin/comments/p{seed}_{i}"
+    } for i in range(n)]
+
+
+def articles(n, seed=0, start=None, end=None):
+    """NewsAPI get_everything article dicts"""
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now()
+    start = start or end - timedelta(days=7)
+    titles = _texts(rng, n, words=10)
+    descriptions = _texts(rng, n, words=30)
+    times = _times(rng, n, start, end)[::-1]
+    return [{
+        'source': {'id': None, 'name': NEWS_SOURCES[rng.integers(len(NEWS_SOURCES))]},
+        'author': f"Reporter {rng.integers(500)}",
+        'title': titles[i],
+        'description': descriptions[i],
+        'url': f"https://news.example.com/{seed}/{i}",
+        'publishedAt': times[i].strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'content': descriptions[i]
+    } for i in range(n)]
+
+
+def announcements(n, seed=0, start=datetime(2025, 1, 1), end=datetime(2026, 1, 1)):
+    """Trump announcement rows as analyze_trump_announcements receives them"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'published_at': _times(rng, n, start, end),
+        'title': _texts(rng, n, words=10, weights=(0.4, 0.2, 0.3, 0.1)),
+        'description': _texts(rng, n, words=30, weights=(0.4, 0.2, 0.3, 0.1)),
+        'source': [NEWS_SOURCES[i] for i in rng.integers(len(NEWS_SOURCES), size=n)],
+        'url': [f"https://news.example.com/trump/{seed}/{i}" for i in range(n)]
+    })
+
+
+def truth_posts(n, seed=0, start=datetime(2025, 1, 1), end=datetime(2026, 1, 1)):
+    """Truth Social posts as analyze_truth_impact receives them"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'created_at': _times(rng, n, start, end),
+        'text': _texts(rng, n, words=25, weights=(0.5, 0.1, 0.3, 0.1)),
+        'url': [f"https://truthsocial.com/@realDonaldTrump/{seed}/{i}" for i in range(n)],
+        'replies': rng.integers(0, 20_000, n),
+        'reblogs': rng.integers(0, 40_000, n),
+        'favorites': rng.integers(0, 150_000, n)
+    })
+
+
+def truth_pages(n_pages, per_page=20, seed=0, newest=None):
+    """HTML listing pages shaped like the Truth Social archive, newest posts first"""
+    rng = np.random.default_rng(seed)
+    newest = newest or datetime(2026, 1, 1)
+    titles = _texts(rng, n_pages * per_page, words=8, weights=(0.5, 0.1, 0.3, 0.1))
+    bodies = _texts(rng, n_pages * per_page, words=30, weights=(0.5, 0.1, 0.3, 0.1))
+    pages = []
+    for page in range(n_pages):
+        cards = []
+        for i in range(per_page):
+            k = page * per_page + i
+            posted = newest - timedelta(hours=3 * k)
+            url = (f"https://truthsocial.com/@realDonaldTrump/{posted.year}/{MONTHS[posted.month - 1]}/"
+                   f"{posted.day:02d}/s{seed}_{k}/")
+            cards.append(
+                f'<a class="status-card" href="{url}">'
+                f'<div class="status-card__overline">Truth Social</div>'
+                f'<div class="status-card__title">{titles[k]}</div>'
+                f'<div class="status-card__description">{bodies[k]}</div>'
+                f'<span class="status-card__date">{posted.strftime("%B %d, %Y")}</span></a>'
+            )
+        pages.append(f"<html><body><nav>menu</nav><main>{''.join(cards)}</main></body></html>")
+    return pages
@@ -0,0 +1,101 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class BrowserPool:
+    """Small pool of headless Chrome drivers, started only when first needed.
+
+    Drivers are reused across calls and collectors and are quit once at
+    interpreter exit rather than after every crawl.
+    """
+
+    def __init__(self, max_size=2, page_load_timeout=30):
+        self.max_size = max_size
+        self.page_load_timeout = page_load_timeout
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+        atexit.register(self.close_all)
+
+    def _start_driver(self):
+        """Start a headless Chrome; selenium is imported here so HTTP-only runs never load it"""
+        from selenium import webdriver
+
+        # Set up Chrome options
+        chrome_options = webdriver.ChromeOptions()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, starting one if the pool has room and none is idle"""
+        with self._condition:
+            while not self._idle and self._created >= self.max_size:
+                self._condition.wait()
+            if self._idle:
+                driver = self._idle.pop()
+            else:
+                self._created += 1
+                driver = None
+
+        if driver is None:
+            try:
+                driver = self._start_driver()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            with self._condition:
+                if healthy:
+                    self._idle.append(driver)
+                else:
+                    # A driver that errored may be wedged, so replace it next time
+                    self._created -= 1
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                self._condition.notify()
+
+    def close_all(self):
+        """Quit every idle driver"""
+        with self._condition:
+            drivers, self._idle = self._idle, []
+            self._created -= len(drivers)
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide browser pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+    return _pool
@@ -0,0 +1,108 @@
+import os
+import json
+import pandas as pd
+from config import *
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def unfilled_ranges(start, end, candles, timeframe_ms):
+    """Parts of [start, end] (ms) that candles fetched for it left empty, as (start_ms, end_ms) pairs.
+
+    Ranges have the same bounds find_gaps reports for them, so marking them
+    with mark_gaps keeps them from being fetched again.
+    """
+    timestamps = [start - timeframe_ms] + sorted(candle[0] for candle in candles) + [end + 1]
+    return [(int(a) + timeframe_ms, int(b) - 1) for a, b in zip(timestamps, timestamps[1:])
+            if b - a > timeframe_ms]
+
+
+class CandleStore:
+    """Persistent local OHLCV store with one file per symbol and timeframe.
+
+    Timestamps are kept as exchange milliseconds so stored candles can be
+    merged with fresh fetch_ohlcv chunks without conversion.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or os.path.join(DATA_DIR, 'candles')
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _key(self, symbol, timeframe):
+        return f"{symbol.replace('/', '-')}_{timeframe}"
+
+    def path(self, symbol, timeframe):
+        return os.path.join(self.base_dir, f"{self._key(symbol, timeframe)}.csv")
+
+    def _gaps_path(self, symbol, timeframe):
+        return os.path.join(self.base_dir, f"{self._key(symbol, timeframe)}.gaps.json")
+
+    def load(self, symbol, timeframe):
+        """Load all stored candles sorted by timestamp"""
+        path = self.path(symbol, timeframe)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        try:
+            return pd.read_csv(path)
+        except Exception as e:
+            print(f"Error reading candle store {path}: {str(e)}")
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    def append(self, symbol, timeframe, candles):
+        """Merge new candles into the store, newer values winning on duplicates"""
+        new = pd.DataFrame(candles, columns=OHLCV_COLUMNS)
+        if new.empty:
+            return self.load(symbol, timeframe)
+
+        merged = pd.concat([self.load(symbol, timeframe), new], ignore_index=True)
+        merged['timestamp'] = merged['timestamp'].astype('int64')
+        merged = merged.drop_duplicates(subset=['timestamp'], keep='last')
+        merged = merged.sort_values('timestamp').reset_index(drop=True)
+
+        # Write atomically so an interrupted run never truncates the store
+        path = self.path(symbol, timeframe)
+        tmp_path = f"{path}.tmp"
+        merged.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return merged
+
+    def last_timestamp(self, symbol, timeframe):
+        """Return the newest stored candle timestamp in ms, or None"""
+        df = self.load(symbol, timeframe)
+        if df.empty:
+            return None
+        return int(df['timestamp'].iloc[-1])
+
+    def known_gaps(self, symbol, timeframe):
+        """Return gaps already confirmed empty on the exchange"""
+        path = self._gaps_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            return {tuple(gap) for gap in json.load(f)}
+
+    def mark_gaps(self, symbol, timeframe, gaps):
+        """Remember gaps the exchange has no candles for so they are not refetched"""
+        known = self.known_gaps(symbol, timeframe) | {tuple(gap) for gap in gaps}
+        with open(self._gaps_path(symbol, timeframe), 'w') as f:
+            json.dump(sorted(known), f)
+
+    def find_gaps(self, df, symbol, timeframe, timeframe_ms, since=None):
+        """Find missing ranges between candles in df as (start_ms, end_ms) pairs"""
+        if len(df) < 2:
+            return []
+
+        timestamps = df['timestamp'].astype('int64')
+        if since is not None:
+            timestamps = timestamps[timestamps >= since].reset_index(drop=True)
+        diffs = timestamps.diff()
+        ends = timestamps[diffs > timeframe_ms]
+        starts = timestamps.shift(1)[diffs > timeframe_ms]
+
+        known = self.known_gaps(symbol, timeframe)
+        gaps = []
+        for start, end in zip(starts, ends):
+            gap = (int(start) + timeframe_ms, int(end) - 1)
+            if gap not in known:
+                gaps.append(gap)
+        return gaps
@@ -0,0 +1,30 @@
+import importlib
+
+# Source name -> (module, class). Modules are imported only when a source is used,
+# so a price-only run never loads praw, pytrends, selenium, newsapi or tweepy.
+COLLECTORS = {
+    'price': ('price_collector', 'PriceCollector'),
+    'news': ('news_collector', 'NewsCollector'),
+    'reddit': ('reddit_collector', 'RedditCollector'),
+    'twitter': ('twitter_collector', 'TwitterCollector'),
+    'trends': ('trends_collector', 'TrendsCollector'),
+    'trump': ('trump_collector', 'TrumpCollector'),
+    'truth': ('truth_collector', 'TruthCollector')
+}
+
+
+def available_sources():
+    return list(COLLECTORS)
+
+
+def get_collector_class(source):
+    """Import a source's module on first use and return its collector class"""
+    if source not in COLLECTORS:
+        raise ValueError(f"Unknown source '{source}', expected one of: {', '.join(COLLECTORS)}")
+    module_name, class_name = COLLECTORS[source]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_collector(source, *args, **kwargs):
+    """Instantiate the collector for a source"""
+    return get_collector_class(source)(*args, **kwargs)
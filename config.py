@@ -1,35 +1,51 @@
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-load_dotenv(env_path)
-
-# Print environment variables for debugging
-print("\nLoading environment variables...")
-print(f".env file path: {env_path}")
-print(f".env file exists: {os.path.exists(env_path)}")
-
-# Twitter API credentials
-TWITTER_API_KEY = os.getenv('TWITTER_API_KEY')
-TWITTER_API_SECRET = os.getenv('TWITTER_API_SECRET')
-TWITTER_ACCESS_TOKEN = os.getenv('TWITTER_ACCESS_TOKEN')
-TWITTER_ACCESS_TOKEN_SECRET = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-TWITTER_BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
-
-# Reddit API credentials
-REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
-REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
-REDDIT_USERNAME = os.getenv('REDDIT_USERNAME')
+from functools import lru_cache
+from collections import namedtuple
+
+ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+
+# Credentials are read on first use, never at import time
+Settings = namedtuple('Settings', [
+    'twitter_api_key', 'twitter_api_secret', 'twitter_access_token',
+    'twitter_access_token_secret', 'twitter_bearer_token',
+    'reddit_client_id', 'reddit_client_secret', 'reddit_username',
+    'newsapi_key'
+])
+
 REDDIT_USER_AGENT = 'BitcoinSentimentAnalyzer/1.0'
 
-# NewsAPI credentials
-NEWSAPI_KEY = os.getenv('NEWSAPI_KEY')
-if not NEWSAPI_KEY:
-    print("Warning: NEWSAPI_KEY not found in environment variables")
-    print("Available environment variables:", os.environ.keys())
-else:
-    print(f"NewsAPI key loaded: {NEWSAPI_KEY[:5]}...")
+
+@lru_cache(maxsize=None)
+def get_settings(env_path=ENV_PATH):
+    """Load credentials from .env and the environment once and cache them.
+
+    Nothing is printed; variables already set in the environment win over .env.
+    """
+    try:
+        from dotenv import dotenv_values
+        env = {k: v for k, v in dotenv_values(env_path).items() if v is not None}
+    except ImportError:
+        env = {}
+    env.update(os.environ)
+    return Settings(
+        twitter_api_key=env.get('TWITTER_API_KEY'),
+        twitter_api_secret=env.get('TWITTER_API_SECRET'),
+        twitter_access_token=env.get('TWITTER_ACCESS_TOKEN'),
+        twitter_access_token_secret=env.get('TWITTER_ACCESS_TOKEN_SECRET'),
+        twitter_bearer_token=env.get('TWITTER_BEARER_TOKEN'),
+        reddit_client_id=env.get('REDDIT_CLIENT_ID'),
+        reddit_client_secret=env.get('REDDIT_CLIENT_SECRET'),
+        reddit_username=env.get('REDDIT_USERNAME'),
+        newsapi_key=env.get('NEWSAPI_KEY')
+    )
+
+
+def __getattr__(name):
+    # Old-style credential constants (config.NEWSAPI_KEY) resolve lazily
+    field = name.lower()
+    if field in Settings._fields:
+        return getattr(get_settings(), field)
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
 
 # Search parameters
 BITCOIN_KEYWORDS = [
@@ -40,9 +56,63 @@ BITCOIN_KEYWORDS = [
 # Data collection settings
 MAX_TWEETS = 1000
 MAX_REDDIT_POSTS = 100
+REDDIT_BATCH_SIZE = 50  # Posts scored and stored per streaming batch
 MAX_NEWS_ARTICLES = 100
+NEWS_PAGE_SIZE = 100  # NewsAPI maximum page size
+NEWS_REQUEST_BUDGET = 5  # Real NewsAPI calls allowed per get_news
+NEWS_CACHE_TTL = 3600  # Seconds a cached NewsAPI response is reused
 TIME_WINDOW_HOURS = 24
 
+# Truth Social crawl settings (async mode)
+TRUTH_RATE_LIMIT = 0.5  # Requests per second
+TRUTH_RATE_BURST = 3
+TRUTH_PREFETCH_PAGES = 3
+
+# API hosts, used as keys for the shared rate limiter
+REDDIT_API_HOST = 'oauth.reddit.com'
+NEWSAPI_HOST = 'newsapi.org'
+TWITTER_API_HOST = 'api.twitter.com'
+TRENDS_HOST = 'trends.google.com'
+
+# Request ceilings per host as (requests per second, burst), shared by every collector
+HOST_RATE_LIMITS = {
+    'binance': (20.0, 20),  # ccxt exchanges are keyed by exchange id
+    NEWSAPI_HOST: (1.0, 5),
+    REDDIT_API_HOST: (1.0, 10),  # 60 requests per minute for OAuth clients
+    TWITTER_API_HOST: (0.5, 5),
+    TRENDS_HOST: (0.2, 1),
+    'trumpstruth.org': (TRUTH_RATE_LIMIT, TRUTH_RATE_BURST)
+}
+
+# Concurrent requests for price backfills (empty store or an earlier start date); 1 fetches serially
+PRICE_BACKFILL_WORKERS = 4
+
+# Per-node timeouts (seconds) for the main pipeline
+PIPELINE_TIMEOUTS = {
+    'news': 120,
+    'price': 600,
+    'reddit': 300,
+    'trends': 120,
+    'truth': 900,
+    'analysis': 300
+}
+
+# Sentiment cache settings
+SENTIMENT_CACHE_MAX_ENTRIES = 200000
+
+# Significance testing settings (off unless main.py --significance)
+SIGNIFICANCE_TESTS = False
+SIGNIFICANCE_PERMUTATIONS = 10000
+SIGNIFICANCE_BOOTSTRAPS = 10000
+SIGNIFICANCE_CONFIDENCE = 0.95
+
+# Local port for the live mode's /metrics endpoint
+METRICS_PORT = 9108
+
+# Profiling settings (main.py --profile)
+PROFILE_TOP_N = 25
+PROFILE_TRACE_FRAMES = 1
+
 # File paths
 DATA_DIR = 'data'
 RESULTS_DIR = 'results' 
\ No newline at end of file
@@ -0,0 +1,274 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config import *
+
+_TS = pa.timestamp('us')
+
+# Typed schema, time column and dedupe key for every source
+SOURCES = {
+    'reddit': {
+        'time_column': 'created_at',
+        'key': 'id',
+        'schema': pa.schema([
+            ('id', pa.string()),
+            ('created_at', _TS),
+            ('title', pa.string()),
+            ('text', pa.string()),
+            ('author', pa.string()),
+            ('score', pa.int64()),
+            ('num_comments', pa.int64()),
+            ('url', pa.string()),
+            ('title_sentiment_polarity', pa.float64()),
+            ('title_sentiment_subjectivity', pa.float64()),
+            ('text_sentiment_polarity', pa.float64()),
+            ('text_sentiment_subjectivity', pa.float64())
+        ])
+    },
+    'news': {
+        'time_column': 'published_at',
+        'key': 'url',
+        'schema': pa.schema([
+            ('source', pa.string()),
+            ('author', pa.string()),
+            ('title', pa.string()),
+            ('description', pa.string()),
+            ('url', pa.string()),
+            ('published_at', _TS),
+            ('title_sentiment_polarity', pa.float64()),
+            ('title_sentiment_subjectivity', pa.float64()),
+            ('description_sentiment_polarity', pa.float64()),
+            ('description_sentiment_subjectivity', pa.float64())
+        ])
+    },
+    'twitter': {
+        'time_column': 'created_at',
+        'key': 'id',
+        'schema': pa.schema([
+            ('id', pa.string()),
+            ('created_at', _TS),
+            ('text', pa.string()),
+            ('user', pa.string()),
+            ('retweets', pa.int64()),
+            ('favorites', pa.int64()),
+            ('sentiment_polarity', pa.float64()),
+            ('sentiment_subjectivity', pa.float64())
+        ])
+    },
+    'trump_announcements': {
+        'time_column': 'created_at',
+        'key': 'id',
+        'schema': pa.schema([
+            ('id', pa.string()),
+            ('title', pa.string()),
+            ('text', pa.string()),
+            ('created_at', _TS),
+            ('url', pa.string()),
+            ('subreddit', pa.string()),
+            ('score', pa.int64()),
+            ('num_comments', pa.int64()),
+            ('query', pa.string()),
+            ('matched_queries', pa.string()),
+            ('is_direct', pa.bool_()),
+            ('is_crypto', pa.bool_()),
+            ('content_type', pa.string()),
+            ('confidence_score', pa.float64()),
+            ('sentiment_polarity', pa.float64()),
+            ('sentiment_subjectivity', pa.float64())
+        ])
+    },
+    'trends': {
+        'time_column': 'date',
+        'key': 'date',
+        'schema': pa.schema([
+            ('date', _TS),
+            ('bitcoin_combined_interest', pa.float64()),
+            ('trump_combined_interest', pa.float64()),
+            ('bitcoin_interest_change', pa.float64()),
+            ('trump_interest_change', pa.float64())
+        ])
+    }
+}
+
+PARTITION_FIELD = 'day'
+META_FILE = '_meta.json'
+
+
+class DataStore:
+    """Parquet dataset for one source, partitioned by day.
+
+    Rows are appended as new files in day=YYYY-MM-DD directories, skipping
+    keys already stored, so each run only adds what is new. Reads support
+    column projection and time-range filters that prune whole partitions.
+    Per-partition row counts and time bounds are kept in _meta.json so
+    freshness checks never open a data file.
+    """
+
+    def __init__(self, source, base_dir=None):
+        config = SOURCES[source]
+        self.source = source
+        self.schema = config['schema']
+        self.time_column = config['time_column']
+        self.key = config['key']
+        self.root = os.path.join(base_dir or os.path.join(DATA_DIR, 'store'), source)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    # Metadata
+
+    def _meta_path(self):
+        return os.path.join(self.root, META_FILE)
+
+    def metadata(self):
+        """Return {'partitions': {day: {'rows', 'min', 'max'}}} without reading data"""
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'partitions': {}}
+
+    def _write_metadata(self, meta):
+        tmp_path = f"{self._meta_path()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._meta_path())
+
+    def get_meta(self, name, default=None):
+        """A source-specific entry kept in _meta.json next to the partition index"""
+        return self.metadata().get(name, default)
+
+    def set_meta(self, name, value):
+        with self._lock:
+            meta = self.metadata()
+            meta[name] = value
+            self._write_metadata(meta)
+
+    def latest_timestamp(self):
+        """Newest stored time, from metadata alone"""
+        partitions = self.metadata()['partitions']
+        if not partitions:
+            return None
+        return max(pd.Timestamp(info['max']) for info in partitions.values())
+
+    def row_count(self):
+        return sum(info['rows'] for info in self.metadata()['partitions'].values())
+
+    def is_fresh(self, hours=TIME_WINDOW_HOURS):
+        """True when the newest stored row is within the last `hours`"""
+        latest = self.latest_timestamp()
+        if latest is None:
+            return False
+        return (datetime.now() - latest).total_seconds() / 3600 <= hours
+
+    # Writing
+
+    def _coerce(self, df):
+        """Shape a DataFrame to the source schema (missing columns become null)"""
+        df = df.copy()
+        for field in self.schema:
+            if field.name not in df.columns:
+                df[field.name] = None
+            elif pa.types.is_timestamp(field.type):
+                values = pd.to_datetime(df[field.name], errors='coerce')
+                if getattr(values.dt, 'tz', None) is not None:
+                    values = values.dt.tz_convert(None)
+                df[field.name] = values
+            elif pa.types.is_string(field.type):
+                df[field.name] = df[field.name].map(lambda v: None if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df[self.schema.names], schema=self.schema, preserve_index=False)
+
+    def _partition_dir(self, day):
+        return os.path.join(self.root, f"{PARTITION_FIELD}={day}")
+
+    def append(self, df):
+        """Append rows whose key is not already stored; return the number written"""
+        if df is None or df.empty:
+            return 0
+
+        table = self._coerce(df)
+        frame = table.to_pandas()
+        frame = frame[frame[self.time_column].notna()]
+        frame = frame.drop_duplicates(subset=[self.key], keep='last')
+        days = frame[self.time_column].dt.strftime('%Y-%m-%d')
+
+        written = 0
+        with self._lock:
+            meta = self.metadata()
+            for day, rows in frame.groupby(days):
+                partition_dir = self._partition_dir(day)
+                if os.path.isdir(partition_dir):
+                    # Only the key column of this one partition is read for dedupe
+                    existing = pq.read_table(partition_dir, columns=[self.key], schema=self.schema)
+                    rows = rows[~rows[self.key].isin(set(existing.column(self.key).to_pylist()))]
+                if rows.empty:
+                    continue
+
+                os.makedirs(partition_dir, exist_ok=True)
+                file_name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+                pq.write_table(
+                    pa.Table.from_pandas(rows, schema=self.schema, preserve_index=False),
+                    os.path.join(partition_dir, file_name)
+                )
+
+                info = meta['partitions'].get(day, {'rows': 0})
+                bounds = [rows[self.time_column].min(), rows[self.time_column].max()]
+                if 'min' in info:
+                    bounds += [pd.Timestamp(info['min']), pd.Timestamp(info['max'])]
+                meta['partitions'][day] = {
+                    'rows': info['rows'] + len(rows),
+                    'min': min(bounds).isoformat(),
+                    'max': max(bounds).isoformat()
+                }
+                written += len(rows)
+            self._write_metadata(meta)
+        return written
+
+    # Reading
+
+    def _dataset(self):
+        return ds.dataset(
+            self.root,
+            schema=self.schema.append(pa.field(PARTITION_FIELD, pa.string())),
+            format='parquet',
+            partitioning=ds.partitioning(pa.schema([(PARTITION_FIELD, pa.string())]), flavor='hive'),
+            exclude_invalid_files=False,
+            ignore_prefixes=['_', '.']
+        )
+
+    def read(self, columns=None, start=None, end=None):
+        """Load rows with time in [start, end], reading only the needed partitions and columns"""
+        if not self.metadata()['partitions']:
+            return pd.DataFrame(columns=columns or self.schema.names)
+
+        flt = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            # Day partitions before start are pruned without being opened
+            flt = (ds.field(PARTITION_FIELD) >= start.strftime('%Y-%m-%d')) & \
+                (ds.field(self.time_column) >= pa.scalar(start.to_pydatetime(), _TS))
+        if end is not None:
+            end = pd.Timestamp(end)
+            end_filter = (ds.field(PARTITION_FIELD) <= end.strftime('%Y-%m-%d')) & \
+                (ds.field(self.time_column) <= pa.scalar(end.to_pydatetime(), _TS))
+            flt = end_filter if flt is None else flt & end_filter
+
+        table = self._dataset().to_table(columns=columns or self.schema.names, filter=flt)
+        df = table.to_pandas()
+        if self.time_column in df.columns:
+            df = df.sort_values(self.time_column).reset_index(drop=True)
+        return df
+
+    def read_recent(self, hours=TIME_WINDOW_HOURS, columns=None):
+        """Rows from the last `hours`, e.g. the last 24h of Reddit posts"""
+        return self.read(columns=columns, start=datetime.now() - pd.Timedelta(hours=hours))
+
+
+def get_store(source):
+    """Open the data store for a source"""
+    return DataStore(source)
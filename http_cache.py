@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class HttpCache:
+    """On-disk HTTP cache that revalidates with ETag/Last-Modified.
+
+    Each URL keeps its last body and validators. Later fetches send
+    If-None-Match/If-Modified-Since and reuse the stored body on a 304, so
+    unchanged pages cost a round trip but no download or re-parse.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.revalidated = 0
+        self.downloaded = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.html"
+
+    def _load_meta(self, url):
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        """Validator headers for a conditional GET of url, if it was cached"""
+        meta = self._load_meta(url)
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def handle_response(self, url, response):
+        """Return the page body for a response, storing or reusing the cached copy"""
+        meta_path, body_path = self._paths(url)
+        if response.status_code == 304:
+            with open(body_path, encoding='utf-8') as f:
+                body = f.read()
+            with self._lock:
+                self.revalidated += 1
+            return body
+
+        response.raise_for_status()
+        body = response.text
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with open(body_path, 'w', encoding='utf-8') as f:
+                f.write(body)
+            with open(meta_path, 'w') as f:
+                json.dump({
+                    'url': url,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'fetched_at': time.time()
+                }, f)
+        with self._lock:
+            self.downloaded += 1
+        return body
+
+    def get(self, session, url, timeout=10):
+        """Conditional GET through a requests session"""
+        response = session.get(url, headers=self.conditional_headers(url), timeout=timeout)
+        return self.handle_response(url, response)
+
+    def summary(self):
+        return f"HTTP cache: {self.revalidated} pages unchanged (304), {self.downloaded} downloaded"
+
+
+class ResponseCache:
+    """On-disk cache of decoded API responses with a time-to-live.
+
+    Entries are keyed by any tuple of request parameters and expire ttl
+    seconds after they were stored, so repeated identical queries within
+    that window are answered locally instead of spending API quota.
+    """
+
+    def __init__(self, cache_dir, ttl):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(list(key), default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired"""
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['stored_at'] > self.ttl:
+            return None
+        return entry['response']
+
+    def put(self, key, response):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': list(key), 'stored_at': time.time(), 'response': response}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,207 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# Output columns shared by every analyze_* function, in their original order
+WINDOW_COLUMNS = [
+    'price_change', 'max_change', 'min_change',
+    'initial_price', 'final_price', 'max_price', 'min_price'
+]
+
+HOUR_NS = 3600 * 10**9
+
+
+def to_ns(timestamps):
+    """Convert timestamps to int64 nanoseconds since epoch (naive UTC)"""
+    ts = pd.to_datetime(pd.Series(timestamps))
+    if getattr(ts.dt, 'tz', None) is not None:
+        ts = ts.dt.tz_convert(None)
+    return ts.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+class RangeExtrema:
+    """Sparse tables answering range max/min queries over a price array in O(1)"""
+
+    def __init__(self, values, max_span):
+        values = np.asarray(values, dtype=float)
+        levels = max(1, int(max_span).bit_length())
+        self.max_table = [values]
+        self.min_table = [values]
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            prev_max = self.max_table[-1]
+            prev_min = self.min_table[-1]
+            if len(prev_max) <= half:
+                break
+            # fmax/fmin skip NaN closes the same way Series.max()/min() do
+            self.max_table.append(np.fmax(prev_max[:-half], prev_max[half:]))
+            self.min_table.append(np.fmin(prev_min[:-half], prev_min[half:]))
+
+    def query(self, lo, hi):
+        """Return (max, min) over the half-open ranges [lo, hi) for each pair"""
+        lengths = hi - lo
+        k = np.floor(np.log2(np.maximum(lengths, 1))).astype(np.int64)
+        max_out = np.empty(len(lo))
+        min_out = np.empty(len(lo))
+        for level in np.unique(k):
+            sel = k == level
+            span = 1 << int(level)
+            left = lo[sel]
+            right = hi[sel] - span
+            max_out[sel] = np.fmax(self.max_table[level][left], self.max_table[level][right])
+            min_out[sel] = np.fmin(self.min_table[level][left], self.min_table[level][right])
+        return max_out, min_out
+
+
+def compute_event_windows(event_ns, price_ns, prices, hours_before=6, hours_after=6):
+    """Compute window statistics for sorted event times against sorted price times.
+
+    Returns a dict with a boolean 'has_window' mask and one array per
+    WINDOW_COLUMNS entry, aligned with event_ns.
+    """
+    event_ns = np.asarray(event_ns, dtype=np.int64)
+    price_ns = np.asarray(price_ns, dtype=np.int64)
+    prices = np.asarray(prices, dtype=float)
+
+    # Window bounds by binary search: [start, end] inclusive on both sides
+    lo = np.searchsorted(price_ns, event_ns - int(hours_before * HOUR_NS), side='left')
+    hi = np.searchsorted(price_ns, event_ns + int(hours_after * HOUR_NS), side='right')
+    has_window = hi > lo
+
+    result = {'has_window': has_window}
+    for column in WINDOW_COLUMNS:
+        result[column] = np.full(len(event_ns), np.nan)
+
+    if has_window.any():
+        lo_w = lo[has_window]
+        hi_w = hi[has_window]
+        extrema = RangeExtrema(prices, (hi_w - lo_w).max())
+        max_price, min_price = extrema.query(lo_w, hi_w)
+        initial_price = prices[lo_w]
+        final_price = prices[hi_w - 1]
+
+        result['initial_price'][has_window] = initial_price
+        result['final_price'][has_window] = final_price
+        result['max_price'][has_window] = max_price
+        result['min_price'][has_window] = min_price
+        result['price_change'][has_window] = (final_price - initial_price) / initial_price * 100
+        result['max_change'][has_window] = (max_price - initial_price) / initial_price * 100
+        result['min_change'][has_window] = (min_price - initial_price) / initial_price * 100
+
+    return result
+
+
+def sorted_price_arrays(price_df, price_column='close'):
+    """Return (timestamps_ns, prices) from price_df sorted by timestamp"""
+    price_ns = to_ns(price_df['timestamp'])
+    prices = price_df[price_column].to_numpy(dtype=float)
+    if len(price_ns) > 1 and np.any(np.diff(price_ns) < 0):
+        order = np.argsort(price_ns, kind='stable')
+        price_ns = price_ns[order]
+        prices = prices[order]
+    return price_ns, prices
+
+
+def event_impact_frame(events_df, time_column, price_df, columns, hours_before=6, hours_after=6):
+    """Build the impact results table for events_df in a single vectorized pass.
+
+    columns maps each output column name to the events_df column it is copied
+    from. Events with no price data in their window are dropped, and rows keep
+    the order of events_df.
+    """
+    price_ns, prices = sorted_price_arrays(price_df)
+    event_ns = to_ns(events_df[time_column])
+
+    # Evaluate in time order, then scatter back to the original row order
+    order = np.argsort(event_ns, kind='stable')
+    windows = compute_event_windows(event_ns[order], price_ns, prices, hours_before, hours_after)
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+
+    has_window = windows['has_window'][inverse]
+    selected = events_df[has_window]
+
+    data = {name: selected[source].to_numpy() for name, source in columns.items()}
+    for column in WINDOW_COLUMNS:
+        data[column] = windows[column][inverse][has_window]
+
+    return pd.DataFrame(data, columns=list(columns) + WINDOW_COLUMNS)
+
+
+EventStudy = namedtuple('EventStudy', ['offsets', 'returns', 'max_excursion', 'min_excursion'])
+
+
+def event_study(events_df, time_column, price_df, offsets=range(-24, 49), price_column='close', tolerance_hours=None):
+    """Price moves around each event over a whole grid of horizons at once.
+
+    offsets are hours relative to the event. The price at event + h is the
+    close of the last candle at or before that time, and only counts if the
+    candle is no more than tolerance_hours old (default: the median candle
+    spacing), so horizons past the end of the data come out as NaN.
+
+    Returns an EventStudy of three events x offsets DataFrames indexed like
+    events_df, all in percent of the price at the event: the return to each
+    horizon, and the highest and lowest close between the event and that
+    horizon. Every horizon is looked up in one binary search over the price
+    array and every excursion in one sparse-table query, so a sweep of 50
+    horizons costs about as much as a single event_impact_frame call.
+    """
+    price_ns, prices = sorted_price_arrays(price_df, price_column)
+    event_ns = to_ns(events_df[time_column])
+    offsets = np.asarray(list(offsets), dtype=float)
+
+    if tolerance_hours is None:
+        tolerance_ns = int(np.median(np.diff(price_ns))) if len(price_ns) > 1 else HOUR_NS
+    else:
+        tolerance_ns = int(tolerance_hours * HOUR_NS)
+
+    def last_candle(targets):
+        # Index of the last candle at or before each target, -1 when it is missing or stale
+        idx = np.searchsorted(price_ns, targets, side='right') - 1
+        fresh = idx >= 0
+        fresh[fresh] = price_ns[idx[fresh]] > targets[fresh] - tolerance_ns
+        return np.where(fresh, idx, -1)
+
+    base = last_candle(event_ns)
+    targets = event_ns[:, None] + (offsets * HOUR_NS).astype(np.int64)[None, :]
+    idx = last_candle(targets.ravel()).reshape(targets.shape)
+    valid = (idx >= 0) & (base[:, None] >= 0)
+
+    returns = np.full(targets.shape, np.nan)
+    max_excursion = np.full(targets.shape, np.nan)
+    min_excursion = np.full(targets.shape, np.nan)
+
+    if valid.any():
+        rows, cols = np.nonzero(valid)
+        start = base[rows]
+        end = idx[rows, cols]
+        base_price = prices[start]
+
+        # Excursions cover the candles between the event and the horizon, whichever comes first
+        lo = np.minimum(start, end)
+        hi = np.maximum(start, end) + 1
+        extrema = RangeExtrema(prices, (hi - lo).max())
+        max_price, min_price = extrema.query(lo, hi)
+
+        returns[rows, cols] = (prices[end] - base_price) / base_price * 100
+        max_excursion[rows, cols] = (max_price - base_price) / base_price * 100
+        min_excursion[rows, cols] = (min_price - base_price) / base_price * 100
+
+    def frame(values):
+        return pd.DataFrame(values, index=events_df.index, columns=offsets)
+
+    return EventStudy(offsets, frame(returns), frame(max_excursion), frame(min_excursion))
+
+
+def summarize_event_study(study):
+    """Per-horizon mean, median, spread and share of positive returns across events"""
+    returns = study.returns
+    return pd.DataFrame({
+        'events': returns.count(),
+        'mean_return': returns.mean(),
+        'median_return': returns.median(),
+        'std_return': returns.std(),
+        'positive_share': (returns > 0).sum() / returns.count(),
+        'mean_max_excursion': study.max_excursion.mean(),
+        'mean_min_excursion': study.min_excursion.mean()
+    }).rename_axis('offset_hours')
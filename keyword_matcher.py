@@ -0,0 +1,64 @@
+import re
+
+
+def _trie_pattern(node):
+    """Render a character trie as a regex preferring the longest keyword"""
+    branches = []
+    for char, child in sorted(node.items()):
+        if char:
+            branches.append(re.escape(char) + _trie_pattern(child))
+    if not branches:
+        return ''
+    # An end-of-keyword marker makes the continuation optional (greedy, so longest wins)
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if '' in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+class KeywordMatcher:
+    """Match many keyword tables against a text in a single regex pass.
+
+    Takes {category: [keywords]} and reports which categories have at least
+    one keyword occurring as a substring, exactly like
+    any(keyword in text for keyword in keywords) per category.
+    """
+
+    def __init__(self, tables):
+        self.categories = list(tables)
+
+        keyword_categories = {}
+        for category, keywords in tables.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword, set()).add(category)
+
+        # Two keywords matching at the same position means the shorter is a
+        # prefix of the longer, so the longest match carries its prefixes' categories
+        self._categories_by_keyword = {}
+        for keyword in keyword_categories:
+            categories = set()
+            for other, other_categories in keyword_categories.items():
+                if keyword.startswith(other):
+                    categories |= other_categories
+            self._categories_by_keyword[keyword] = frozenset(categories)
+
+        # Trie-shaped alternation so most positions are rejected on their first character
+        trie = {}
+        for keyword in keyword_categories:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self._pattern = re.compile(_trie_pattern(trie))
+
+    def match(self, text):
+        """Return the set of categories with a keyword occurring in text"""
+        found = set()
+        match = self._pattern.search(text)
+        while match:
+            found |= self._categories_by_keyword[match.group()]
+            if len(found) == len(self.categories):
+                break
+            # Resume one character in so overlapping keywords are still seen
+            match = self._pattern.search(text, match.start() + 1)
+        return found
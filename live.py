@@ -0,0 +1,319 @@
+"""Live event-impact tracking and an accelerated replay harness.
+
+Usage:
+    python live.py --replay --speed 3600
+    python live.py --symbol BTC/USDT --poll 60
+
+Live mode polls the exchange for closed candles and TruthCollector for new
+posts, and prints each post's impact window as soon as it closes. Replay mode
+feeds stored candles and stored Trump announcements through the same tracker,
+speed times faster than real time (0 = as fast as possible), and reports the
+latency between a candle arriving and the results it completes.
+"""
+import time
+import heapq
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from impact_engine import HOUR_NS, to_ns
+from metrics import get_metrics
+from config import *
+
+
+class CandleRing:
+    """Fixed-capacity ring buffer of (timestamp_ns, close) for the most recent candles"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.closes = np.zeros(capacity, dtype=float)
+        self.start = 0
+        self.size = 0
+
+    def append(self, timestamp_ns, close):
+        end = (self.start + self.size) % self.capacity
+        self.timestamps[end] = timestamp_ns
+        self.closes[end] = close
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            # Full: overwrite the oldest candle
+            self.start = (self.start + 1) % self.capacity
+
+    def ordered(self):
+        """Return (timestamps, closes) oldest first"""
+        idx = (self.start + np.arange(self.size)) % self.capacity
+        return self.timestamps[idx], self.closes[idx]
+
+    def between(self, lo_ns, hi_ns):
+        """Candles with lo_ns <= timestamp <= hi_ns, oldest first"""
+        timestamps, closes = self.ordered()
+        lo = np.searchsorted(timestamps, lo_ns, side='left')
+        hi = np.searchsorted(timestamps, hi_ns, side='right')
+        return timestamps[lo:hi], closes[lo:hi]
+
+    @property
+    def latest(self):
+        if not self.size:
+            return None
+        return int(self.timestamps[(self.start + self.size - 1) % self.capacity])
+
+
+class _OpenWindow:
+    """Running statistics of one event's [event - before, event + after] window"""
+
+    __slots__ = ('event_ns', 'start_ns', 'end_ns', 'payload', 'initial', 'final', 'high', 'low', 'count')
+
+    def __init__(self, event_ns, start_ns, end_ns, payload):
+        self.event_ns = event_ns
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.payload = payload
+        self.initial = self.final = self.high = self.low = np.nan
+        self.count = 0
+
+    def update(self, close):
+        if self.count == 0:
+            self.initial = close
+        self.final = close
+        # fmax/fmin skip NaN closes like the batch engine does
+        self.high = np.fmax(self.high, close)
+        self.low = np.fmin(self.low, close)
+        self.count += 1
+
+    def stats(self):
+        """Window statistics with the same names and formulas as impact_engine"""
+        return {
+            'price_change': (self.final - self.initial) / self.initial * 100,
+            'max_change': (self.high - self.initial) / self.initial * 100,
+            'min_change': (self.low - self.initial) / self.initial * 100,
+            'initial_price': self.initial,
+            'final_price': self.final,
+            'max_price': self.high,
+            'min_price': self.low
+        }
+
+
+class LiveImpactTracker:
+    """Incrementally computes event impact windows as candles close.
+
+    Candles go into a bounded ring buffer. An event that arrives after
+    part of its window has passed is seeded from the buffer. Each new candle
+    updates every window it falls in, and a window is finalized as soon as
+    the last candle it can contain has arrived. Finished results match
+    event_impact_frame for the same data; events whose window has no candles
+    are dropped just like the batch path drops them.
+    """
+
+    def __init__(self, hours_before=6, hours_after=6, candle_ns=HOUR_NS, capacity=None, on_result=None):
+        self.before_ns = int(hours_before * HOUR_NS)
+        self.after_ns = int(hours_after * HOUR_NS)
+        self.candle_ns = candle_ns
+        # Enough candles to seed any event arriving up to one full window late
+        window_candles = (self.before_ns + self.after_ns) // candle_ns + 2
+        self.ring = CandleRing(capacity or 2 * window_candles)
+        self.on_result = on_result
+        self.pending = []  # heap of (start_ns, seq, window) not yet reached by any candle
+        self.open = {}  # seq -> window receiving candles
+        self.results = []
+        self._seq = 0
+
+    def add_event(self, event_time, payload=None):
+        """Register an event (datetime-like) and start tracking its window"""
+        event_ns = int(to_ns([event_time])[0])
+        window = _OpenWindow(event_ns, event_ns - self.before_ns, event_ns + self.after_ns, payload or {})
+        self._seq += 1
+
+        latest = self.ring.latest
+        if latest is None or latest < window.start_ns:
+            heapq.heappush(self.pending, (window.start_ns, self._seq, window))
+            return
+
+        # Late arrival: replay the candles of its window still in the buffer
+        _, closes = self.ring.between(window.start_ns, window.end_ns)
+        for close in closes:
+            window.update(close)
+        self.open[self._seq] = window
+        self._finalize_ready(latest)
+
+    def on_candle(self, timestamp, close, received_at=None):
+        """Feed one closed candle (timestamp = candle open time); return the results it completed"""
+        timestamp_ns = int(to_ns([timestamp])[0]) if not isinstance(timestamp, (int, np.integer)) else int(timestamp)
+        received_at = received_at if received_at is not None else time.perf_counter()
+        self.ring.append(timestamp_ns, close)
+
+        # Windows that start at or before this candle begin receiving candles
+        while self.pending and self.pending[0][0] <= timestamp_ns:
+            _, seq, window = heapq.heappop(self.pending)
+            self.open[seq] = window
+
+        for window in self.open.values():
+            if window.start_ns <= timestamp_ns <= window.end_ns:
+                window.update(close)
+
+        return self._finalize_ready(timestamp_ns, received_at)
+
+    def _finalize_ready(self, timestamp_ns, received_at=None):
+        finished = []
+        for seq, window in list(self.open.items()):
+            # No later candle can fall inside the window
+            if timestamp_ns + self.candle_ns > window.end_ns:
+                del self.open[seq]
+                if window.count == 0:
+                    continue
+                result = dict(window.payload)
+                result['event_time'] = pd.Timestamp(window.event_ns)
+                result.update(window.stats())
+                if received_at is not None:
+                    result['latency_ms'] = (time.perf_counter() - received_at) * 1000
+                    get_metrics().observe('live_latency_seconds', result['latency_ms'] / 1000)
+                finished.append(result)
+
+        for result in finished:
+            self.results.append(result)
+            if self.on_result is not None:
+                self.on_result(result)
+        return finished
+
+    def flush(self):
+        """Finalize every open window with the candles seen so far (end of a replay)"""
+        return self._finalize_ready(np.iinfo(np.int64).max - self.candle_ns)
+
+    def snapshot(self):
+        """Partial statistics of the windows still open, for monitoring"""
+        rows = []
+        for window in self.open.values():
+            if window.count:
+                row = dict(window.payload)
+                row['event_time'] = pd.Timestamp(window.event_ns)
+                row['candles_seen'] = window.count
+                row.update(window.stats())
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def results_frame(self):
+        return pd.DataFrame(self.results)
+
+
+def replay(tracker, price_df, events_df, time_column, columns=None, candle_ns=HOUR_NS, speed=0):
+    """Feed stored candles and events through a tracker in stream order.
+
+    A candle is delivered when it closes (open time + candle length) and an
+    event at its own timestamp, which is the order a live run sees them in.
+    With speed > 0 the replay sleeps so that speed simulated seconds pass per
+    real second. Returns a dict of throughput and latency figures.
+    """
+    columns = columns or {}
+    price_ns = to_ns(price_df['timestamp'])
+    closes = price_df['close'].to_numpy(dtype=float)
+    event_ns = to_ns(events_df[time_column])
+    payloads = events_df[list(columns.values())].to_dict('records') if columns else [{}] * len(events_df)
+
+    # (delivery time, kind, index); events sort before candles closing at the same instant
+    stream = [(int(ts) + candle_ns, 1, i) for i, ts in enumerate(price_ns)]
+    stream += [(int(ts), 0, i) for i, ts in enumerate(event_ns)]
+    stream.sort()
+
+    started = time.perf_counter()
+    sim_start = stream[0][0] if stream else 0
+    for deliver_ns, kind, i in stream:
+        if speed:
+            delay = (deliver_ns - sim_start) / 1e9 / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        if kind == 0:
+            payload = {name: payloads[i][source] for name, source in columns.items()}
+            tracker.add_event(pd.Timestamp(int(event_ns[i])), payload)
+        else:
+            tracker.on_candle(int(price_ns[i]), closes[i])
+    tracker.flush()
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([r['latency_ms'] for r in tracker.results if 'latency_ms' in r])
+    return {
+        'candles': len(price_ns),
+        'events': len(event_ns),
+        'results': len(tracker.results),
+        'seconds': elapsed,
+        'items_per_second': len(stream) / elapsed if elapsed else float('inf'),
+        'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+        'latency_ms_p95': float(np.percentile(latencies, 95)) if len(latencies) else float('nan'),
+        'latency_ms_max': float(latencies.max()) if len(latencies) else float('nan')
+    }
+
+
+def print_result(result):
+    print(f"\n{result['event_time']}: {str(result.get('text', result.get('title', '')))[:80]}")
+    print(f"Price change: {result['price_change']:.2f}% (max {result['max_change']:.2f}%, min {result['min_change']:.2f}%)")
+
+
+def run_live(symbol='BTC/USDT', timeframe='1h', poll_seconds=60, hours_before=6, hours_after=6, metrics_port=None):
+    """Poll for closed candles and new Truth Social posts until interrupted"""
+    from collectors import create_collector
+
+    if metrics_port:
+        get_metrics().serve(metrics_port)
+        print(f"Serving metrics on http://127.0.0.1:{metrics_port}/metrics")
+
+    price_collector = create_collector('price')
+    truth_collector = create_collector('truth')
+    candle_ns = price_collector.exchange.parse_timeframe(timeframe) * 10**9
+    tracker = LiveImpactTracker(hours_before, hours_after, candle_ns=candle_ns, on_result=print_result)
+
+    # Warm the ring buffer so posts that arrive now get their pre-event candles
+    since = int((datetime.now() - timedelta(hours=hours_before + hours_after)).timestamp() * 1000)
+    print(f"Live mode: tracking {symbol} {timeframe}, polling every {poll_seconds}s (Ctrl+C to stop)")
+    try:
+        while True:
+            for candle in price_collector.fetch_closed_candles(symbol, timeframe, since):
+                tracker.on_candle(candle[0] * 10**6, candle[4])
+                since = candle[0] + 1
+
+            posts = truth_collector.get_trump_posts(max_posts=20, incremental=True)
+            for post in posts.to_dict('records') if not posts.empty else []:
+                tracker.add_event(post['created_at'], {'text': post['text'], 'url': post['url']})
+
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        print(f"\nStopped with {len(tracker.results)} finished windows, {len(tracker.open)} still open")
+    return tracker.results_frame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live event impact tracking and replay")
+    parser.add_argument('--replay', action='store_true', help="Replay stored candles and announcements")
+    parser.add_argument('--speed', type=float, default=0, help="Simulated seconds per real second (0 = no sleeping)")
+    parser.add_argument('--symbol', default='BTC/USDT')
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--poll', type=int, default=60, help="Live poll interval in seconds")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help="Serve Prometheus metrics on this port in live mode (0 = off)")
+    args = parser.parse_args()
+
+    if not args.replay:
+        run_live(args.symbol, args.timeframe, args.poll, metrics_port=args.metrics_port)
+        return
+
+    from candle_store import CandleStore
+    from data_store import DataStore
+
+    candles = CandleStore().load(args.symbol, args.timeframe)
+    if candles.empty:
+        print("No stored candles to replay; run the price collector first")
+        return
+    candles['timestamp'] = pd.to_datetime(candles['timestamp'], unit='ms')
+    events = DataStore('trump_announcements').read(columns=['created_at', 'title', 'url'])
+
+    tracker = LiveImpactTracker(candle_ns=int(pd.Timedelta(args.timeframe).value))
+    stats = replay(tracker, candles, events, 'created_at',
+                   columns={'title': 'title', 'url': 'url'},
+                   candle_ns=int(pd.Timedelta(args.timeframe).value), speed=args.speed)
+
+    print("\nReplay Summary:")
+    for key, value in stats.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,14 @@
 import os
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
-# from twitter_collector import TwitterCollector
-from reddit_collector import RedditCollector
-from price_collector import PriceCollector
-from news_collector import NewsCollector
-from trends_collector import TrendsCollector
-from trump_collector import TrumpCollector
-from truth_collector import TruthCollector
+from datetime import datetime
+from collectors import create_collector
+from impact_engine import event_impact_frame
+from significance import impact_significance, print_significance
+from pipeline import Pipeline, summarize, OK
+from sentiment import get_cache
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
 from config import *
 
 def create_directories():
@@ -17,7 +16,7 @@ def create_directories():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(RESULTS_DIR, exist_ok=True)
 
-def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6):
+def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6, significance=SIGNIFICANCE_TESTS):
     """Analyze Bitcoin price movements around Trump's Truth Social posts"""
     if truth_df.empty or price_df.empty:
         print("Not enough data for analysis")
@@ -38,46 +37,19 @@ def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6):
         print(f"Truth Social posts: {truth_df['created_at'].min()} to {truth_df['created_at'].max()}")
         print(f"Price data: {price_df['timestamp'].min()} to {price_df['timestamp'].max()}")
         
-        results = []
-        for _, post in truth_df.iterrows():
-            post_time = post['created_at']
-            start_time = post_time - timedelta(hours=hours_before)
-            end_time = post_time + timedelta(hours=hours_after)
-            
-            # Get price data around the post
-            price_window = price_df[
-                (price_df['timestamp'] >= start_time) & 
-                (price_df['timestamp'] <= end_time)
-            ]
-            
-            if not price_window.empty:
-                # Calculate price changes
-                initial_price = price_window.iloc[0]['close']
-                final_price = price_window.iloc[-1]['close']
-                price_change = ((final_price - initial_price) / initial_price) * 100
-                
-                # Calculate max and min prices
-                max_price = price_window['close'].max()
-                min_price = price_window['close'].min()
-                max_change = ((max_price - initial_price) / initial_price) * 100
-                min_change = ((min_price - initial_price) / initial_price) * 100
-                
-                results.append({
-                    'post_time': post_time,
-                    'text': post['text'],
-                    'replies': post['replies'],
-                    'reblogs': post['reblogs'],
-                    'favorites': post['favorites'],
-                    'price_change': price_change,
-                    'max_change': max_change,
-                    'min_change': min_change,
-                    'initial_price': initial_price,
-                    'final_price': final_price,
-                    'max_price': max_price,
-                    'min_price': min_price
-                })
-        
-        results_df = pd.DataFrame(results)
+        # Compute price windows for every post in one pass
+        results_df = event_impact_frame(
+            truth_df, 'created_at', price_df,
+            columns={
+                'post_time': 'created_at',
+                'text': 'text',
+                'replies': 'replies',
+                'reblogs': 'reblogs',
+                'favorites': 'favorites'
+            },
+            hours_before=hours_before,
+            hours_after=hours_after
+        )
         if not results_df.empty:
             # Save results to CSV
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -85,6 +57,10 @@ def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6):
             results_df.to_csv(results_file, index=False)
             print(f"\nAnalysis results saved to: {results_file}")
             
+            # Plotting libraries are only loaded once there is something to plot
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+            
             # Plot price changes by engagement
             plt.figure(figsize=(12, 6))
             sns.scatterplot(x='favorites', y='price_change', data=results_df)
@@ -111,6 +87,10 @@ def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6):
             print("\nPrice Change vs. Engagement:")
             print(results_df[['price_change', 'replies', 'reblogs', 'favorites']].corr())
             
+            # Compare against time-of-day matched random times (opt-in: thousands of resamples)
+            if significance:
+                print_significance(impact_significance(truth_df, 'created_at', price_df, hours_before, hours_after))
+            
             # Print most impactful posts
             print("\nMost Impactful Posts:")
             top_impact = results_df.nlargest(3, 'price_change')
@@ -126,7 +106,8 @@ def analyze_truth_impact(truth_df, price_df, hours_before=6, hours_after=6):
         print(f"Error in impact analysis: {str(e)}")
         return None
 
-def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hours_after=6):
+def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hours_after=6,
+                                significance=SIGNIFICANCE_TESTS):
     """Analyze Bitcoin price movements around Trump's announcements"""
     if announcements_df.empty or price_df.empty:
         print("Not enough data for analysis")
@@ -147,46 +128,19 @@ def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hour
         print(f"Trump announcements: {announcements_df['published_at'].min()} to {announcements_df['published_at'].max()}")
         print(f"Price data: {price_df['timestamp'].min()} to {price_df['timestamp'].max()}")
         
-        results = []
-        for _, announcement in announcements_df.iterrows():
-            announcement_time = announcement['published_at']
-            start_time = announcement_time - timedelta(hours=hours_before)
-            end_time = announcement_time + timedelta(hours=hours_after)
-            
-            # Get price data around the announcement
-            price_window = price_df[
-                (price_df['timestamp'] >= start_time) & 
-                (price_df['timestamp'] <= end_time)
-            ]
-            
-            if not price_window.empty:
-                # Calculate price changes
-                initial_price = price_window.iloc[0]['close']
-                final_price = price_window.iloc[-1]['close']
-                price_change = ((final_price - initial_price) / initial_price) * 100
-                
-                # Calculate max and min prices
-                max_price = price_window['close'].max()
-                min_price = price_window['close'].min()
-                max_change = ((max_price - initial_price) / initial_price) * 100
-                min_change = ((min_price - initial_price) / initial_price) * 100
-                
-                results.append({
-                    'announcement_time': announcement_time,
-                    'title': announcement['title'],
-                    'text': announcement['description'],
-                    'source': announcement['source'],
-                    'url': announcement['url'],
-                    'price_change': price_change,
-                    'max_change': max_change,
-                    'min_change': min_change,
-                    'initial_price': initial_price,
-                    'final_price': final_price,
-                    'max_price': max_price,
-                    'min_price': min_price
-                })
-        
-        results_df = pd.DataFrame(results)
+        # Compute price windows for every announcement in one pass
+        results_df = event_impact_frame(
+            announcements_df, 'published_at', price_df,
+            columns={
+                'announcement_time': 'published_at',
+                'title': 'title',
+                'text': 'description',
+                'source': 'source',
+                'url': 'url'
+            },
+            hours_before=hours_before,
+            hours_after=hours_after
+        )
         if not results_df.empty:
             # Save results to CSV
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -194,6 +148,10 @@ def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hour
             results_df.to_csv(results_file, index=False)
             print(f"\nAnalysis results saved to: {results_file}")
             
+            # Plotting libraries are only loaded once there is something to plot
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+            
             # Plot price changes by source
             plt.figure(figsize=(12, 6))
             sns.scatterplot(x='source', y='price_change', data=results_df)
@@ -221,6 +179,10 @@ def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hour
             print("\nPrice Change vs. Source:")
             print(results_df[['price_change', 'source']].corr())
             
+            # Compare against time-of-day matched random times (opt-in: thousands of resamples)
+            if significance:
+                print_significance(impact_significance(announcements_df, 'published_at', price_df, hours_before, hours_after))
+            
             # Print most impactful announcements
             print("\nMost Impactful Announcements:")
             top_impact = results_df.nlargest(3, 'price_change')
@@ -237,38 +199,119 @@ def analyze_trump_announcements(announcements_df, price_df, hours_before=6, hour
         print(f"Error in impact analysis: {str(e)}")
         return None
 
-def main():
+SOURCES = ['news', 'price', 'reddit', 'trends', 'truth']
+
+def build_pipeline(sources, start_date, collectors, significance=SIGNIFICANCE_TESTS):
+    """Declare the selected collectors and the analyses that can run on them"""
+    pipeline = Pipeline()
+    
+    def collect(source, method, **kwargs):
+        def run():
+            collector = collectors[source] = create_collector(source)
+            return getattr(collector, method)(**kwargs)
+        return run
+    
+    # Independent network-bound sources
+    if 'news' in sources:
+        pipeline.add('news', collect('news', 'get_news',
+                                     query='trump AND (bitcoin OR crypto OR cryptocurrency)',
+                                     max_articles=100),
+                     timeout=PIPELINE_TIMEOUTS['news'])
+    if 'price' in sources:
+        pipeline.add('price', collect('price', 'collect_bitcoin_prices', start_date=start_date,
+                                      backfill_workers=PRICE_BACKFILL_WORKERS),
+                     timeout=PIPELINE_TIMEOUTS['price'])
+    if 'reddit' in sources:
+        pipeline.add('reddit', collect('reddit', 'collect_bitcoin_posts'),
+                     timeout=PIPELINE_TIMEOUTS['reddit'])
+    if 'trends' in sources:
+        pipeline.add('trends', collect('trends', 'collect_bitcoin_trends'),
+                     timeout=PIPELINE_TIMEOUTS['trends'])
+    if 'truth' in sources:
+        pipeline.add('truth', collect('truth', 'get_trump_posts', start_date=start_date, async_crawl=True),
+                     timeout=PIPELINE_TIMEOUTS['truth'])
+    
+    # Analyses start as soon as their inputs are ready; each gets its own copy of the prices
+    if 'news' in sources and 'price' in sources:
+        pipeline.add('announcement_impact',
+                     lambda news, price: analyze_trump_announcements(news, price.copy(), significance=significance) if not news.empty and not price.empty else None,
+                     deps=['news', 'price'], timeout=PIPELINE_TIMEOUTS['analysis'])
+    if 'truth' in sources and 'price' in sources:
+        pipeline.add('truth_impact',
+                     lambda truth, price: analyze_truth_impact(truth, price.copy(), significance=significance),
+                     deps=['truth', 'price'], timeout=PIPELINE_TIMEOUTS['analysis'])
+    return pipeline
+
+def main(sources=('news', 'price'), profile_dir=None, significance=SIGNIFICANCE_TESTS):
     create_directories()
     
     # Set start date to January 1, 2025
     start_date = datetime(2025, 1, 1)
     
-    # Collect Trump announcements from NewsAPI
-    print("\nCollecting Trump announcements from NewsAPI...")
-    news_collector = NewsCollector()
-    announcements_df = news_collector.get_news(
-        query='trump AND (bitcoin OR crypto OR cryptocurrency)',
-        max_articles=100
-    )
+    # Run the selected sources concurrently, then the analyses that depend on them
+    collectors = {}
+    pipeline = build_pipeline(sources, start_date, collectors, significance)
+    profiler = None
+    if profile_dir is not None:
+        # Imported only when asked for, so normal runs carry no profiling cost
+        from profiling import create_profiler
+        profiler = create_profiler(profile_dir or None)
+        profiler.instrument(pipeline)
+    results = pipeline.run(concurrent=profiler is None)
     
-    # Collect Bitcoin price data
-    print("\nCollecting Bitcoin price data...")
-    price_collector = PriceCollector()
-    price_df = price_collector.collect_bitcoin_prices(start_date=start_date)
+    def frame(name):
+        result = results.get(name)
+        if result is None or result.status != OK or result.value is None:
+            return pd.DataFrame()
+        return result.value
     
-    # Analyze impact of Trump announcements
-    if not announcements_df.empty and not price_df.empty:
-        print("\nAnalyzing impact of Trump announcements on Bitcoin price...")
-        results = analyze_trump_announcements(announcements_df, price_df)
+    announcements_df = frame('news')
+    price_df = frame('price')
     
     # Print summary statistics
+    print("\nPipeline Summary:")
+    print(summarize(results))
+    
     print("\nSummary Statistics:")
     if not announcements_df.empty:
         print(f"Total Trump announcements analyzed: {len(announcements_df)}")
         print(f"News sources: {announcements_df['source'].nunique()}")
         print(f"Time window analyzed: 6 hours before and after each announcement")
         print(f"Analysis period: {start_date.date()} to present")
-        print(f"Total NewsAPI requests made: {news_collector.request_count}")
+    if 'news' in collectors:
+        print(f"NewsAPI requests made: {collectors['news'].request_count}, cached responses used: {collectors['news'].cache_hits}")
+    if not price_df.empty:
+        print(f"Price candles loaded: {len(price_df)}")
+    for source in ['reddit', 'trends', 'truth']:
+        if not frame(source).empty:
+            print(f"{source.capitalize()} rows collected: {len(frame(source))}")
+    if any(source in sources for source in ['news', 'reddit']):
+        print(get_cache().summary())
+    
+    print("\nRate limiter utilisation:")
+    print(get_rate_limiter().summary())
+    
+    # Export the run's counters and stage latencies
+    metrics_base = os.path.join(RESULTS_DIR, f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    json_path, prom_path = get_metrics().write(metrics_base)
+    print(f"\nRun metrics saved to: {json_path} and {prom_path}")
+    
+    if profiler is not None:
+        print("\nStage Profiles:")
+        print(profiler.summary())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bitcoin price vs. Trump announcement analysis")
+    parser.add_argument('--sources', nargs='+', default=['news', 'price'],
+                        choices=SOURCES,
+                        help="Sources to collect; only the selected collectors are imported")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='DIR',
+                        help="Profile each stage (CPU and allocations), running stages one at a time; "
+                             "reports go to DIR (default results/profiles)")
+    parser.add_argument('--significance', action='store_true', default=SIGNIFICANCE_TESTS,
+                        help="Test each impact analysis against time-of-day matched placebo events")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    args = parse_args()
+    main(sources=args.sources, profile_dir=args.profile, significance=args.significance)
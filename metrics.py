@@ -0,0 +1,209 @@
+import json
+import math
+import threading
+from collections import defaultdict
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+# Name -> (type, help) for every metric the collectors and analysis steps record
+METRICS = {
+    'api_calls_total': ('counter', "API requests made, by source"),
+    'rows_collected_total': ('counter', "Rows (posts, articles, candles, time points) collected, by source"),
+    'bytes_downloaded_total': ('counter', "Response bytes downloaded, by source"),
+    'retries_total': ('counter', "Requests retried after an error, by source"),
+    'rate_limit_waits_total': ('counter', "Requests that had to wait for the rate limiter, by host"),
+    'rate_limit_wait_seconds_total': ('counter', "Time spent waiting for the rate limiter, by host"),
+    'sentiment_texts_total': ('counter', "Texts passed to sentiment scoring"),
+    'sentiment_scored_total': ('counter', "Texts actually scored with TextBlob (cache misses)"),
+    'cache_hits_total': ('counter', "Cache hits, by cache"),
+    'stage_seconds': ('histogram', "Duration of pipeline stages, by stage"),
+    'live_latency_seconds': ('histogram', "Time from a candle arriving to the impact results it completes")
+}
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((math.inf, self.count))
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and labels.
+
+    Collectors and analysis steps record into the shared registry from any
+    thread; a run's totals can be written as JSON or Prometheus text, or
+    served over HTTP by long-running modes.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self._lock = threading.Lock()
+        self._server = None
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram"""
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(self.buckets)
+            self.histograms[key].observe(value)
+
+    def get(self, name, **labels):
+        """Current value of a counter (0 if never incremented)"""
+        with self._lock:
+            return self.counters.get(self._key(name, labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """All metrics as a JSON-serialisable dict"""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {key: (list(h.cumulative()), h.sum, h.count) for key, h in self.histograms.items()}
+
+        result = {}
+        for (name, labels), value in sorted(counters.items()):
+            result.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            result.setdefault(name, []).append({
+                'labels': dict(labels),
+                'count': count,
+                'sum': total,
+                'buckets': {('+Inf' if math.isinf(bound) else str(bound)): n for bound, n in buckets}
+            })
+        return result
+
+    def to_json(self, path=None):
+        """Return the snapshot as JSON, also writing it to path when given"""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {key: (h.cumulative(), h.sum, h.count) for key, h in self.histograms.items()}
+
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+            return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+        by_name = defaultdict(list)
+        for key in counters:
+            by_name[key[0]].append(key)
+        for key in histograms:
+            by_name[key[0]].append(key)
+
+        lines = []
+        for name in sorted(by_name):
+            default_type = 'counter' if by_name[name][0] in counters else 'histogram'
+            metric_type, help_text = METRICS.get(name, (default_type, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key in sorted(by_name[name]):
+                _, labels = key
+                if key in counters:
+                    lines.append(f"{name}{label_text(labels)} {counters[key]:g}")
+                    continue
+                buckets, total, count = histograms[key]
+                for bound, n in buckets:
+                    le = '+Inf' if math.isinf(bound) else f"{bound:g}"
+                    lines.append(f"{name}_bucket{label_text(labels, [('le', le)])} {n}")
+                lines.append(f"{name}_sum{label_text(labels)} {total:g}")
+                lines.append(f"{name}_count{label_text(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, base_path):
+        """Write <base_path>.json and <base_path>.prom; return both paths"""
+        json_path, prom_path = f"{base_path}.json", f"{base_path}.prom"
+        self.to_json(json_path)
+        with open(prom_path, 'w') as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, content_type = registry.to_json().encode(), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, content_type = registry.to_prometheus().encode(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+        return self._server
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+    return _registry
@@ -1,155 +1,181 @@
 from newsapi import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
 import pandas as pd
-from datetime import datetime, timedelta
-from textblob import TextBlob
 import os
-import glob
-from dotenv import load_dotenv
+import json
+from datetime import datetime, timedelta
+from sentiment import score_with_fallback
+from data_store import DataStore
+from http_cache import ResponseCache
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
 from config import *
 
 class NewsCollector:
-    def __init__(self):
+    def __init__(self, cache_ttl=NEWS_CACHE_TTL):
+        # Real NewsAPI calls and cached responses are counted separately
         self.request_count = 0
+        self.cache_hits = 0
+        self.store = DataStore('news')
+        self.response_cache = ResponseCache(os.path.join(DATA_DIR, 'news_cache'), cache_ttl)
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
         try:
-            # Load environment variables directly
-            env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-            load_dotenv(env_path)
-            
-            # Print environment variables for debugging
-            print("\nEnvironment variables check:")
-            print(f"NEWSAPI_KEY exists: {'NEWSAPI_KEY' in os.environ}")
-            print(f"NEWSAPI_KEY value: {os.environ.get('NEWSAPI_KEY', 'Not found')[:5]}...")
-            
-            # Get API key directly from environment
-            api_key = os.environ.get('NEWSAPI_KEY')
+            # Get API key from the cached settings
+            api_key = get_settings().newsapi_key
             if not api_key:
                 raise ValueError("NewsAPI key is missing or invalid")
                 
+            # Building the client makes no request; errors surface on the first real query
             self.client = NewsApiClient(api_key=api_key)
-            
-            # Test the connection with a simple request
-            self.request_count += 1
-            print(f"\nMaking test request #{self.request_count}...")
-            test_response = self.client.get_top_headlines(q='bitcoin', language='en', page_size=1)
-            if 'status' in test_response and test_response['status'] == 'ok':
-                print("Successfully connected to NewsAPI")
-            else:
-                print(f"Test request failed: {test_response}")
-                raise ValueError("Failed to connect to NewsAPI")
                 
         except Exception as e:
             print(f"Error connecting to NewsAPI: {str(e)}")
             raise
 
     def get_existing_articles(self):
-        """Get the most recent news data file if it exists"""
+        """Load the last TIME_WINDOW_HOURS of articles from the store if it is fresh"""
         try:
-            # Create data directory if it doesn't exist
-            os.makedirs(DATA_DIR, exist_ok=True)
-            
-            # Find all news data files
-            files = glob.glob(os.path.join(DATA_DIR, 'news_data_*.csv'))
-            if files:
-                # Get the most recent file
-                latest_file = max(files, key=os.path.getctime)
-                print(f"\nFound existing news data: {latest_file}")
+            # Freshness comes from the store metadata, no data file is opened
+            latest_article_time = self.store.latest_timestamp()
+            if latest_article_time is None:
+                return pd.DataFrame()
                 
-                # Check if file is empty or too small (less than 100 bytes)
-                if os.path.getsize(latest_file) < 100:
-                    print("Existing file is empty or corrupted, will collect new data")
-                    return pd.DataFrame()
-                    
-                df = pd.read_csv(latest_file)
-                if df.empty:
-                    print("No articles found in existing file")
-                    return pd.DataFrame()
-                    
-                # Check if data is recent enough (within TIME_WINDOW_HOURS)
-                df['published_at'] = pd.to_datetime(df['published_at'])
-                latest_article_time = df['published_at'].max()
-                time_diff = datetime.now() - latest_article_time
+            time_diff = datetime.now() - latest_article_time
+            if time_diff.total_seconds() / 3600 > TIME_WINDOW_HOURS:
+                print(f"Existing data is too old ({time_diff.total_seconds()/3600:.1f} hours), will collect new data")
+                return pd.DataFrame()
                 
-                if time_diff.total_seconds() / 3600 <= TIME_WINDOW_HOURS:
-                    print(f"Loaded {len(df)} existing articles from the last {TIME_WINDOW_HOURS} hours")
-                    return df
-                else:
-                    print(f"Existing data is too old ({time_diff.total_seconds()/3600:.1f} hours), will collect new data")
-                    return pd.DataFrame()
-                    
-            return pd.DataFrame()
+            # Only the partitions covering the window are read
+            df = self.store.read_recent(TIME_WINDOW_HOURS)
+            print(f"Loaded {len(df)} existing articles from the last {TIME_WINDOW_HOURS} hours")
+            return df
         except Exception as e:
             print(f"Error loading existing articles: {str(e)}")
             return pd.DataFrame()
 
-    def get_news(self, query='bitcoin OR btc OR cryptocurrency', max_articles=100):
+    def _get_page(self, query, from_date, to_date, page, page_size, allow_request=True):
+        """Return (response, from_cache) for one page, using the TTL cache when possible.
+        
+        With allow_request=False a cache miss returns (None, False) without calling the API.
+        """
+        key = (query, from_date, to_date, page, page_size)
+        response = self.response_cache.get(key)
+        if response is not None:
+            self.cache_hits += 1
+            self.metrics.inc('cache_hits_total', cache='news')
+            print(f"\nUsing cached response for page {page} (cache hit #{self.cache_hits})")
+            return response, True
+        if not allow_request:
+            return None, False
+        
+        self.rate_limiter.acquire(NEWSAPI_HOST)
+        self.request_count += 1
+        self.metrics.inc('api_calls_total', source='news')
+        print(f"\nMaking article request #{self.request_count} (page {page})...")
+        try:
+            response = self.client.get_everything(
+                q=query,
+                from_param=from_date,
+                to=to_date,
+                language='en',
+                sort_by='relevancy',
+                page_size=page_size,
+                page=page
+            )
+        except NewsAPIException as e:
+            # The client raises on error responses; a 429 slows the shared bucket down
+            if e.get_code() == 'rateLimited':
+                self.rate_limiter.update(NEWSAPI_HOST, 429)
+            # Hand back the error body so get_news keeps the articles it already has
+            return e.exception, False
+        if response:
+            # The client only hands back the decoded JSON, so count its re-encoded size
+            self.metrics.inc('bytes_downloaded_total', len(json.dumps(response)), source='news')
+        if response and response.get('status') == 'ok':
+            self.rate_limiter.update(NEWSAPI_HOST, 200)
+            self.response_cache.put(key, response)
+        return response, False
+
+    def get_news(self, query='bitcoin OR btc OR cryptocurrency', max_articles=MAX_NEWS_ARTICLES,
+                 max_requests=NEWS_REQUEST_BUDGET):
+        """Fetch up to max_articles, paging until the results run out or max_requests real calls are spent"""
         articles = []
         try:
             # Get news from the last 24 hours
             from_date = (datetime.now() - timedelta(hours=TIME_WINDOW_HOURS)).strftime('%Y-%m-%d')
             to_date = datetime.now().strftime('%Y-%m-%d')
+            page_size = min(NEWS_PAGE_SIZE, max_articles)
             
             print(f"\nNewsAPI Request Details:")
             print(f"Query: {query}")
             print(f"From date: {from_date}")
             print(f"To date: {to_date}")
-            print(f"Max articles per request: {min(100, max_articles)}")
+            print(f"Articles per page: {page_size}, request budget: {max_requests}")
             
-            # Get news articles
-            self.request_count += 1
-            print(f"\nMaking article request #{self.request_count}...")
-            response = self.client.get_everything(
-                q=query,
-                from_param=from_date,
-                to=to_date,
-                language='en',
-                sort_by='relevancy',
-                page_size=min(100, max_articles)
-            )
-            
-            print(f"\nNewsAPI Response:")
-            print(f"Status: {response.get('status', 'No status')}")
-            total_results = response.get('totalResults', 0)
-            print(f"Total articles available: {total_results}")
-            print(f"Articles returned in this request: {len(response.get('articles', []))}")
-            print(f"Note: NewsAPI free tier limits to 100 articles per request")
-            
-            if response.get('status') == 'error':
-                print(f"API Error: {response.get('message', 'Unknown error')}")
-                return pd.DataFrame()
-            
-            if not response or 'articles' not in response:
-                print(f"Unexpected response format: {response}")
-                return pd.DataFrame()
-            
-            if response['articles']:
-                print(f"\nProcessing {len(response['articles'])} articles...")
-                for article in response['articles']:
+            page = 1
+            calls = 0
+            while len(articles) < max_articles:
+                # Cached pages are free; only real calls count against the budget
+                response, from_cache = self._get_page(query, from_date, to_date, page, page_size,
+                                                      allow_request=calls < max_requests)
+                if response is None and not from_cache and calls >= max_requests:
+                    print(f"Request budget of {max_requests} reached")
+                    break
+                if not from_cache:
+                    calls += 1
+                
+                if not response or response.get('status') == 'error':
+                    # Free-tier accounts get an error past the first 100 results; keep what we have
+                    print(f"API Error: {(response or {}).get('message', 'Unknown error')}")
+                    break
+                
+                if 'articles' not in response:
+                    print(f"Unexpected response format: {response}")
+                    break
+                
+                total_results = response.get('totalResults', 0)
+                print(f"Total articles available: {total_results}")
+                print(f"Articles returned for page {page}: {len(response['articles'])}")
+                
+                for article in response['articles'][:max_articles - len(articles)]:
                     try:
-                        # Perform sentiment analysis on title and description
-                        title_sentiment = TextBlob(article['title']).sentiment
-                        desc_sentiment = TextBlob(article['description']).sentiment if article['description'] else title_sentiment
-                        
                         articles.append({
                             'source': article['source']['name'],
                             'author': article['author'],
                             'title': article['title'],
                             'description': article['description'],
                             'url': article['url'],
-                            'published_at': article['publishedAt'],
-                            'title_sentiment_polarity': title_sentiment.polarity,
-                            'title_sentiment_subjectivity': title_sentiment.subjectivity,
-                            'description_sentiment_polarity': desc_sentiment.polarity,
-                            'description_sentiment_subjectivity': desc_sentiment.subjectivity
+                            'published_at': article['publishedAt']
                         })
                     except Exception as e:
                         print(f"Error processing article: {str(e)}")
                         continue
+                
+                # Stop on a short page or once every available result has been paged through
+                if len(response['articles']) < page_size or page * page_size >= total_results:
+                    break
+                page += 1
+            
+            if articles:
+                print(f"\nProcessing {len(articles)} articles...")
+                self.metrics.inc('rows_collected_total', len(articles), source='news')
+                
+                # Perform sentiment analysis on titles and descriptions in one batch
+                title_pol, title_sub, desc_pol, desc_sub = score_with_fallback(
+                    [article['title'] for article in articles],
+                    [article['description'] for article in articles]
+                )
+                for i, article in enumerate(articles):
+                    article['title_sentiment_polarity'] = title_pol[i]
+                    article['title_sentiment_subjectivity'] = title_sub[i]
+                    article['description_sentiment_polarity'] = desc_pol[i]
+                    article['description_sentiment_subjectivity'] = desc_sub[i]
             else:
                 print("No articles found in response")
                 
         except Exception as e:
             print(f"Error collecting news articles: {str(e)}")
-            print(f"API Key: {NEWSAPI_KEY[:5]}...")  # Print first 5 chars of API key for debugging
             
         return pd.DataFrame(articles)
 
@@ -162,12 +188,10 @@ class NewsCollector:
             articles = self.get_news()
         
         if not articles.empty:
-            # Save to CSV
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = os.path.join(DATA_DIR, f'news_data_{timestamp}.csv')
-            articles.to_csv(file_path, index=False)
+            # Append new articles to the store
+            written = self.store.append(articles)
             print(f"\nTotal articles collected: {len(articles)}")
-            print(f"Data saved to: {file_path}")
+            print(f"Stored {written} new articles in: {self.store.root}")
             
             # Print the first few articles as a sample
             print("\nSample of collected articles:")
@@ -175,6 +199,6 @@ class NewsCollector:
         else:
             print("\nNo articles were collected")
             
-        print(f"\nTotal NewsAPI requests made: {self.request_count}")
+        print(f"\nNewsAPI requests made: {self.request_count}, cached responses used: {self.cache_hits}")
         
         return articles 
\ No newline at end of file
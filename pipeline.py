@@ -0,0 +1,164 @@
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from metrics import get_metrics
+
+# Node states reported in a run's results
+OK = 'ok'
+FAILED = 'failed'
+TIMED_OUT = 'timeout'
+SKIPPED = 'skipped'
+
+NodeResult = namedtuple('NodeResult', ['status', 'value', 'error', 'seconds'])
+
+
+class Node:
+    """One pipeline step: func is called with its dependencies' results as keyword arguments"""
+
+    def __init__(self, name, func, deps=(), timeout=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+class Pipeline:
+    """Dependency graph of collection and analysis steps.
+
+    Every node whose dependencies have finished runs at once on its own
+    thread, so independent sources are fetched concurrently and a run takes
+    about as long as its slowest chain. Each node has its own timeout. A node
+    that fails or times out only causes the nodes depending on it (directly
+    or transitively) to be skipped; unrelated branches keep running.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def add(self, name, func, deps=(), timeout=None):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node '{name}'")
+        self.nodes[name] = Node(name, func, deps, timeout)
+        return self
+
+    def _validate(self):
+        for node in self.nodes.values():
+            missing = [dep for dep in node.deps if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown node(s): {', '.join(missing)}")
+
+        # Depth-first search for cycles
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'active':
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = 'active'
+            for dep in self.nodes[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+
+        for name in self.nodes:
+            visit(name, [])
+
+    def _start(self, node, results):
+        """Run a node on a daemon thread so one that hangs past its timeout cannot block exit"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        kwargs = {dep: results[dep].value for dep in node.deps}
+
+        def target():
+            try:
+                future.set_result(node.func(**kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f"pipeline-{node.name}", daemon=True).start()
+        return future
+
+    def run(self, verbose=True, concurrent=True):
+        """Run every node and return {name: NodeResult}.
+
+        With concurrent=False nodes run one at a time, which keeps per-stage
+        profiles and memory figures from mixing.
+        """
+        self._validate()
+        results = {}
+        running = {}  # future -> (node, start time)
+        pending = dict(self.nodes)
+
+        def log(message):
+            if verbose:
+                print(message)
+
+        def skip_blocked():
+            # Skip nodes whose dependencies did not succeed, repeating for transitive dependents
+            changed = True
+            while changed:
+                changed = False
+                for name, node in list(pending.items()):
+                    failed = [dep for dep in node.deps if dep in results and results[dep].status != OK]
+                    if failed:
+                        results[name] = NodeResult(SKIPPED, None, f"dependency failed: {', '.join(failed)}", 0.0)
+                        log(f"[pipeline] {name}: skipped ({results[name].error})")
+                        del pending[name]
+                        changed = True
+
+        def start_ready():
+            for name, node in list(pending.items()):
+                if not concurrent and running:
+                    return
+                if all(dep in results for dep in node.deps):
+                    del pending[name]
+                    log(f"[pipeline] {name}: started")
+                    running[self._start(node, results)] = (node, time.monotonic())
+
+        def finish(future, node, started):
+            seconds = time.monotonic() - started
+            get_metrics().observe('stage_seconds', seconds, stage=node.name)
+            error = future.exception()
+            if error is None:
+                results[node.name] = NodeResult(OK, future.result(), None, seconds)
+                log(f"[pipeline] {node.name}: done in {seconds:.1f}s")
+            else:
+                results[node.name] = NodeResult(FAILED, None, error, seconds)
+                log(f"[pipeline] {node.name}: failed after {seconds:.1f}s: {error}")
+
+        start_ready()
+        while running:
+            # Wake up for the next completion or the earliest node deadline
+            now = time.monotonic()
+            deadlines = [started + node.timeout - now for node, started in running.values() if node.timeout is not None]
+            done, _ = wait(list(running), timeout=max(0, min(deadlines)) if deadlines else None,
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                node, started = running.pop(future)
+                finish(future, node, started)
+
+            now = time.monotonic()
+            for future, (node, started) in list(running.items()):
+                if node.timeout is not None and now - started >= node.timeout:
+                    # The thread is abandoned; its result is ignored if it ever arrives
+                    del running[future]
+                    results[node.name] = NodeResult(TIMED_OUT, None, f"timed out after {node.timeout}s", now - started)
+                    log(f"[pipeline] {node.name}: timed out after {node.timeout}s")
+
+            skip_blocked()
+            start_ready()
+
+        return results
+
+
+def summarize(results):
+    """One line per node with its status and duration"""
+    lines = []
+    for name, result in results.items():
+        line = f"{name:<24} {result.status:<8} {result.seconds:6.1f}s"
+        if result.error is not None and result.status != OK:
+            line += f"  {result.error}"
+        lines.append(line)
+    return '\n'.join(lines)
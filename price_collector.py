@@ -2,70 +2,207 @@ import ccxt
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+from concurrent.futures import ThreadPoolExecutor
 from config import *
+from candle_store import CandleStore, OHLCV_COLUMNS, unfilled_ranges
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
+
+CANDLES_PER_REQUEST = 1000
 
 class PriceCollector:
-    def __init__(self):
-        self.exchange = ccxt.binance()  # Using Binance as the exchange
-        
-    def get_historical_prices(self, symbol='BTC/USDT', timeframe='1h', start_date=None):
+    def __init__(self, store=None, exchange=None, rate_limiter=None):
+        # Using Binance as the exchange; requests go through the shared rate limiter
+        # instead of ccxt's built-in one so concurrent backfill workers share one budget
+        self.exchange = exchange or ccxt.binance({'enableRateLimit': False})
+        self.store = store or CandleStore()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = get_metrics()
+        self.host = getattr(self.exchange, 'id', None) or 'exchange'
+        # ccxt's documented per-exchange limit, unless HOST_RATE_LIMITS is stricter
+        rate_limit_ms = getattr(self.exchange, 'rateLimit', 0)
+        if rate_limit_ms:
+            self.rate_limiter.cap(self.host, 1000 / rate_limit_ms)
+
+    def _fetch_ohlcv(self, symbol, timeframe, since, max_retries=3):
+        """One fetch_ohlcv call under the shared limiter, backing off on rate-limit errors"""
+        for attempt in range(max_retries):
+            self.rate_limiter.acquire(self.host)
+            self.metrics.inc('api_calls_total', source='price')
+            try:
+                chunk = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=CANDLES_PER_REQUEST)
+            except Exception as e:
+                # ccxt raises RateLimitExceeded/DDoSProtection for 429/418 responses
+                if type(e).__name__ not in ('RateLimitExceeded', 'DDoSProtection') or attempt == max_retries - 1:
+                    raise
+                print(f"Rate limited by {self.host}, backing off: {str(e)}")
+                self.metrics.inc('retries_total', source='price')
+                self.rate_limiter.update(self.host, 429, getattr(self.exchange, 'last_response_headers', None))
+                continue
+            self.rate_limiter.update(self.host, 200, getattr(self.exchange, 'last_response_headers', None))
+            body = getattr(self.exchange, 'last_http_response', None)
+            if isinstance(body, str):
+                self.metrics.inc('bytes_downloaded_total', len(body), source='price')
+            return chunk
+
+    def _fetch_range(self, symbol, timeframe, since, until=None, quiet=False):
+        """Fetch candles from since (ms) up to until (ms, default now) in 1000-candle chunks"""
+        if until is None:
+            until = int(datetime.now().timestamp() * 1000)
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+
+        ohlcv = []
+        while since <= until:
+            # Fetch data in chunks of up to 1000 candles
+            chunk = self._fetch_ohlcv(symbol, timeframe, since)
+            if not chunk:
+                break
+
+            ohlcv.extend(candle for candle in chunk if candle[0] <= until)
+            since = chunk[-1][0] + 1  # Next timestamp after the last candle
+
+            # Exchanges may page below 1000, so a short chunk only ends the walk once it reaches until
+            if chunk[-1][0] + timeframe_ms > until:
+                break
+
+            if not quiet:
+                print(f"Fetched {len(chunk)} candles up to {datetime.fromtimestamp(since/1000)}")
+
+        self.metrics.inc('rows_collected_total', len(ohlcv), source='price')
+        return ohlcv
+
+    def backfill_range(self, symbol, timeframe, since, until=None, max_workers=4):
+        """Fetch [since, until] (ms) as independent sub-ranges on a bounded worker pool.
+
+        Each sub-range covers one request's worth of candles, so a multi-year
+        backfill becomes many concurrent requests instead of a serial walk.
+        Results are merged and deduplicated by timestamp.
+        """
+        if until is None:
+            until = int(datetime.now().timestamp() * 1000)
+        if since > until:
+            return []
+
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        span = CANDLES_PER_REQUEST * timeframe_ms
+
+        # Align to candle boundaries so each sub-range is exactly one full request
+        since = -(-since // timeframe_ms) * timeframe_ms
+        ranges = [(start, min(start + span - timeframe_ms, until)) for start in range(since, until + 1, span)]
+
+        print(f"Backfilling {len(ranges)} sub-ranges with {max_workers} workers...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = executor.map(
+                lambda bounds: self._fetch_range(symbol, timeframe, bounds[0], bounds[1], quiet=True),
+                ranges
+            )
+            candles = {}
+            for chunk in chunks:
+                for candle in chunk:
+                    candles[candle[0]] = candle
+
+        ohlcv = [candles[ts] for ts in sorted(candles)]
+        print(f"Backfilled {len(ohlcv)} candles")
+        return ohlcv
+
+    def fetch_closed_candles(self, symbol='BTC/USDT', timeframe='1h', since=None):
+        """Fetch candles from since (ms) that have fully closed, storing them as they arrive"""
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        now = int(datetime.now().timestamp() * 1000)
+        if since is None:
+            since = now - 2 * timeframe_ms
+        closed = [candle for candle in self._fetch_range(symbol, timeframe, since, quiet=True)
+                  if candle[0] + timeframe_ms <= now]
+        if closed:
+            self.store.append(symbol, timeframe, closed)
+        return closed
+
+    def get_historical_prices(self, symbol='BTC/USDT', timeframe='1h', start_date=None,
+                              backfill_workers=PRICE_BACKFILL_WORKERS):
         try:
             if start_date is None:
                 start_date = datetime(2025, 1, 1)
-            
+
             print(f"\nFetching Bitcoin price data from {start_date} to present...")
-            
+
             # Convert start_date to milliseconds timestamp
             since = int(start_date.timestamp() * 1000)
-            
-            # Get OHLCV data
-            ohlcv = []
-            while True:
-                # Fetch data in chunks of 1000 candles
-                chunk = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
-                if not chunk:
-                    break
-                
-                ohlcv.extend(chunk)
-                since = chunk[-1][0] + 1  # Next timestamp after the last candle
-                
-                # If we've reached the present, stop
-                if since > int(datetime.now().timestamp() * 1000):
-                    break
-                
-                print(f"Fetched {len(chunk)} candles up to {datetime.fromtimestamp(since/1000)}")
-            
+            timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+
+            def fetch_bulk(start, end=None):
+                # Large ranges (empty store or earlier start) go through the parallel backfill
+                if backfill_workers > 1:
+                    return self.backfill_range(symbol, timeframe, start, end, max_workers=backfill_workers)
+                return self._fetch_range(symbol, timeframe, start, end)
+
+            stored = self.store.load(symbol, timeframe)
+            if stored.empty:
+                # Nothing stored yet, so fetch the whole range
+                fetched = fetch_bulk(since)
+                if fetched:
+                    # Remember what the exchange has nothing for (e.g. before the pair was listed)
+                    self.store.mark_gaps(symbol, timeframe,
+                                         unfilled_ranges(since, fetched[-1][0], fetched, timeframe_ms))
+                stored = self.store.append(symbol, timeframe, fetched)
+            else:
+                first_stored = int(stored['timestamp'].iloc[0])
+                last_stored = int(stored['timestamp'].iloc[-1])
+                fetched = []
+                unfilled = []
+
+                # Head: requested range starts before anything we have, minus what is known to be empty
+                head_end = first_stored - 1
+                for gap_start, gap_end in sorted(self.store.known_gaps(symbol, timeframe), reverse=True):
+                    if gap_start <= head_end <= gap_end:
+                        head_end = gap_start - 1
+                if since <= head_end:
+                    head_candles = fetch_bulk(since, head_end)
+                    unfilled.extend(unfilled_ranges(since, head_end, head_candles, timeframe_ms))
+                    fetched.extend(head_candles)
+
+                # Gaps: holes between stored candles that were never filled
+                for gap_start, gap_end in self.store.find_gaps(stored, symbol, timeframe, timeframe_ms, since=since):
+                    print(f"Filling gap {datetime.fromtimestamp(gap_start/1000)} to {datetime.fromtimestamp(gap_end/1000)}")
+                    gap_candles = self._fetch_range(symbol, timeframe, gap_start, gap_end)
+                    # Whatever the exchange did not fill is recorded, so only new holes are fetched next run
+                    unfilled.extend(unfilled_ranges(gap_start, gap_end, gap_candles, timeframe_ms))
+                    fetched.extend(gap_candles)
+                if unfilled:
+                    self.store.mark_gaps(symbol, timeframe, unfilled)
+
+                # Tail: refetch from the last stored candle, which may have been incomplete
+                fetched.extend(self._fetch_range(symbol, timeframe, last_stored))
+
+                print(f"Fetched {len(fetched)} new candles, {len(stored)} already stored")
+                stored = self.store.append(symbol, timeframe, fetched)
+
             # Convert to DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = stored[stored['timestamp'] >= since][OHLCV_COLUMNS].reset_index(drop=True)
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
+
             # Calculate price changes
             df['price_change'] = df['close'].pct_change() * 100
-            
+
             return df
-            
+
         except Exception as e:
             print(f"Error fetching price data: {str(e)}")
             return pd.DataFrame()
-    
-    def collect_bitcoin_prices(self, start_date=None):
-        print("\nFetching fresh Bitcoin price data...")
-        prices = self.get_historical_prices(start_date=start_date)
-        
+
+    def collect_bitcoin_prices(self, start_date=None, backfill_workers=PRICE_BACKFILL_WORKERS):
+        print("\nUpdating Bitcoin price data...")
+        prices = self.get_historical_prices(start_date=start_date, backfill_workers=backfill_workers)
+
         if not prices.empty:
-            # Save to CSV
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = os.path.join(DATA_DIR, f'price_data_{start_date.date()}_to_{datetime.now().date()}_{timestamp}.csv')
-            prices.to_csv(file_path, index=False)
             print(f"Successfully collected {len(prices)} hours of price data")
-            print(f"Data saved to: {file_path}")
-            
+            print(f"Data stored in: {self.store.path('BTC/USDT', '1h')}")
+
             # Print sample data
             print("\nSample of price data:")
             print(prices[['timestamp', 'close', 'price_change']].head())
             print("\n...")
             print(prices[['timestamp', 'close', 'price_change']].tail())
-            
+
             # Print summary statistics
             print("\nPrice Data Summary:")
             print(f"Date range: {prices['timestamp'].min()} to {prices['timestamp'].max()}")
@@ -75,5 +212,5 @@ class PriceCollector:
             print(f"Minimum price: ${prices['close'].min():.2f}")
         else:
             print("Error: No price data was collected")
-        
-        return prices 
\ No newline at end of file
+
+        return prices
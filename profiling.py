@@ -0,0 +1,117 @@
+"""Opt-in per-stage CPU and allocation profiling for the pipeline.
+
+Only imported when profiling is requested (main.py --profile), so normal runs
+never load cProfile or start tracemalloc and pay nothing for it.
+"""
+import os
+import io
+import time
+import pstats
+import cProfile
+import functools
+import tracemalloc
+from datetime import datetime
+from config import *
+
+
+class StageProfiler:
+    """Wraps stage functions with cProfile and tracemalloc and writes one report per stage.
+
+    Each report lists the slowest functions by cumulative and own time, the
+    stage's wall and CPU time, its peak traced memory and the source lines
+    that allocated the most. The raw profile is saved next to it as .prof for
+    snakeviz or pstats. tracemalloc sees every thread, so stages should run
+    one at a time (Pipeline.run(concurrent=False)) for clean memory figures.
+    """
+
+    def __init__(self, output_dir, top=PROFILE_TOP_N, frames=PROFILE_TRACE_FRAMES):
+        self.output_dir = output_dir
+        self.top = top
+        self.frames = frames
+        self.stages = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def wrap(self, name, func):
+        """Return func profiled as stage `name`"""
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            return self.profile(name, func, *args, **kwargs)
+        return profiled
+
+    def instrument(self, pipeline):
+        """Wrap every node of a Pipeline in place"""
+        for node in pipeline.nodes.values():
+            node.func = self.wrap(node.name, node.func)
+        return pipeline
+
+    def profile(self, name, func, *args, **kwargs):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = tracemalloc.get_traced_memory()[1] - start_memory
+            after = tracemalloc.take_snapshot()
+            self._write_report(name, profiler, wall, cpu, peak,
+                               self._own(after).compare_to(self._own(before), 'lineno'))
+
+    @staticmethod
+    def _own(snapshot):
+        # Leave out the profiler's own bookkeeping
+        return snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    def _write_report(self, name, profiler, wall, cpu, peak, allocations):
+        base = os.path.join(self.output_dir, name)
+        profiler.dump_stats(f"{base}.prof")
+
+        out = io.StringIO()
+        out.write(f"Stage: {name}\n")
+        out.write(f"Wall time: {wall:.3f}s, CPU time: {cpu:.3f}s\n")
+        out.write(f"Peak traced memory: {peak / 2**20:.1f} MiB\n")
+
+        stats = pstats.Stats(profiler, stream=out)
+        stats.strip_dirs()
+        out.write(f"\nTop {self.top} functions by cumulative time:\n")
+        stats.sort_stats('cumulative').print_stats(self.top)
+        out.write(f"\nTop {self.top} functions by own time:\n")
+        stats.sort_stats('tottime').print_stats(self.top)
+
+        out.write(f"\nTop {self.top} allocation sites (net growth during the stage):\n")
+        for stat in allocations[:self.top]:
+            frame = stat.traceback[0]
+            out.write(f"{stat.size_diff / 2**10:10.1f} KiB {stat.count_diff:+9d} blocks  {frame.filename}:{frame.lineno}\n")
+
+        with open(f"{base}.txt", 'w') as f:
+            f.write(out.getvalue())
+        self.stages.append((name, wall, cpu, peak, f"{base}.txt"))
+
+    def summary(self):
+        """One line per profiled stage, also written to summary.txt"""
+        lines = [f"{'stage':<24} {'wall':>8} {'cpu':>8} {'peak MiB':>9}  report"]
+        for name, wall, cpu, peak, path in self.stages:
+            lines.append(f"{name:<24} {wall:7.2f}s {cpu:7.2f}s {peak / 2**20:9.1f}  {path}")
+        text = '\n'.join(lines)
+        with open(os.path.join(self.output_dir, 'summary.txt'), 'w') as f:
+            f.write(text + '\n')
+        return text
+
+
+def create_profiler(base_dir=None):
+    """A StageProfiler writing to a fresh timestamped directory"""
+    base_dir = base_dir or os.path.join(RESULTS_DIR, 'profiles')
+    return StageProfiler(os.path.join(base_dir, datetime.now().strftime('%Y%m%d_%H%M%S')))
@@ -0,0 +1,340 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from urllib.parse import urlparse
+from metrics import get_metrics
+
+
+class TokenBucket:
+    """Token-bucket limiter allowing `rate` requests per second with bursts of `burst`.
+
+    Callers reserve a token before waiting, so concurrent callers (threads or
+    coroutines) are served in arrival order and never exceed the rate together.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # `updated` lies in the future while a block is pending; nothing refills before it
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens >= 0 and self.updated <= now:
+                return 0.0
+            return max(self.updated - now, 0.0) + max(-self.tokens, 0.0) / self.rate
+
+    def acquire(self):
+        """Block until a request is allowed"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request is allowed"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def _header(headers, *names):
+    """First present header among names (case-insensitive), as a float"""
+    if not headers:
+        return None
+    lowered = {str(k).lower(): v for k, v in dict(headers).items()}
+    for name in names:
+        value = lowered.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class AdaptiveBucket(TokenBucket):
+    """Token bucket for one host that adapts to what the upstream reports.
+
+    The configured rate is the ceiling. Remaining-quota/reset headers pace
+    requests so the remaining quota lasts until the reset. An exhausted quota
+    or a Retry-After blocks the host until then. A 429 halves the rate and
+    backs off exponentially, and each success creeps the rate back up.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=None, window=60.0):
+        super().__init__(rate, burst)
+        self.ceiling = float(rate)
+        self.min_rate = float(min_rate) if min_rate is not None else self.ceiling / 20
+        self.window = window
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.throttled = 0
+        self.requests = deque()
+        self.quota_limit = None
+        self.quota_remaining = None
+
+    def reserve(self):
+        wait = super().reserve()
+        with self._lock:
+            now = time.monotonic()
+            self.requests.append(now + wait)
+            while self.requests and self.requests[0] < now - self.window:
+                self.requests.popleft()
+            return wait
+
+    def _set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.ceiling, max(self.min_rate, rate))
+
+    def _block_for(self, seconds):
+        """Hold new reservations until the block ends, then release them one per 1/rate"""
+        with self._lock:
+            now = time.monotonic()
+            until = now + seconds
+            if until <= self.blocked_until:
+                return
+            self.blocked_until = until
+            self._refill(now)
+            # Refilling restarts when the block ends, with a single token rather than a full burst
+            self.updated = max(self.updated, until)
+            self.tokens = min(self.tokens, 1.0)
+
+    def update_quota(self, remaining, reset_in, limit=None):
+        """Pace requests so `remaining` calls last the `reset_in` seconds until the quota resets"""
+        self.quota_remaining = remaining
+        if limit is not None:
+            self.quota_limit = limit
+        if remaining is None or reset_in is None:
+            return
+        reset_in = max(reset_in, 0.0)
+        if remaining < 1:
+            self._block_for(reset_in)
+        elif reset_in > 0:
+            self._set_rate(remaining / reset_in)
+
+    def update_from_headers(self, headers):
+        """Read Retry-After and the common remaining/limit/reset header families.
+
+        Returns True when the headers reported a remaining quota, which then sets the pace.
+        """
+        retry_after = _header(headers, 'retry-after')
+        if retry_after is not None:
+            self._block_for(retry_after)
+
+        remaining = _header(headers, 'x-ratelimit-remaining', 'x-rate-limit-remaining', 'ratelimit-remaining')
+        limit = _header(headers, 'x-ratelimit-limit', 'x-rate-limit-limit', 'ratelimit-limit')
+        reset = _header(headers, 'x-ratelimit-reset', 'x-rate-limit-reset', 'ratelimit-reset')
+        if remaining is None and limit is not None:
+            used = _header(headers, 'x-ratelimit-used')
+            if used is not None:
+                remaining = limit - used
+        if reset is not None and reset > 1e9:
+            # Twitter-style headers give an epoch timestamp rather than seconds left
+            reset = reset - time.time()
+        if remaining is None:
+            return False
+        self.update_quota(remaining, reset, limit)
+        return True
+
+    def on_success(self, increase=True):
+        """Additive increase back toward the ceiling after a good response"""
+        with self._lock:
+            self.consecutive_throttles = 0
+            if increase and self.rate < self.ceiling:
+                self._refill(time.monotonic())
+                self.rate = min(self.ceiling, self.rate + self.ceiling / 20)
+
+    def on_throttled(self, retry_after=None):
+        """Multiplicative decrease and a block after a 429"""
+        with self._lock:
+            self.throttled += 1
+            self.consecutive_throttles += 1
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after is None:
+                retry_after = min(300.0, (2 ** (self.consecutive_throttles - 1)) / self.rate)
+        self._block_for(retry_after)
+
+    def utilisation(self):
+        """Share of the ceiling used over the last window (or of the reported quota, if higher)"""
+        with self._lock:
+            now = time.monotonic()
+            while self.requests and self.requests[0] < now - self.window:
+                self.requests.popleft()
+            recent = sum(1 for t in self.requests if t <= now)
+        used = recent / (self.ceiling * self.window)
+        if self.quota_limit and self.quota_remaining is not None:
+            used = max(used, 1 - self.quota_remaining / self.quota_limit)
+        return min(used, 1.0)
+
+    def stats(self):
+        return {
+            'rate': self.rate,
+            'ceiling': self.ceiling,
+            'utilisation': self.utilisation(),
+            'throttled': self.throttled,
+            'blocked_for': max(0.0, self.blocked_until - time.monotonic()),
+            'quota_remaining': self.quota_remaining
+        }
+
+
+class RateLimiter:
+    """Registry of per-host adaptive buckets shared by every collector.
+
+    Collectors call acquire(host) before each request and report the
+    outcome with update(host, status, headers), so all threads and crawls
+    hitting the same API share one budget.
+    """
+
+    def __init__(self, limits=None, default=(1.0, 1)):
+        self.limits = dict(limits or {})
+        self.default = default
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(target):
+        """Accept a URL or a bare host name"""
+        if '://' in target:
+            return urlparse(target).hostname or target
+        return target
+
+    def configure(self, target, rate, burst=1):
+        """Set (or replace) a host's ceiling, returning its bucket"""
+        host = self.host_of(target)
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self.buckets[host] = AdaptiveBucket(rate, burst)
+            return self.buckets[host]
+
+    def cap(self, target, rate, burst=1):
+        """Hold a host to at most `rate` requests per second, keeping a stricter configured ceiling.
+
+        The burst of a host HOST_RATE_LIMITS already configures is kept.
+        """
+        host = self.host_of(target)
+        with self._lock:
+            if host in self.limits:
+                configured_rate, burst = self.limits[host]
+                rate = min(rate, configured_rate)
+            self.limits[host] = (rate, burst)
+            bucket = self.buckets.get(host)
+        if bucket is not None and bucket.ceiling > rate:
+            bucket.ceiling = float(rate)
+            bucket._set_rate(bucket.rate)
+
+    def bucket(self, target):
+        host = self.host_of(target)
+        with self._lock:
+            if host not in self.buckets:
+                rate, burst = self.limits.get(host, self.default)
+                self.buckets[host] = AdaptiveBucket(rate, burst)
+            return self.buckets[host]
+
+    def _record_wait(self, target, wait):
+        if wait > 0:
+            host = self.host_of(target)
+            get_metrics().inc('rate_limit_waits_total', host=host)
+            get_metrics().inc('rate_limit_wait_seconds_total', wait, host=host)
+
+    def acquire(self, target):
+        """Block until a request to target's host is allowed"""
+        wait = self.bucket(target).acquire()
+        self._record_wait(target, wait)
+        return wait
+
+    async def acquire_async(self, target):
+        wait = await self.bucket(target).acquire_async()
+        self._record_wait(target, wait)
+        return wait
+
+    def update(self, target, status=None, headers=None):
+        """Feed a response's status code and headers back into the host's bucket"""
+        bucket = self.bucket(target)
+        quota_paced = bucket.update_from_headers(headers)
+        if status == 429:
+            bucket.on_throttled(_header(headers, 'retry-after'))
+        elif status is not None and status < 400:
+            # The quota headers already set the rate; creeping up would overrun them
+            bucket.on_success(increase=not quota_paced)
+
+    def update_quota(self, target, remaining, reset_in, limit=None):
+        """Report quota figures a client library exposes instead of raw headers"""
+        self.bucket(target).update_quota(remaining, reset_in, limit)
+
+    def report_exception(self, target, error):
+        """Feed an HTTP error raised by a client library (tweepy, prawcore, pytrends) back in"""
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+        if status is not None:
+            self.update(target, status, getattr(response, 'headers', None))
+        return status
+
+    def paced(self, iterable, target, page_size, after_page=None):
+        """Iterate a lazily paged listing, acquiring before each page is fetched.
+
+        Client libraries like praw fetch page_size items per request behind a
+        plain iterator; this acquires a token before every page_size-th item is
+        requested and calls after_page() once each page has been consumed.
+        """
+        iterator = iter(iterable)
+        count = 0
+        while True:
+            if count % page_size == 0:
+                self.acquire(target)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            count += 1
+            if count % page_size == 0 and after_page is not None:
+                after_page()
+            yield item
+
+    def utilisation(self):
+        """{host: fraction of its ceiling in use}"""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {host: bucket.utilisation() for host, bucket in buckets.items()}
+
+    def summary(self):
+        with self._lock:
+            buckets = dict(self.buckets)
+        lines = []
+        for host, bucket in sorted(buckets.items()):
+            stats = bucket.stats()
+            lines.append(
+                f"{host}: {stats['utilisation']:.0%} of {stats['ceiling']:.2f} req/s, "
+                f"current rate {stats['rate']:.2f} req/s, {stats['throttled']} throttled"
+            )
+        return '\n'.join(lines)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter configured from HOST_RATE_LIMITS"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            from config import HOST_RATE_LIMITS
+            _limiter = RateLimiter(HOST_RATE_LIMITS)
+    return _limiter
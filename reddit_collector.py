@@ -1,17 +1,21 @@
 import praw
 import pandas as pd
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import os
-import glob
+from sentiment import score_with_fallback
+import time
+from data_store import DataStore
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
 from config import *
 
+SUBREDDITS = ['Bitcoin', 'CryptoCurrency', 'BitcoinMarkets']
+
 class RedditCollector:
     def __init__(self):
         try:
             self.reddit = praw.Reddit(
-                client_id=REDDIT_CLIENT_ID,
-                client_secret=REDDIT_CLIENT_SECRET,
+                client_id=get_settings().reddit_client_id,
+                client_secret=get_settings().reddit_client_secret,
                 user_agent=f"BitcoinSentimentAnalyzer/1.0 by /u/your_reddit_username"  # Replace with your Reddit username
             )
             # Test the connection
@@ -21,49 +25,33 @@ class RedditCollector:
             print(f"Error connecting to Reddit API: {str(e)}")
             print("Please check your credentials in the .env file")
             raise
+        self.store = DataStore('reddit')
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
         
     def get_existing_posts(self):
-        """Get the most recent Reddit data file if it exists"""
+        """Load the last TIME_WINDOW_HOURS of posts from the store if it is fresh"""
         try:
-            # Create data directory if it doesn't exist
-            os.makedirs(DATA_DIR, exist_ok=True)
-            
-            # Find all reddit data files
-            files = glob.glob(os.path.join(DATA_DIR, 'reddit_data_*.csv'))
-            if files:
-                # Get the most recent file
-                latest_file = max(files, key=os.path.getctime)
-                print(f"\nFound existing Reddit data: {latest_file}")
+            # Freshness comes from the store metadata, no data file is opened
+            latest_post_time = self.store.latest_timestamp()
+            if latest_post_time is None:
+                return pd.DataFrame()
                 
-                # Check if file is empty or too small (less than 100 bytes)
-                if os.path.getsize(latest_file) < 100:
-                    print("Existing file is empty or corrupted, will collect new data")
-                    return pd.DataFrame()
-                    
-                df = pd.read_csv(latest_file)
-                if df.empty:
-                    print("No posts found in existing file")
-                    return pd.DataFrame()
-                    
-                # Check if data is recent enough (within TIME_WINDOW_HOURS)
-                df['created_at'] = pd.to_datetime(df['created_at'])
-                latest_post_time = df['created_at'].max()
-                time_diff = datetime.now() - latest_post_time
+            time_diff = datetime.now() - latest_post_time
+            if time_diff.total_seconds() / 3600 > TIME_WINDOW_HOURS:
+                print(f"Existing data is too old ({time_diff.total_seconds()/3600:.1f} hours), will collect new data")
+                return pd.DataFrame()
                 
-                if time_diff.total_seconds() / 3600 <= TIME_WINDOW_HOURS:
-                    print(f"Loaded {len(df)} existing posts from the last {TIME_WINDOW_HOURS} hours")
-                    return df
-                else:
-                    print(f"Existing data is too old ({time_diff.total_seconds()/3600:.1f} hours), will collect new data")
-                    return pd.DataFrame()
-                    
-            return pd.DataFrame()
+            # Only the partitions covering the window are read
+            df = self.store.read_recent(TIME_WINDOW_HOURS)
+            print(f"Loaded {len(df)} existing posts from the last {TIME_WINDOW_HOURS} hours")
+            return df
         except Exception as e:
             print(f"Error loading existing posts: {str(e)}")
             return pd.DataFrame()
         
-    def get_posts(self, subreddit_name, max_posts=MAX_REDDIT_POSTS):
-        posts = []
+    def iter_posts(self, subreddit_name, max_posts=MAX_REDDIT_POSTS):
+        """Yield raw post records from a subreddit's listing as they arrive"""
         try:
             subreddit = self.reddit.subreddit(subreddit_name)
             print(f"Accessing subreddit: r/{subreddit_name}")
@@ -71,23 +59,20 @@ class RedditCollector:
             # Get posts from the last 24 hours
             since_date = datetime.now() - timedelta(hours=TIME_WINDOW_HOURS)
             
-            for post in subreddit.new(limit=max_posts):
+            # The listing fetches 100 posts per request; pace each page through the shared limiter
+            listing = self.rate_limiter.paced(subreddit.new(limit=max_posts), REDDIT_API_HOST, 100,
+                                              after_page=self._report_limits)
+            listed = 0
+            for post in listing:
+                listed += 1
+                if listed % 100 == 1:
+                    # praw requests the next page every 100 posts
+                    self.metrics.inc('api_calls_total', source='reddit')
                 if datetime.fromtimestamp(post.created_utc) < since_date:
                     continue
-                    
-                # Perform sentiment analysis on title and selftext
-                title_sentiment = TextBlob(post.title).sentiment
-                text_sentiment = TextBlob(post.selftext).sentiment if post.selftext else title_sentiment
                 
-                # Print sample sentiment analysis
-                if len(posts) < 3:  # Show first 3 posts as examples
-                    print(f"\nSample Post Analysis:")
-                    print(f"Title: {post.title}")
-                    print(f"Title Sentiment: Polarity={title_sentiment.polarity:.3f}, Subjectivity={title_sentiment.subjectivity:.3f}")
-                    if post.selftext:
-                        print(f"Text Sentiment: Polarity={text_sentiment.polarity:.3f}, Subjectivity={text_sentiment.subjectivity:.3f}")
-                
-                posts.append({
+                self.metrics.inc('rows_collected_total', source='reddit')
+                yield {
                     'id': post.id,
                     'created_at': datetime.fromtimestamp(post.created_utc),
                     'title': post.title,
@@ -95,28 +80,99 @@ class RedditCollector:
                     'author': post.author.name if post.author else '[deleted]',
                     'score': post.score,
                     'num_comments': post.num_comments,
-                    'url': post.url,
-                    'title_sentiment_polarity': title_sentiment.polarity,
-                    'title_sentiment_subjectivity': title_sentiment.subjectivity,
-                    'text_sentiment_polarity': text_sentiment.polarity,
-                    'text_sentiment_subjectivity': text_sentiment.subjectivity
-                })
+                    'url': post.url
+                }
                 
         except Exception as e:
+            self.rate_limiter.report_exception(REDDIT_API_HOST, e)
             print(f"Error collecting posts from r/{subreddit_name}: {str(e)}")
             print("Please check if the subreddit exists and is accessible")
-            
+    
+    def _report_limits(self):
+        """Pass praw's view of the remaining Reddit quota to the shared limiter"""
+        limits = getattr(self.reddit.auth, 'limits', None) or {}
+        if limits.get('remaining') is not None and limits.get('reset_timestamp'):
+            self.rate_limiter.update_quota(REDDIT_API_HOST, limits['remaining'], limits['reset_timestamp'] - time.time())
+    
+    def get_posts(self, subreddit_name, max_posts=MAX_REDDIT_POSTS):
+        posts = list(self.iter_posts(subreddit_name, max_posts))
+        
+        # Score all titles and selftexts in one batch once the listing is done
+        self._add_sentiment(posts)
         return pd.DataFrame(posts)
     
-    def collect_bitcoin_posts(self):
+    def stream_posts(self, subreddits=SUBREDDITS, batch_size=REDDIT_BATCH_SIZE, max_posts=MAX_REDDIT_POSTS):
+        """Yield scored micro-batches of at most batch_size posts across subreddits.
+        
+        Only one batch is held in memory at a time, whatever max_posts is.
+        """
+        first = True
+        for subreddit in subreddits:
+            batch = []
+            for post in self.iter_posts(subreddit, max_posts):
+                batch.append(post)
+                if len(batch) >= batch_size:
+                    yield self._add_sentiment(batch, samples=3 if first else 0)
+                    first = False
+                    batch = []
+            if batch:
+                yield self._add_sentiment(batch, samples=3 if first else 0)
+                first = False
+    
+    def ingest_bitcoin_posts(self, batch_size=REDDIT_BATCH_SIZE):
+        """Stream posts into the store batch by batch; return (seen, written) counts"""
+        seen = written = 0
+        for batch in self.stream_posts(batch_size=batch_size):
+            seen += len(batch)
+            # Each batch is durable as soon as it is scored, so a crash only loses the current one
+            written += self.store.append(pd.DataFrame(batch))
+            print(f"Stored batch of {len(batch)} posts ({written} new so far)")
+        return seen, written
+    
+    def _add_sentiment(self, posts, samples=3):
+        """Attach title/text sentiment to post records, scoring the batch at once"""
+        if not posts:
+            return posts
+        
+        title_pol, title_sub, text_pol, text_sub = score_with_fallback(
+            [post['title'] for post in posts],
+            [post['text'] for post in posts]
+        )
+        for i, post in enumerate(posts):
+            post['title_sentiment_polarity'] = title_pol[i]
+            post['title_sentiment_subjectivity'] = title_sub[i]
+            post['text_sentiment_polarity'] = text_pol[i]
+            post['text_sentiment_subjectivity'] = text_sub[i]
+        
+        # Print sample sentiment analysis
+        for post in posts[:samples]:  # Show first few posts as examples
+            print(f"\nSample Post Analysis:")
+            print(f"Title: {post['title']}")
+            print(f"Title Sentiment: Polarity={post['title_sentiment_polarity']:.3f}, Subjectivity={post['title_sentiment_subjectivity']:.3f}")
+            if post['text']:
+                print(f"Text Sentiment: Polarity={post['text_sentiment_polarity']:.3f}, Subjectivity={post['text_sentiment_subjectivity']:.3f}")
+        return posts
+    
+    def collect_bitcoin_posts(self, stream=True):
         # First try to get existing posts
         all_posts = self.get_existing_posts()
         
+        if all_posts.empty and stream:
+            print("\nNo existing Reddit data found or data is too old. Streaming new posts into the store...")
+            seen, written = self.ingest_bitcoin_posts()
+            if not seen:
+                print("\nNo posts were collected from any subreddit")
+                return pd.DataFrame()
+            print(f"\nTotal posts seen: {seen}")
+            print(f"Stored {written} new posts in: {self.store.root}")
+            
+            # The combined DataFrame is only built here, from the store
+            return self.store.read_recent(TIME_WINDOW_HOURS)
+        
         if all_posts.empty:
             print("\nNo existing Reddit data found or data is too old. Attempting to collect new posts...")
-            subreddits = ['Bitcoin', 'CryptoCurrency', 'BitcoinMarkets']
             
-            for subreddit in subreddits:
+            for subreddit in SUBREDDITS:
                 print(f"\nCollecting posts from r/{subreddit}")
                 posts = self.get_posts(subreddit)
                 if not posts.empty:
@@ -129,12 +185,10 @@ class RedditCollector:
             # Remove duplicates
             all_posts = all_posts.drop_duplicates(subset=['id'])
             
-            # Save to CSV
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = os.path.join(DATA_DIR, f'reddit_data_{timestamp}.csv')
-            all_posts.to_csv(file_path, index=False)
+            # Append new posts to the store
+            written = self.store.append(all_posts)
             print(f"\nTotal posts collected: {len(all_posts)}")
-            print(f"Data saved to: {file_path}")
+            print(f"Stored {written} new posts in: {self.store.root}")
         else:
             print("\nNo posts were collected from any subreddit")
         
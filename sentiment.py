@@ -0,0 +1,110 @@
+import os
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from metrics import get_metrics
+
+# Below this many unique texts the process pool costs more than it saves
+PARALLEL_THRESHOLD = 200
+CHUNK_SIZE = 128
+
+_executor = None
+_executor_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_executor(max_workers=None):
+    """Return the shared scoring pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # The pool is first needed from pipeline threads, and forking a
+            # threaded process can copy held locks into the workers
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                            mp_context=multiprocessing.get_context(method))
+    return _executor
+
+
+def get_cache():
+    """Return the shared on-disk sentiment cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from sentiment_cache import SentimentCache
+            _cache = SentimentCache()
+    return _cache
+
+
+def _score_chunk(texts):
+    """Score a list of texts in a worker process"""
+    # Imported here so loading this module does not pull in textblob/nltk
+    from textblob import TextBlob
+    results = []
+    for text in texts:
+        sentiment = TextBlob(text).sentiment
+        results.append((sentiment.polarity, sentiment.subjectivity))
+    return results
+
+
+def score_texts(texts, max_workers=None, use_cache=True):
+    """Score a batch of texts, returning (polarity, subjectivity) arrays.
+
+    Duplicate texts are scored once, and texts already in the on-disk cache
+    are not scored at all. Large batches are split across a process pool so
+    scoring runs on all cores and off the collectors' network loops.
+    Missing (non-string) texts score as NaN.
+    """
+    texts = list(texts)
+    unique = list(dict.fromkeys(text for text in texts if isinstance(text, str)))
+
+    cache = get_cache() if use_cache else None
+    scores = cache.get_many(unique) if cache else {}
+    pending = [text for text in unique if text not in scores]
+
+    metrics = get_metrics()
+    metrics.inc('sentiment_texts_total', len(texts))
+    metrics.inc('sentiment_scored_total', len(pending))
+    if scores:
+        metrics.inc('cache_hits_total', len(scores), cache='sentiment')
+
+    if len(pending) >= PARALLEL_THRESHOLD:
+        chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+        fresh = []
+        for chunk_scores in _get_executor(max_workers).map(_score_chunk, chunks):
+            fresh.extend(chunk_scores)
+    else:
+        fresh = _score_chunk(pending)
+
+    fresh_scores = dict(zip(pending, fresh))
+    if cache:
+        cache.put_many(fresh_scores)
+    scores.update(fresh_scores)
+
+    polarity = np.full(len(texts), np.nan)
+    subjectivity = np.full(len(texts), np.nan)
+    for i, text in enumerate(texts):
+        if isinstance(text, str):
+            polarity[i], subjectivity[i] = scores[text]
+    return polarity, subjectivity
+
+
+def score_with_fallback(primary_texts, secondary_texts, max_workers=None):
+    """Score paired texts in one batch, using the primary score where a secondary text is empty.
+
+    Mirrors the collectors' "text sentiment falls back to title sentiment"
+    rule. Returns (primary_polarity, primary_subjectivity,
+    secondary_polarity, secondary_subjectivity).
+    """
+    primary_texts = list(primary_texts)
+    secondary_texts = [text if text else None for text in secondary_texts]
+    polarity, subjectivity = score_texts(primary_texts + secondary_texts, max_workers)
+    n = len(primary_texts)
+    primary_pol, secondary_pol = polarity[:n], polarity[n:]
+    primary_sub, secondary_sub = subjectivity[:n], subjectivity[n:]
+    missing = np.array([text is None for text in secondary_texts], dtype=bool)
+    secondary_pol[missing] = primary_pol[missing]
+    secondary_sub[missing] = primary_sub[missing]
+    return primary_pol, primary_sub, secondary_pol, secondary_sub
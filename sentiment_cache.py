@@ -0,0 +1,155 @@
+import os
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from importlib.metadata import version, PackageNotFoundError
+from config import *
+
+try:
+    _TEXTBLOB_VERSION = version('textblob')
+except PackageNotFoundError:
+    _TEXTBLOB_VERSION = 'unknown'
+
+# Bump the suffix when the scoring pipeline changes so stale scores are never reused
+SCORER_VERSION = f"textblob-{_TEXTBLOB_VERSION}-pattern-1"
+
+# LRU touches are buffered in memory and written in one batch once this many are pending
+TOUCH_FLUSH_SIZE = 1000
+
+
+def normalize_text(text):
+    """Normalize text for cache keys without changing how TextBlob scores it"""
+    return unicodedata.normalize('NFC', text).strip()
+
+
+def text_key(text, scorer_version=SCORER_VERSION):
+    """Content address for a text under a given scorer version"""
+    payload = f"{scorer_version}\0{normalize_text(text)}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class SentimentCache:
+    """On-disk sentiment cache keyed by normalized-text hash, with LRU eviction"""
+
+    def __init__(self, path=None, max_entries=SENTIMENT_CACHE_MAX_ENTRIES, scorer_version=SCORER_VERSION):
+        self.path = path or os.path.join(DATA_DIR, 'sentiment_cache.sqlite')
+        self.max_entries = max_entries
+        self.scorer_version = scorer_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last_used not yet written
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sentiment ('
+            'key TEXT PRIMARY KEY, polarity REAL, subjectivity REAL, last_used REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment (last_used)')
+        self._conn.commit()
+
+        # Counted once; inserts and evictions keep it current
+        self._count = self._conn.execute('SELECT COUNT(*) FROM sentiment').fetchone()[0]
+        atexit.register(self._flush_at_exit)
+
+    def _flush_touches(self):
+        """Write buffered last_used updates in one statement (caller holds the lock and commits)"""
+        if self._touched:
+            self._conn.executemany(
+                'UPDATE sentiment SET last_used = ? WHERE key = ?',
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def flush(self):
+        """Persist buffered LRU touches"""
+        with self._lock:
+            if self._touched:
+                self._flush_touches()
+                self._conn.commit()
+
+    def _flush_at_exit(self):
+        # Losing a few LRU touches only affects eviction order, so a closed or removed database is fine
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass
+
+    def get_many(self, texts):
+        """Return {text: (polarity, subjectivity)} for the texts already cached"""
+        # Texts differing only in whitespace or Unicode form share a key, and all of them hit
+        keys = {}
+        for text in dict.fromkeys(texts):
+            keys.setdefault(text_key(text, self.scorer_version), []).append(text)
+        found = {}
+        now = time.time()
+        with self._lock:
+            key_list = list(keys)
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                batch = key_list[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT key, polarity, subjectivity FROM sentiment WHERE key IN ({placeholders})',
+                    batch
+                ).fetchall()
+                for key, polarity, subjectivity in rows:
+                    for text in keys[key]:
+                        found[text] = (polarity, subjectivity)
+                    # Touch hits in memory so eviction drops the least recently used entries
+                    self._touched[key] = now
+
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += sum(len(group) for group in keys.values()) - len(found)
+        return found
+
+    def put_many(self, scores):
+        """Store {text: (polarity, subjectivity)} and evict beyond max_entries"""
+        if not scores:
+            return
+        now = time.time()
+        with self._lock:
+            # A key already present has the same score under the same scorer version,
+            # so only new keys are inserted and total_changes counts exactly those
+            changes = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO sentiment (key, polarity, subjectivity, last_used) VALUES (?, ?, ?, ?)',
+                [(text_key(text, self.scorer_version), polarity, subjectivity, now)
+                 for text, (polarity, subjectivity) in scores.items()]
+            )
+            self._count += self._conn.total_changes - changes
+
+            # Buffered touches go out with the batch, before eviction looks at last_used
+            self._flush_touches()
+            if self._count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM sentiment WHERE key IN '
+                    '(SELECT key FROM sentiment ORDER BY last_used LIMIT ?)',
+                    (self._count - self.max_entries,)
+                )
+                self._count = self.max_entries
+            self._conn.commit()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Return hit/miss counters for this process"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate()
+        }
+
+    def summary(self):
+        return (f"Sentiment cache: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate() * 100:.1f}% hit rate)")
@@ -0,0 +1,143 @@
+"""Permutation and bootstrap significance tests for event impact windows.
+
+Placebo event sets keep every real event's time of day and move it to a
+random day inside the price history, so intraday volatility patterns are
+matched. Each batch of placebo sets is evaluated as one flat array of windows
+by impact_engine.compute_event_windows, and batches are spread over worker
+processes.
+"""
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from impact_engine import compute_event_windows, sorted_price_arrays, to_ns, HOUR_NS
+from config import *
+
+METRICS = ['price_change', 'max_change', 'min_change']
+
+DAY_NS = 24 * HOUR_NS
+
+# Batches are sized independently of the worker count so results only depend on the seed
+PLACEBO_SETS_PER_BATCH = 1000
+# Upper bound on windows evaluated per batch, to keep memory flat
+MAX_WINDOWS_PER_BATCH = 2_000_000
+
+
+def placebo_day_bounds(event_ns, price_ns, hours_before=6, hours_after=6):
+    """Per event, the range of days whose copy of its time of day has a full window in the data.
+
+    Returns (time_of_day_ns, first_day, last_day); events with first_day >
+    last_day cannot be placed anywhere.
+    """
+    time_of_day = np.mod(event_ns, DAY_NS)
+    earliest = price_ns[0] + int(hours_before * HOUR_NS)
+    latest = price_ns[-1] - int(hours_after * HOUR_NS)
+    first_day = -((time_of_day - earliest) // DAY_NS)  # ceil((earliest - tod) / day)
+    last_day = (latest - time_of_day) // DAY_NS
+    return time_of_day, first_day, last_day
+
+
+def _placebo_batch(price_ns, prices, time_of_day, first_day, last_day, n_sets, seed, hours_before, hours_after):
+    """Mean of each metric for n_sets placebo event sets, as an (n_sets, len(METRICS)) array"""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(first_day, last_day + 1, size=(n_sets, len(time_of_day)))
+    placebo_ns = (days * DAY_NS + time_of_day).ravel()
+
+    windows = compute_event_windows(placebo_ns, price_ns, prices, hours_before, hours_after)
+    means = np.empty((n_sets, len(METRICS)))
+    for j, metric in enumerate(METRICS):
+        means[:, j] = np.nanmean(windows[metric].reshape(n_sets, -1), axis=1)
+    return means
+
+
+def placebo_distribution(event_ns, price_ns, prices, n_permutations=SIGNIFICANCE_PERMUTATIONS,
+                         hours_before=6, hours_after=6, seed=0, workers=None):
+    """Metric means for n_permutations time-of-day matched placebo event sets"""
+    time_of_day, first_day, last_day = placebo_day_bounds(event_ns, price_ns, hours_before, hours_after)
+    placeable = first_day <= last_day
+    time_of_day, first_day, last_day = time_of_day[placeable], first_day[placeable], last_day[placeable]
+    if not len(time_of_day):
+        return np.full((0, len(METRICS)), np.nan)
+
+    workers = workers or os.cpu_count() or 1
+    sets_per_batch = max(1, min(MAX_WINDOWS_PER_BATCH // len(time_of_day), PLACEBO_SETS_PER_BATCH))
+    sizes = [min(sets_per_batch, n_permutations - start) for start in range(0, n_permutations, sets_per_batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(price_ns, prices, time_of_day, first_day, last_day, size, batch_seed, hours_before, hours_after)
+            for size, batch_seed in zip(sizes, seeds)]
+
+    if workers == 1 or len(args) == 1:
+        batches = [_placebo_batch(*batch_args) for batch_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+            batches = list(pool.map(_placebo_batch, *zip(*args)))
+    return np.vstack(batches)
+
+
+def bootstrap_means(values, n_bootstrap=SIGNIFICANCE_BOOTSTRAPS, seed=0):
+    """Means of n_bootstrap resamples (with replacement) of each column of values"""
+    values = np.asarray(values, dtype=float)
+    rng = np.random.default_rng(seed)
+    rows_per_batch = max(1, MAX_WINDOWS_PER_BATCH // max(len(values), 1))
+    means = []
+    for start in range(0, n_bootstrap, rows_per_batch):
+        idx = rng.integers(0, len(values), size=(min(rows_per_batch, n_bootstrap - start), len(values)))
+        means.append(np.nanmean(values[idx], axis=1))
+    return np.vstack(means)
+
+
+def impact_significance(events_df, time_column, price_df, hours_before=6, hours_after=6,
+                        n_permutations=SIGNIFICANCE_PERMUTATIONS, n_bootstrap=SIGNIFICANCE_BOOTSTRAPS,
+                        confidence=SIGNIFICANCE_CONFIDENCE, seed=0, workers=None):
+    """Test whether the mean impact of events differs from time-of-day matched random times.
+
+    Returns one row per metric with the observed mean, the placebo mean and
+    spread, a two-sided permutation p-value, and a bootstrap confidence
+    interval for the observed mean.
+    """
+    price_ns, prices = sorted_price_arrays(price_df)
+    event_ns = to_ns(events_df[time_column])
+    if not len(price_ns) or not len(event_ns):
+        return pd.DataFrame(columns=['metric'])
+
+    # Observed and placebo sets cover the same events: those whose whole window lies in the data
+    windows = compute_event_windows(event_ns, price_ns, prices, hours_before, hours_after)
+    full = windows['has_window'] & \
+        (event_ns - int(hours_before * HOUR_NS) >= price_ns[0]) & \
+        (event_ns + int(hours_after * HOUR_NS) <= price_ns[-1])
+    observed_values = np.column_stack([windows[metric][full] for metric in METRICS])
+    event_ns = event_ns[full]
+    if not len(observed_values):
+        return pd.DataFrame(columns=['metric'])
+
+    observed = np.nanmean(observed_values, axis=0)
+    placebo = placebo_distribution(event_ns, price_ns, prices, n_permutations,
+                                   hours_before, hours_after, seed=seed, workers=workers)
+    boot = bootstrap_means(observed_values, n_bootstrap, seed=seed + 1)
+
+    # Two-sided: how often a placebo mean lies at least as far from the placebo centre
+    centre = np.nanmean(placebo, axis=0)
+    extreme = np.abs(placebo - centre) >= np.abs(observed - centre)
+    p_value = (1 + extreme.sum(axis=0)) / (1 + len(placebo))
+
+    alpha = (1 - confidence) / 2
+    return pd.DataFrame({
+        'metric': METRICS,
+        'events': len(observed_values),
+        'observed_mean': observed,
+        'placebo_mean': centre,
+        'placebo_std': np.nanstd(placebo, axis=0),
+        'p_value': p_value,
+        'ci_low': np.nanquantile(boot, alpha, axis=0),
+        'ci_high': np.nanquantile(boot, 1 - alpha, axis=0),
+        'permutations': len(placebo)
+    })
+
+
+def print_significance(results, confidence=SIGNIFICANCE_CONFIDENCE):
+    print(f"\nSignificance vs. {int(results['permutations'].max()) if not results.empty else 0} "
+          f"time-of-day matched placebo sets:")
+    for _, row in results.iterrows():
+        print(f"{row['metric']}: mean {row['observed_mean']:.3f}% "
+              f"({confidence:.0%} CI {row['ci_low']:.3f}% to {row['ci_high']:.3f}%), "
+              f"placebo {row['placebo_mean']:.3f}% +/- {row['placebo_std']:.3f}%, p = {row['p_value']:.4f}")
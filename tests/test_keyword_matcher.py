@@ -0,0 +1,107 @@
+"""KeywordMatcher and TrumpCollector._classify against the original substring rules"""
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+
+DIRECT_INDICATORS = [
+    'trump says', 'trump announces', 'trump declares', 'trump tweets',
+    'trump statement', 'trump statement on', 'trump:', 'trump stated',
+    'trump commented', 'trump remarked', 'trump made clear',
+    'trump made it clear', 'trump made the announcement',
+    'trump made the statement', 'trump made the comment',
+    'trump made the remark', 'trump made the declaration'
+]
+CRYPTO_KEYWORDS = [
+    'bitcoin', 'btc', 'crypto', 'cryptocurrency', 'digital currency',
+    'blockchain', 'digital asset', 'digital gold', 'crypto asset',
+    'crypto currency', 'crypto market', 'crypto regulation',
+    'crypto policy', 'crypto ban', 'crypto tax', 'crypto mining'
+]
+CONTENT_TYPES = [
+    ('trade', ['trade', 'tariff', 'economy', 'market']),
+    ('policy', ['policy', 'decision', 'action', 'order']),
+    ('political', ['election', 'campaign', 'president']),
+    ('legal', ['court', 'trial', 'investigation'])
+]
+ALL_KEYWORDS = DIRECT_INDICATORS + CRYPTO_KEYWORDS + [k for _, keywords in CONTENT_TYPES for k in keywords]
+
+
+def original_classify(title, text):
+    """_classify as it was before KeywordMatcher, kept verbatim as the reference"""
+    title_lower = title.lower()
+    text_lower = text.lower() if text else title_lower
+
+    is_direct = any(indicator in title_lower for indicator in DIRECT_INDICATORS)
+    is_crypto = any(keyword in title_lower or keyword in text_lower
+                    for keyword in CRYPTO_KEYWORDS)
+
+    content_type = 'other'
+    if is_crypto:
+        content_type = 'crypto'
+    else:
+        for candidate, keywords in CONTENT_TYPES:
+            if any(keyword in title_lower for keyword in keywords):
+                content_type = candidate
+                break
+
+    confidence_score = 0
+    if is_direct:
+        confidence_score += 0.4
+    if is_crypto:
+        confidence_score += 0.3
+    if content_type == 'crypto':
+        confidence_score += 0.3
+
+    return {
+        'is_direct': is_direct,
+        'is_crypto': is_crypto,
+        'content_type': content_type,
+        'confidence_score': confidence_score
+    }
+
+
+def random_texts(count, seed=0):
+    """Keywords, their prefixes and fragments run together, overlapped and padded with filler"""
+    rng = random.Random(seed)
+    filler = ['the', 'a', 'on', 'new', 'report', 'Trump', 'TRUMP', 'BTC', ':', ' ', '', 'x', 'made', 'it', 'is']
+    pieces = ALL_KEYWORDS + [k[:rng.randint(1, len(k))] for k in ALL_KEYWORDS] + filler
+    texts = []
+    for _ in range(count):
+        words = rng.choices(pieces, k=rng.randint(0, 8))
+        separators = rng.choices(['', ' ', '  ', '-', '\n'], k=len(words))
+        texts.append(''.join(sep + word for sep, word in zip(separators, words)))
+    return texts
+
+
+TEXTS = random_texts(5000) + [
+    '', 'trump made the statement on crypto', 'trump statement on', 'cryptocurrency',
+    'crypto currency market', 'trump: bitcoin', 'btcbtc', 'trumptrump says', 'courtrial', 'Trump Says BTC'
+]
+
+
+def test_matcher_matches_any_substring_per_category():
+    tables = {'direct': DIRECT_INDICATORS, 'crypto': CRYPTO_KEYWORDS, **dict(CONTENT_TYPES)}
+    matcher = KeywordMatcher(tables)
+    for text in TEXTS:
+        text = text.lower()
+        expected = {category for category, keywords in tables.items() if any(k in text for k in keywords)}
+        assert matcher.match(text) == expected, text
+
+
+def test_overlapping_and_prefix_keywords():
+    matcher = KeywordMatcher({'short': ['ab'], 'long': ['abc'], 'inner': ['bcd']})
+    assert matcher.match('abcd') == {'short', 'long', 'inner'}
+    assert matcher.match('abd') == {'short'}
+    assert matcher.match('xbcdx') == {'inner'}
+
+
+def test_classify_matches_original_rules():
+    trump_collector = pytest.importorskip('trump_collector')
+    classify = trump_collector.TrumpCollector._classify
+    rng = random.Random(1)
+    for title in TEXTS:
+        text = rng.choice(TEXTS + [None])
+        # _classify uses no instance state
+        assert classify(None, title, text) == original_classify(title, text), (title, text)
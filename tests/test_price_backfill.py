@@ -0,0 +1,169 @@
+"""Backfill, gap filling and chunking in PriceCollector.get_historical_prices"""
+from datetime import datetime
+
+import pytest
+
+from candle_store import CandleStore
+from rate_limiter import RateLimiter
+from price_collector import PriceCollector, CANDLES_PER_REQUEST
+
+HOUR_MS = 3600 * 1000
+START = datetime(2025, 1, 1)
+START_MS = int(START.timestamp() * 1000)
+
+
+class FakeExchange:
+    """fetch_ohlcv over a fixed list of hourly candles, recording each call's since"""
+
+    id = 'fakeexchange'
+    rateLimit = 0
+
+    def __init__(self, timestamps, page_limit=CANDLES_PER_REQUEST):
+        self.candles = [[ts, 100.0, 101.0, 99.0, 100.5, 1.0] for ts in sorted(timestamps)]
+        self.page_limit = page_limit
+        self.calls = []
+
+    def parse_timeframe(self, timeframe):
+        return 3600
+
+    def fetch_ohlcv(self, symbol, timeframe='1h', since=None, limit=1000):
+        self.calls.append(since)
+        newer = [candle for candle in self.candles if candle[0] >= since]
+        return newer[:min(limit, self.page_limit)]
+
+
+def hours(start_ms, count):
+    return [start_ms + i * HOUR_MS for i in range(count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(base_dir=str(tmp_path))
+
+
+def collector(store, exchange):
+    return PriceCollector(store=store, exchange=exchange, rate_limiter=RateLimiter(default=(1e9, 1e9)))
+
+
+def stored_timestamps(store):
+    return store.load('BTC/USDT', '1h')['timestamp'].tolist()
+
+
+def test_empty_store_fetches_whole_range_in_chunks(store):
+    exchange = FakeExchange(hours(START_MS, 2500))
+    df = collector(store, exchange).get_historical_prices(start_date=START, backfill_workers=1)
+
+    assert len(df) == 2500
+    assert stored_timestamps(store) == hours(START_MS, 2500)
+    # Each chunk is followed from just after its last candle until the exchange has nothing more
+    assert exchange.calls == [START_MS + offset for offset in (0, 999 * HOUR_MS + 1, 1999 * HOUR_MS + 1,
+                                                               2499 * HOUR_MS + 1)]
+
+
+def test_empty_store_backfills_in_parallel_by_default(store):
+    exchange = FakeExchange(hours(START_MS, 2500))
+    df = collector(store, exchange).get_historical_prices(start_date=START)
+
+    assert len(df) == 2500
+    assert stored_timestamps(store) == hours(START_MS, 2500)
+
+
+def test_gap_between_stored_candles_is_filled(store):
+    everything = hours(START_MS, 48)
+    store.append('BTC/USDT', '1h', FakeExchange(everything[:10] + everything[20:]).candles)
+    exchange = FakeExchange(everything)
+
+    collector(store, exchange).get_historical_prices(start_date=START)
+
+    assert stored_timestamps(store) == everything
+    assert START_MS + 10 * HOUR_MS in exchange.calls
+
+
+def test_gap_the_exchange_cannot_fill_is_not_refetched(store):
+    available = hours(START_MS, 10) + hours(START_MS + 20 * HOUR_MS, 28)
+    store.append('BTC/USDT', '1h', FakeExchange(available).candles)
+    exchange = FakeExchange(available)
+    gap = (START_MS + 10 * HOUR_MS, START_MS + 20 * HOUR_MS - 1)
+
+    collector(store, exchange).get_historical_prices(start_date=START)
+    assert gap[0] in exchange.calls
+    assert store.known_gaps('BTC/USDT', '1h') == {gap}
+
+    exchange.calls.clear()
+    collector(store, exchange).get_historical_prices(start_date=START)
+    assert gap[0] not in exchange.calls
+
+
+def test_fetch_range_pages_through_short_chunks(store):
+    # An exchange that pages at 500 still yields every candle
+    exchange = FakeExchange(hours(START_MS, 2000), page_limit=500)
+    candles = collector(store, exchange)._fetch_range('BTC/USDT', '1h', START_MS)
+
+    assert [candle[0] for candle in candles] == hours(START_MS, 2000)
+    assert len(exchange.calls) == 5  # four pages, then an empty one
+
+
+def test_fetch_range_stops_once_it_reaches_until(store):
+    exchange = FakeExchange(hours(START_MS, 2000), page_limit=500)
+    until = START_MS + 799 * HOUR_MS
+    candles = collector(store, exchange)._fetch_range('BTC/USDT', '1h', START_MS, until)
+
+    assert [candle[0] for candle in candles] == hours(START_MS, 800)
+    assert len(exchange.calls) == 2
+
+
+def test_backfill_range_splits_into_one_request_sub_ranges(store):
+    exchange = FakeExchange(hours(START_MS, 2500))
+    # An unaligned start is rounded up to the next candle
+    collector(store, exchange).backfill_range('BTC/USDT', '1h', START_MS - HOUR_MS // 2,
+                                              START_MS + 2499 * HOUR_MS, max_workers=3)
+
+    assert sorted(exchange.calls) == [START_MS, START_MS + 1000 * HOUR_MS, START_MS + 2000 * HOUR_MS]
+
+
+@pytest.mark.parametrize('page_limit', [CANDLES_PER_REQUEST, 300])
+def test_backfill_range_matches_serial_fetch(store, page_limit):
+    exchange = FakeExchange(hours(START_MS, 2500), page_limit=page_limit)
+    until = START_MS + 2499 * HOUR_MS
+    price_collector = collector(store, exchange)
+
+    parallel = price_collector.backfill_range('BTC/USDT', '1h', START_MS, until, max_workers=4)
+    serial = price_collector._fetch_range('BTC/USDT', '1h', START_MS, until)
+
+    # Sub-range boundaries neither drop nor repeat candles
+    timestamps = [candle[0] for candle in parallel]
+    assert timestamps == hours(START_MS, 2500)
+    assert parallel == serial
+
+
+def test_empty_head_is_not_fetched_again(store):
+    first_stored = START_MS + 24 * HOUR_MS
+    listed = hours(first_stored, 24)
+    store.append('BTC/USDT', '1h', FakeExchange(listed).candles)
+    exchange = FakeExchange(listed)
+
+    collector(store, exchange).get_historical_prices(start_date=START)
+    assert exchange.calls[0] == START_MS
+    assert store.known_gaps('BTC/USDT', '1h') == {(START_MS, first_stored - 1)}
+
+    exchange.calls.clear()
+    df = collector(store, exchange).get_historical_prices(start_date=START)
+    # Only the tail is asked for; the head is known to be empty
+    assert all(since >= listed[-1] for since in exchange.calls)
+    assert len(df) == 24
+
+
+def test_partly_filled_gap_only_leaves_its_holes(store):
+    everything = hours(START_MS, 48)
+    store.append('BTC/USDT', '1h', FakeExchange(everything[:10] + everything[30:]).candles)
+    exchange = FakeExchange(everything[:10] + everything[15:18] + everything[30:])
+
+    collector(store, exchange).get_historical_prices(start_date=START)
+    assert store.known_gaps('BTC/USDT', '1h') == {
+        (everything[10], everything[15] - 1),
+        (everything[18], everything[30] - 1)
+    }
+
+    exchange.calls.clear()
+    collector(store, exchange).get_historical_prices(start_date=START)
+    assert all(since >= everything[-1] for since in exchange.calls)
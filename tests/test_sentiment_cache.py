@@ -0,0 +1,35 @@
+"""SentimentCache keys and hits"""
+import unicodedata
+
+import pytest
+
+from sentiment_cache import SentimentCache, normalize_text
+
+textblob = pytest.importorskip('textblob')
+
+TEXTS = [
+    "Bitcoin is great today!",
+    "  Terrible news for crypto markets.\n",
+    "\tTrump says the dollar is strong  ",
+    "Café owners love bitcoin, naïvely optimistic",
+    "Résumé of a disappointing week: BTC dropped 😞",
+    "Crème brûlée and an excellent, wonderful rally",
+    "",
+    "   "
+]
+
+
+@pytest.mark.parametrize('text', TEXTS + [unicodedata.normalize('NFD', text) for text in TEXTS])
+def test_normalize_text_does_not_change_textblob_scores(text):
+    assert textblob.TextBlob(normalize_text(text)).sentiment == textblob.TextBlob(text).sentiment
+
+
+def test_texts_sharing_a_key_all_hit(tmp_path):
+    cache = SentimentCache(path=str(tmp_path / 'cache.sqlite'))
+    cache.put_many({'Bitcoin is great': (0.8, 0.75)})
+
+    variants = ['Bitcoin is great', '  Bitcoin is great\n', 'Bitcoin is great ']
+    found = cache.get_many(variants + ['Something else'])
+
+    assert found == {text: (0.8, 0.75) for text in variants}
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -2,8 +2,99 @@ from pytrends.request import TrendReq
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import hashlib
+from data_store import DataStore
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
 from config import *
 
+# pytrends accepts at most five keywords per payload
+MAX_KEYWORDS = 5
+# Google only returns hourly points for ranges of up to a week
+WINDOW_HOURS = 7 * 24
+OVERLAP_HOURS = 24
+# Windows sit on a fixed grid so later runs ask for exactly the same ones
+WINDOW_ORIGIN = datetime(2020, 1, 1)
+
+
+def keyword_batches(keywords, anchor, size=MAX_KEYWORDS):
+    """Split keywords into payload-sized batches that all include the anchor term"""
+    others = [keyword for keyword in keywords if keyword != anchor]
+    step = size - 1
+    return [[anchor] + others[i:i + step] for i in range(0, len(others), step)] or [[anchor]]
+
+
+def window_grid(start, end, window_hours=WINDOW_HOURS, overlap_hours=OVERLAP_HOURS):
+    """Overlapping [start, end] hour windows on a fixed grid covering start..end"""
+    step = timedelta(hours=window_hours - overlap_hours)
+    span = timedelta(hours=window_hours)
+    first = int((start - WINDOW_ORIGIN) // step)
+    if WINDOW_ORIGIN + first * step + span <= start:
+        first += 1
+    windows = []
+    window_start = WINDOW_ORIGIN + first * step
+    while window_start <= end:
+        windows.append((window_start, window_start + span))
+        window_start += step
+    return windows
+
+
+def normalize_batches(frames, anchor):
+    """Join one window's batches, scaling each so its anchor matches the first batch's anchor"""
+    combined = frames[0].astype(float)
+    reference = combined[anchor].sum()
+    for frame in frames[1:]:
+        total = frame[anchor].sum()
+        scale = reference / total if reference > 0 and total > 0 else 1.0
+        combined = combined.join(frame.drop(columns=[anchor]).astype(float) * scale, how='outer')
+    return combined
+
+
+def overlap_scale(reference, frame):
+    """Factor putting frame on reference's scale, from their shared time points (None without overlap)"""
+    overlap = reference.index.intersection(frame.index)
+    reference_total = reference.loc[overlap].to_numpy(dtype=float).sum()
+    frame_total = frame.loc[overlap].to_numpy(dtype=float).sum()
+    if reference_total > 0 and frame_total > 0:
+        return reference_total / frame_total
+    return None
+
+
+def stitch_windows(frames):
+    """Chain overlapping windows into one series on the first window's scale.
+
+    Each window is rescaled to agree with the series so far on their
+    overlap, and earlier windows win where they overlap. A window with no
+    usable overlap (e.g. the one before it failed) cannot be put on the same
+    scale, so stitching stops there rather than guessing.
+    """
+    if not frames or frames[0].empty:
+        return pd.DataFrame()
+    
+    result = frames[0].astype(float)
+    for frame in frames[1:]:
+        frame = frame.astype(float)
+        scale = overlap_scale(result, frame)
+        if scale is None:
+            print(f"Trends windows do not overlap after {result.index.max()}; stopping the stitched series there")
+            break
+        result = pd.concat([result, frame.loc[frame.index.difference(result.index)] * scale])
+    return result.sort_index()
+
+
+def rescale_to_peak(df, columns=None, peak=100):
+    """Rescale columns so their joint maximum is `peak`, like a single Google Trends request"""
+    columns = list(columns or df.columns)
+    top = df[columns].to_numpy(dtype=float).max() if len(df) else 0
+    if not top > 0:
+        return df
+    df = df.copy()
+    df[columns] = df[columns] * peak / top
+    return df
+
+
+INTEREST_COLUMNS = ['bitcoin_combined_interest', 'trump_combined_interest']
+
 class TrendsCollector:
     def __init__(self):
         try:
@@ -13,6 +104,23 @@ class TrendsCollector:
         except Exception as e:
             print(f"Error connecting to Google Trends: {str(e)}")
             raise
+        self.store = DataStore('trends')
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
+        self.window_cache_dir = os.path.join(DATA_DIR, 'trends_cache')
+
+    def _request(self, func, **kwargs):
+        """Call a pytrends method that hits Google under the shared limiter"""
+        self.rate_limiter.acquire(TRENDS_HOST)
+        self.metrics.inc('api_calls_total', source='trends')
+        try:
+            result = func(**kwargs)
+        except Exception as e:
+            # pytrends errors carry the response, so 429s slow the bucket down
+            self.rate_limiter.report_exception(TRENDS_HOST, e)
+            raise
+        self.rate_limiter.update(TRENDS_HOST, 200)
+        return result
 
     def get_trends(self, bitcoin_keywords=['bitcoin', 'btc', 'crypto'], 
                   trump_keywords=['donald trump', 'trump', 'president trump'],
@@ -22,24 +130,26 @@ class TrendsCollector:
             print(f"Searching for trends with Trump keywords: {trump_keywords}")
             
             # Build payload for Bitcoin keywords
-            self.pytrends.build_payload(
+            self._request(
+                self.pytrends.build_payload,
                 kw_list=bitcoin_keywords,
                 timeframe=timeframe,
                 geo=''
             )
             
             # Get interest over time for Bitcoin
-            bitcoin_trends = self.pytrends.interest_over_time()
+            bitcoin_trends = self._request(self.pytrends.interest_over_time)
             
             # Build payload for Trump keywords
-            self.pytrends.build_payload(
+            self._request(
+                self.pytrends.build_payload,
                 kw_list=trump_keywords,
                 timeframe=timeframe,
                 geo=''
             )
             
             # Get interest over time for Trump
-            trump_trends = self.pytrends.interest_over_time()
+            trump_trends = self._request(self.pytrends.interest_over_time)
             
             if not bitcoin_trends.empty and not trump_trends.empty:
                 print(f"Found trends data for {len(bitcoin_trends)} time points")
@@ -77,15 +187,192 @@ class TrendsCollector:
             
         return trends_df
 
-    def collect_bitcoin_trends(self):
-        trends = self.get_trends()
+    def _window_path(self, batch, window_start, window_end):
+        batch_key = hashlib.sha1('|'.join(batch).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(
+            self.window_cache_dir, batch_key,
+            f"{window_start:%Y%m%dT%H}_{window_end:%Y%m%dT%H}.parquet"
+        )
+
+    def _fetch_window(self, batch, window_start, window_end):
+        """Hourly interest for one batch over one window, from the local cache when possible"""
+        path = self._window_path(batch, window_start, window_end)
+        if os.path.exists(path):
+            self.metrics.inc('cache_hits_total', cache='trends_window')
+            return pd.read_parquet(path), True
+        
+        timeframe = f"{window_start:%Y-%m-%dT%H} {window_end:%Y-%m-%dT%H}"
+        self._request(self.pytrends.build_payload, kw_list=batch, timeframe=timeframe, geo='')
+        df = self._request(self.pytrends.interest_over_time)
+        
+        partial = 'isPartial' in df.columns and df['isPartial'].astype(bool).any()
+        df = df.drop(columns=['isPartial'], errors='ignore')
+        
+        # Only finished windows are cached; the window still in progress is refetched next run
+        if not df.empty and not partial and window_end <= datetime.utcnow():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_parquet(path)
+        return df, False
+
+    def get_stitched_trends(self, keywords, start_date, end_date=None, anchor=None,
+                            window_hours=WINDOW_HOURS, overlap_hours=OVERLAP_HOURS):
+        """Hourly interest for any number of keywords over any date range.
+        
+        Keywords are split into five-term batches that share an anchor term,
+        so batches can be put on one scale. The range is covered by
+        overlapping windows of at most a week (the longest range Google
+        returns hourly), which are stitched into one continuous series.
+        Finished windows are cached, so later runs fetch only missing ones.
+        """
+        end_date = end_date or datetime.utcnow()
+        anchor = anchor or keywords[0]
+        batches = keyword_batches(keywords, anchor)
+        windows = window_grid(start_date, end_date, window_hours, overlap_hours)
+        
+        fetched = cached = 0
+        frames = []
+        for window_start, window_end in windows:
+            batch_frames = []
+            for batch in batches:
+                try:
+                    df, from_cache = self._fetch_window(batch, window_start, window_end)
+                except Exception as e:
+                    print(f"Error fetching trends window {window_start} to {window_end}: {str(e)}")
+                    batch_frames = []
+                    break
+                cached += from_cache
+                fetched += not from_cache
+                if df.empty:
+                    batch_frames = []
+                    break
+                batch_frames.append(df)
+            if batch_frames:
+                frames.append(normalize_batches(batch_frames, anchor)[keywords])
+            elif frames:
+                # Later windows would have nothing to be scaled against
+                print(f"Trends window {window_start} to {window_end} is missing; stopping the stitched series there")
+                break
+        
+        print(f"Trends windows: {len(windows)} x {len(batches)} batches, {cached} from cache, {fetched} fetched")
+        series = stitch_windows(frames)
+        if series.empty:
+            return series
+        series = series[(series.index >= start_date) & (series.index <= end_date)].asfreq('h')
+        self.metrics.inc('rows_collected_total', len(series), source='trends')
+        return series
+
+    def get_trends_range(self, start_date, end_date=None,
+                         bitcoin_keywords=['bitcoin', 'btc', 'crypto'],
+                         trump_keywords=['donald trump', 'trump', 'president trump']):
+        """Combined Bitcoin/Trump interest over a long range, on one shared scale"""
+        try:
+            interest = self.get_stitched_trends(bitcoin_keywords + trump_keywords, start_date, end_date,
+                                                anchor=bitcoin_keywords[0])
+            if interest.empty:
+                print("No trends data found")
+                return pd.DataFrame()
+            
+            trends_df = pd.DataFrame({
+                'bitcoin_combined_interest': interest[bitcoin_keywords].mean(axis=1),
+                'trump_combined_interest': interest[trump_keywords].mean(axis=1)
+            })
+            trends_df['bitcoin_interest_change'] = trends_df['bitcoin_combined_interest'].pct_change() * 100
+            trends_df['trump_interest_change'] = trends_df['trump_combined_interest'].pct_change() * 100
+            print(f"Found trends data for {len(trends_df)} hourly time points")
+            return trends_df
+        except Exception as e:
+            print(f"Error collecting trends data: {str(e)}")
+            return pd.DataFrame()
+
+    def _segments(self):
+        """Stored time ranges that each share one scale, as [{'id', 'start', 'end'}]"""
+        segments = self.store.get_meta('segments')
+        if segments is None and self.store.row_count():
+            # Stores written before segments were tracked hold a single scale
+            partitions = self.store.metadata()['partitions'].values()
+            segments = [{
+                'id': 0,
+                'start': min(info['min'] for info in partitions),
+                'end': max(info['max'] for info in partitions)
+            }]
+        return segments or []
+
+    def _align_to_store(self, trends):
+        """Put a run's interest on the scale of the stored segment it overlaps most.
+
+        Returns (trends, segment id). A run sharing no time points with the
+        store cannot be put on any stored scale, so it starts a new segment
+        on its own scale.
+        """
+        segments = self._segments()
+        stored = self.store.read(columns=['date'] + INTEREST_COLUMNS,
+                                 start=trends.index.min(), end=trends.index.max()).set_index('date')
+        
+        best = None
+        for segment in segments:
+            shared = stored[(stored.index >= pd.Timestamp(segment['start'])) &
+                            (stored.index <= pd.Timestamp(segment['end']))]
+            shared = shared.loc[shared.index.intersection(trends.index)]
+            if len(shared) and (best is None or len(shared) > len(best[1])):
+                best = (segment, shared)
+        
+        if best is not None:
+            scale = overlap_scale(best[1][INTEREST_COLUMNS], trends[INTEREST_COLUMNS])
+            if scale is not None:
+                trends = trends.copy()
+                trends[INTEREST_COLUMNS] = trends[INTEREST_COLUMNS] * scale
+                return trends, best[0]['id']
+        return trends, max((segment['id'] for segment in segments), default=-1) + 1
+
+    def _record_segment(self, segment_id, new_dates):
+        """Extend (or add) a segment to cover the time points just stored on its scale"""
+        if not len(new_dates):
+            return
+        segments = self._segments()
+        start, end = new_dates.min().isoformat(), new_dates.max().isoformat()
+        for segment in segments:
+            if segment['id'] == segment_id:
+                segment['start'] = min(segment['start'], start)
+                segment['end'] = max(segment['end'], end)
+                break
+        else:
+            segments.append({'id': segment_id, 'start': start, 'end': end})
+        self.store.set_meta('segments', segments)
+
+    def read_trends(self, start=None, end=None, peak=100):
+        """Stored interest over [start, end] with a segment column.
+        
+        Each segment is rescaled so its peak is `peak` (None keeps the stored
+        scales), since separate segments cannot be compared directly.
+        """
+        trends = self.store.read(start=start, end=end)
+        if trends.empty:
+            return trends
+        trends['segment'] = -1
+        for segment in self._segments():
+            inside = (trends['date'] >= pd.Timestamp(segment['start'])) & \
+                (trends['date'] <= pd.Timestamp(segment['end']))
+            trends.loc[inside, 'segment'] = segment['id']
+        if peak is None:
+            return trends
+        return pd.concat([rescale_to_peak(group, INTEREST_COLUMNS, peak)
+                          for _, group in trends.groupby('segment', sort=False)]).sort_values('date')
+
+    def collect_bitcoin_trends(self, start_date=None, end_date=None):
+        # A start date switches to batched, stitched retrieval over the whole range
+        trends = self.get_trends_range(start_date, end_date) if start_date else self.get_trends()
         
         if not trends.empty:
-            # Save to CSV
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = os.path.join(DATA_DIR, f'trends_data_{timestamp}.csv')
-            trends.to_csv(file_path)
-            print(f"\nTrends data saved to: {file_path}")
+            # Stored rows keep their segment's scale; rescaling for display happens on read
+            segment_ids = [segment['id'] for segment in self._segments()]
+            aligned, segment_id = self._align_to_store(trends)
+            if segment_ids and segment_id not in segment_ids:
+                print(f"\nTrends data does not overlap the stored series; storing it as segment {segment_id} on its own scale")
+            new_dates = aligned.index.difference(self.store.read(columns=['date'], start=aligned.index.min(),
+                                                                 end=aligned.index.max())['date'])
+            written = self.store.append(aligned.rename_axis('date').reset_index())
+            self._record_segment(segment_id, new_dates)
+            print(f"\nStored {written} new trends time points in: {self.store.root}")
             
             # Print summary statistics
             print("\nTrends Summary:")
@@ -2,69 +2,149 @@ import praw
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import *
-from textblob import TextBlob
+from sentiment import score_texts
+from impact_engine import event_impact_frame
+from keyword_matcher import KeywordMatcher
+from data_store import DataStore
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
+
+# Direct statement indicators
+DIRECT_INDICATORS = [
+    'trump says', 'trump announces', 'trump declares', 'trump tweets',
+    'trump statement', 'trump statement on', 'trump:', 'trump stated',
+    'trump commented', 'trump remarked', 'trump made clear',
+    'trump made it clear', 'trump made the announcement',
+    'trump made the statement', 'trump made the comment',
+    'trump made the remark', 'trump made the declaration'
+]
+
+# Crypto-related keywords
+CRYPTO_KEYWORDS = [
+    'bitcoin', 'btc', 'crypto', 'cryptocurrency', 'digital currency',
+    'blockchain', 'digital asset', 'digital gold', 'crypto asset',
+    'crypto currency', 'crypto market', 'crypto regulation',
+    'crypto policy', 'crypto ban', 'crypto tax', 'crypto mining'
+]
+
+# Content types in priority order, checked against the title when not crypto
+CONTENT_TYPE_KEYWORDS = {
+    'trade': ['trade', 'tariff', 'economy', 'market'],
+    'policy': ['policy', 'decision', 'action', 'order'],
+    'political': ['election', 'campaign', 'president'],
+    'legal': ['court', 'trial', 'investigation']
+}
+
+# Compiled once so each title/text is scanned in a single pass
+TITLE_MATCHER = KeywordMatcher({
+    'direct': DIRECT_INDICATORS,
+    'crypto': CRYPTO_KEYWORDS,
+    **CONTENT_TYPE_KEYWORDS
+})
+CRYPTO_MATCHER = KeywordMatcher({'crypto': CRYPTO_KEYWORDS})
+
+# List of relevant subreddits
+SUBREDDITS = [
+    'politics',
+    'news',
+    'worldnews',
+    'conservative',
+    'democrats',
+    'Republican',
+    'Trump',
+    'The_Donald',
+    'AskTrumpSupporters',
+    'CryptoCurrency',
+    'Bitcoin',
+    'CryptoMarkets'
+]
+
+# Search for Trump-related posts with different queries
+QUERIES = [
+    'trump announcement OR trump statement OR trump tweet',
+    'trump policy OR trump decision OR trump action',
+    'trump trade OR trump tariff OR trump economy',
+    'trump crypto OR trump bitcoin OR trump cryptocurrency',
+    'trump digital currency OR trump blockchain',
+    'trump crypto regulation OR trump crypto policy'
+]
 
 class TrumpCollector:
     def __init__(self):
         try:
             self.reddit = praw.Reddit(
-                client_id=REDDIT_CLIENT_ID,
-                client_secret=REDDIT_CLIENT_SECRET,
+                client_id=get_settings().reddit_client_id,
+                client_secret=get_settings().reddit_client_secret,
                 user_agent=REDDIT_USER_AGENT
             )
+            self._local = threading.local()
+            self._local.reddit = self.reddit
             print("Successfully connected to Reddit API for Trump announcements")
         except Exception as e:
             print(f"Error connecting to Reddit API: {str(e)}")
             raise
+        self.store = DataStore('trump_announcements')
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
 
     def categorize_announcement(self, title, text):
         """Categorize the type of announcement and determine if it's a direct Trump statement"""
+        categorization = self._classify(title, text)
+        
+        # Analyze sentiment
+        polarity, subjectivity = score_texts([title])
+        categorization['sentiment_polarity'] = polarity[0]
+        categorization['sentiment_subjectivity'] = subjectivity[0]
+        return categorization
+
+    def categorize_many(self, titles, texts, score_sentiment=True):
+        """Categorize a batch of announcements, returning one column per field"""
+        titles = list(titles)
+        columns = {
+            'is_direct': [],
+            'is_crypto': [],
+            'content_type': [],
+            'confidence_score': []
+        }
+        for title, text in zip(titles, texts):
+            categorization = self._classify(title, text)
+            for field in columns:
+                columns[field].append(categorization[field])
+        
+        # Analyze sentiment for the whole batch at once
+        if score_sentiment:
+            columns['sentiment_polarity'], columns['sentiment_subjectivity'] = score_texts(titles)
+        return pd.DataFrame(columns)
+
+    def _classify(self, title, text):
+        """Keyword-based part of categorize_announcement, without sentiment scoring"""
         # Convert to lowercase for case-insensitive matching
         title_lower = title.lower()
-        text_lower = text.lower() if text else title_lower
         
-        # Direct statement indicators
-        direct_indicators = [
-            'trump says', 'trump announces', 'trump declares', 'trump tweets',
-            'trump statement', 'trump statement on', 'trump:', 'trump stated',
-            'trump commented', 'trump remarked', 'trump made clear',
-            'trump made it clear', 'trump made the announcement',
-            'trump made the statement', 'trump made the comment',
-            'trump made the remark', 'trump made the declaration'
-        ]
-        
-        # Crypto-related keywords
-        crypto_keywords = [
-            'bitcoin', 'btc', 'crypto', 'cryptocurrency', 'digital currency',
-            'blockchain', 'digital asset', 'digital gold', 'crypto asset',
-            'crypto currency', 'crypto market', 'crypto regulation',
-            'crypto policy', 'crypto ban', 'crypto tax', 'crypto mining'
-        ]
+        # Find every keyword category in the title in one pass
+        title_matches = TITLE_MATCHER.match(title_lower)
         
         # Determine if it's a direct Trump statement
-        is_direct = any(indicator in title_lower for indicator in direct_indicators)
-        
-        # Check if it's crypto-related
-        is_crypto = any(keyword in title_lower or keyword in text_lower 
-                       for keyword in crypto_keywords)
+        is_direct = 'direct' in title_matches
         
-        # Analyze sentiment
-        title_sentiment = TextBlob(title).sentiment
-        text_sentiment = TextBlob(text).sentiment if text else title_sentiment
+        # Check if it's crypto-related; the text only needs scanning when the title missed
+        is_crypto = 'crypto' in title_matches
+        if not is_crypto and text:
+            is_crypto = bool(CRYPTO_MATCHER.match(text.lower()))
         
         # Determine the type of content
         content_type = 'other'
         if is_crypto:
             content_type = 'crypto'
-        elif any(keyword in title_lower for keyword in ['trade', 'tariff', 'economy', 'market']):
-            content_type = 'trade'
-        elif any(keyword in title_lower for keyword in ['policy', 'decision', 'action', 'order']):
-            content_type = 'policy'
-        elif any(keyword in title_lower for keyword in ['election', 'campaign', 'president']):
-            content_type = 'political'
-        elif any(keyword in title_lower for keyword in ['court', 'trial', 'investigation']):
-            content_type = 'legal'
+        else:
+            for candidate in CONTENT_TYPE_KEYWORDS:
+                if candidate in title_matches:
+                    content_type = candidate
+                    break
         
         # Calculate confidence score
         confidence_score = 0
@@ -79,81 +159,107 @@ class TrumpCollector:
             'is_direct': is_direct,
             'is_crypto': is_crypto,
             'content_type': content_type,
-            'confidence_score': confidence_score,
-            'sentiment_polarity': title_sentiment.polarity,
-            'sentiment_subjectivity': title_sentiment.subjectivity
+            'confidence_score': confidence_score
         }
 
-    def get_trump_announcements(self, start_date=datetime(2025, 1, 1)):
+    def _get_reddit(self):
+        """Return a Reddit client for the current thread (praw is not thread-safe)"""
+        reddit = getattr(self._local, 'reddit', None)
+        if reddit is None:
+            reddit = self._local.reddit = praw.Reddit(
+                client_id=get_settings().reddit_client_id,
+                client_secret=get_settings().reddit_client_secret,
+                user_agent=REDDIT_USER_AGENT
+            )
+        return reddit
+
+    def _search(self, subreddit_name, query, start_date):
+        """Run one subreddit search and return raw post records since start_date"""
+        print(f"Searching r/{subreddit_name} with query: {query}")
+        posts = []
+        reddit = self._get_reddit()
+        subreddit = reddit.subreddit(subreddit_name)
+        
+        def report_limits():
+            limits = getattr(reddit.auth, 'limits', None) or {}
+            if limits.get('remaining') is not None and limits.get('reset_timestamp'):
+                self.rate_limiter.update_quota(REDDIT_API_HOST, limits['remaining'], limits['reset_timestamp'] - time.time())
+        
+        # All search threads share the Reddit bucket; each 100-post page waits for a token
+        results = self.rate_limiter.paced(
+            subreddit.search(query=query, time_filter='year', limit=1000),
+            REDDIT_API_HOST, 100, after_page=report_limits
+        )
+        for listed, post in enumerate(results):
+            if listed % 100 == 0:
+                # praw requests the next page every 100 posts
+                self.metrics.inc('api_calls_total', source='trump')
+            post_date = datetime.fromtimestamp(post.created_utc)
+            if post_date >= start_date:
+                posts.append({
+                    'id': post.id,
+                    'title': post.title,
+                    'text': post.selftext,
+                    'created_at': post_date,
+                    'url': post.url,
+                    'subreddit': subreddit_name,
+                    'score': post.score,
+                    'num_comments': post.num_comments
+                })
+        self.metrics.inc('rows_collected_total', len(posts), source='trump')
+        return posts
+
+    def get_trump_announcements(self, start_date=datetime(2025, 1, 1), max_workers=8):
         """Get Trump-related announcements from political subreddits"""
         try:
-            # List of relevant subreddits
-            subreddits = [
-                'politics',
-                'news',
-                'worldnews',
-                'conservative',
-                'democrats',
-                'Republican',
-                'Trump',
-                'The_Donald',
-                'AskTrumpSupporters',
-                'CryptoCurrency',
-                'Bitcoin',
-                'CryptoMarkets'
-            ]
-            
             print(f"\nSearching for Trump announcements from {start_date.date()} to present...")
             
+            # Run the subreddit x query matrix concurrently, merging posts matched by several queries
+            posts_by_id = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                searches = {
+                    executor.submit(self._search, subreddit_name, query, start_date): (subreddit_name, query)
+                    for subreddit_name in SUBREDDITS
+                    for query in QUERIES
+                }
+                for future in as_completed(searches):
+                    subreddit_name, query = searches[future]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        self.rate_limiter.report_exception(REDDIT_API_HOST, e)
+                        print(f"Error searching r/{subreddit_name}: {str(e)}")
+                        continue
+                    for post in results:
+                        existing = posts_by_id.setdefault(post['id'], post)
+                        existing.setdefault('matched', set()).add(query)
+            
+            print(f"\nFound {len(posts_by_id)} unique posts across {len(SUBREDDITS) * len(QUERIES)} searches")
+            
+            # Categorize each unique post once; sentiment is scored for kept posts below
+            posts = list(posts_by_id.values())
+            categorization = self.categorize_many(
+                [post['title'] for post in posts],
+                [post['text'] for post in posts],
+                score_sentiment=False
+            )
+            
             announcements = []
-            for subreddit_name in subreddits:
-                print(f"\nSearching r/{subreddit_name} for Trump announcements...")
-                try:
-                    subreddit = self.reddit.subreddit(subreddit_name)
-                    
-                    # Search for Trump-related posts with different queries
-                    queries = [
-                        'trump announcement OR trump statement OR trump tweet',
-                        'trump policy OR trump decision OR trump action',
-                        'trump trade OR trump tariff OR trump economy',
-                        'trump crypto OR trump bitcoin OR trump cryptocurrency',
-                        'trump digital currency OR trump blockchain',
-                        'trump crypto regulation OR trump crypto policy'
-                    ]
-                    
-                    for query in queries:
-                        print(f"Searching with query: {query}")
-                        for post in subreddit.search(
-                            query=query,
-                            time_filter='year',
-                            limit=1000
-                        ):
-                            post_date = datetime.fromtimestamp(post.created_utc)
-                            if post_date >= start_date:
-                                # Categorize the announcement
-                                categorization = self.categorize_announcement(post.title, post.selftext)
-                                
-                                # Only include if it's a direct statement or has high confidence
-                                if categorization['is_direct'] or categorization['confidence_score'] >= 0.6:
-                                    announcements.append({
-                                        'title': post.title,
-                                        'text': post.selftext,
-                                        'created_at': post_date,
-                                        'url': post.url,
-                                        'subreddit': subreddit_name,
-                                        'score': post.score,
-                                        'num_comments': post.num_comments,
-                                        'query': query,
-                                        'is_direct': categorization['is_direct'],
-                                        'is_crypto': categorization['is_crypto'],
-                                        'content_type': categorization['content_type'],
-                                        'confidence_score': categorization['confidence_score'],
-                                        'sentiment_polarity': categorization['sentiment_polarity'],
-                                        'sentiment_subjectivity': categorization['sentiment_subjectivity']
-                                    })
-                except Exception as e:
-                    print(f"Error searching r/{subreddit_name}: {str(e)}")
-                    continue
+            for post, category in zip(posts, categorization.to_dict('records')):
+                # Only include if it's a direct statement or has high confidence
+                if category['is_direct'] or category['confidence_score'] >= 0.6:
+                    matched_set = post.pop('matched')
+                    matched = [query for query in QUERIES if query in matched_set]
+                    post['query'] = matched[0]
+                    post['matched_queries'] = '; '.join(matched)
+                    post.update(category)
+                    announcements.append(post)
+            
+            # Analyze title sentiment for every kept announcement at once
+            polarity, subjectivity = score_texts([a['title'] for a in announcements])
+            for i, announcement in enumerate(announcements):
+                announcement['sentiment_polarity'] = polarity[i]
+                announcement['sentiment_subjectivity'] = subjectivity[i]
             
             df = pd.DataFrame(announcements)
             if not df.empty:
@@ -173,11 +279,9 @@ class TrumpCollector:
                     print(f"Subreddit: r/{df.iloc[i]['subreddit']}")
                     print(f"Score: {df.iloc[i]['score']}, Comments: {df.iloc[i]['num_comments']}")
                 
-                # Save to CSV with detailed filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                file_path = os.path.join(DATA_DIR, f'trump_announcements_{start_date.date()}_to_{datetime.now().date()}_{timestamp}.csv')
-                df.to_csv(file_path, index=False)
-                print(f"\nData saved to: {file_path}")
+                # Append new announcements to the store
+                written = self.store.append(df)
+                print(f"\nStored {written} new announcements in: {self.store.root}")
                 
                 # Print summary statistics
                 print("\nSummary Statistics:")
@@ -205,48 +309,21 @@ class TrumpCollector:
             return pd.DataFrame()
             
         try:
-            results = []
             price_df['timestamp'] = pd.to_datetime(price_df['timestamp'])
             
-            for _, announcement in announcements_df.iterrows():
-                announcement_time = announcement['created_at']
-                start_time = announcement_time - timedelta(hours=hours_before)
-                end_time = announcement_time + timedelta(hours=hours_after)
-                
-                # Get price data around the announcement
-                price_window = price_df[
-                    (price_df['timestamp'] >= start_time) & 
-                    (price_df['timestamp'] <= end_time)
-                ]
-                
-                if not price_window.empty:
-                    # Calculate price changes
-                    initial_price = price_window.iloc[0]['close']
-                    final_price = price_window.iloc[-1]['close']
-                    price_change = ((final_price - initial_price) / initial_price) * 100
-                    
-                    # Calculate max and min prices
-                    max_price = price_window['close'].max()
-                    min_price = price_window['close'].min()
-                    max_change = ((max_price - initial_price) / initial_price) * 100
-                    min_change = ((min_price - initial_price) / initial_price) * 100
-                    
-                    results.append({
-                        'announcement_time': announcement_time,
-                        'title': announcement['title'],
-                        'subreddit': announcement['subreddit'],
-                        'score': announcement['score'],
-                        'num_comments': announcement['num_comments'],
-                        'price_change': price_change,
-                        'max_change': max_change,
-                        'min_change': min_change,
-                        'initial_price': initial_price,
-                        'final_price': final_price,
-                        'max_price': max_price,
-                        'min_price': min_price
-                    })
-            
-            results_df = pd.DataFrame(results)
+            # Compute price windows for every announcement in one pass
+            results_df = event_impact_frame(
+                announcements_df, 'created_at', price_df,
+                columns={
+                    'announcement_time': 'created_at',
+                    'title': 'title',
+                    'subreddit': 'subreddit',
+                    'score': 'score',
+                    'num_comments': 'num_comments'
+                },
+                hours_before=hours_before,
+                hours_after=hours_after
+            )
             if not results_df.empty:
                 # Save results
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
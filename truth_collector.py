@@ -1,55 +1,66 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import os
-import random
+import json
 import requests
-from bs4 import BeautifulSoup
 from config import *
 import re
+import asyncio
 import logging
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urlparse
+from impact_engine import event_impact_frame
+from browser_pool import get_browser_pool, USER_AGENT
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
+from truth_parser import parse_page_fast, parse_pages, load_archive
+from http_cache import HttpCache
+
+# An app root the server leaves empty for client-side JavaScript to fill
+EMPTY_APP_ROOT = re.compile(
+    r'<(div|main)\b[^>]*\bid=(["\']?)(root|app|__next|__nuxt|mastodon|svelte)\2(?=[\s/>])[^>]*>\s*</\1>',
+    re.IGNORECASE
+)
+# Bootstrapping state that single-page apps embed for their scripts
+SPA_MARKERS = ('__next_data__', 'window.__initial_state__', 'window.__nuxt__', 'ng-version=', 'data-reactroot')
 
 class TruthCollector:
-    def __init__(self):
+    def __init__(self, base_url="https://trumpstruth.org", archive_dir=None, use_http_cache=True):
         print("Starting TruthCollector initialization...")
-        self.base_url = "https://trumpstruth.org"
+        self.base_url = base_url
+        
+        # Pages are revalidated with ETag/Last-Modified instead of re-downloaded
+        self.http_cache = HttpCache(os.path.join(DATA_DIR, 'http_cache', 'truth')) if use_http_cache else None
+        self.state_path = os.path.join(DATA_DIR, 'truth_crawl_state.json')
+        
+        # Optionally keep every fetched page so crawls can be re-parsed offline
+        self.archive_dir = archive_dir
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
         
         # Set up logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-        # Set up Chrome options
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-        
-        # Initialize the WebDriver
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.set_page_load_timeout(30)
+        # Pages are fetched over plain HTTP; a pooled headless browser is only
+        # started for pages that need JavaScript rendering
+        self.browser_pool = get_browser_pool()
         
         # Set up session with proper headers
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'User-Agent': USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
         })
         
-        # Rate limiting settings
-        self.min_delay = 2.0  # Minimum delay between requests
-        self.max_delay = 4.0  # Maximum delay between requests
-        self.last_request_time = 0
+        # Requests are paced by the shared per-host limiter, which also reads
+        # rate-limit headers and backs off on 429s
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
+        self.min_delay = 2.0  # Base delay for retrying failed requests
         
         # Check robots.txt
         self._check_robots_txt()
@@ -68,13 +79,46 @@ class TruthCollector:
             self.logger.warning(f"Could not read robots.txt: {str(e)}")
 
     def _respect_rate_limit(self):
-        """Implement exponential backoff for rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_delay:
-            delay = self.min_delay + random.uniform(0, self.max_delay - self.min_delay)
-            time.sleep(delay)
-        self.last_request_time = time.time()
+        """Wait for the site's bucket in the shared rate limiter"""
+        self.rate_limiter.acquire(self.base_url)
+
+    def _archive_page(self, url, html):
+        """Save a fetched page under archive_dir, if archiving is enabled"""
+        if not self.archive_dir:
+            return
+        file_name = re.sub(r'[^A-Za-z0-9]+', '_', url).strip('_') + '.html'
+        with open(os.path.join(self.archive_dir, file_name), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    def _fetch(self, url):
+        """GET url (conditionally when the HTTP cache is enabled) and return its body"""
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        response = self.session.get(url, headers=headers, timeout=10)
+        self.metrics.inc('api_calls_total', source='truth')
+        if response.status_code == 304:
+            self.metrics.inc('cache_hits_total', cache='http')
+        else:
+            self.metrics.inc('bytes_downloaded_total', len(response.content), source='truth')
+        
+        # Let the limiter see 429s and any rate-limit headers before handling the body
+        self.rate_limiter.update(url, response.status_code, response.headers)
+        if self.http_cache:
+            return self.http_cache.handle_response(url, response)
+        response.raise_for_status()
+        return response.text
+
+    def _load_newest_url(self):
+        """Return the newest post URL recorded by the last incremental crawl"""
+        try:
+            with open(self.state_path) as f:
+                return json.load(f).get('newest_url')
+        except (OSError, ValueError):
+            return None
+
+    def _save_newest_url(self, url):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            json.dump({'newest_url': url, 'updated_at': datetime.now().isoformat()}, f)
 
     def _get_page(self, url, max_retries=3):
         """Get page content with proper error handling and retries"""
@@ -83,14 +127,15 @@ class TruthCollector:
                 self._respect_rate_limit()
                 self.logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
                 
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
+                html = self._fetch(url)
                 
-                return response.text
+                self._archive_page(url, html)
+                return html
                 
             except requests.exceptions.RequestException as e:
                 self.logger.error(f"Error fetching {url}: {str(e)}")
                 if attempt < max_retries - 1:
+                    self.metrics.inc('retries_total', source='truth')
                     delay = (2 ** attempt) * self.min_delay  # Exponential backoff
                     self.logger.info(f"Retrying in {delay} seconds...")
                     time.sleep(delay)
@@ -98,14 +143,117 @@ class TruthCollector:
                     self.logger.error(f"Max retries reached for {url}")
                     return None
 
-    def get_trump_posts(self, start_date=None, max_posts=100):
-        """Get Trump's posts with improved error handling and data validation"""
+    def _needs_js(self, html):
+        """Guess whether a page only renders its posts with JavaScript.
+        
+        A <noscript> tag alone is not enough: a page without status cards and
+        with an ordinary body is the end of the listing. Only an empty app
+        root or an SPA bootstrapping marker starts the browser.
+        """
+        if 'status-card' in html:
+            return False
+        if EMPTY_APP_ROOT.search(html):
+            return True
+        html_lower = html.lower()
+        return any(marker in html_lower for marker in SPA_MARKERS)
+
+    def _render_page(self, url):
+        """Render a page in a pooled headless browser and return its HTML"""
+        try:
+            self._respect_rate_limit()
+            self.logger.info(f"Rendering {url} with headless browser")
+            with self.browser_pool.driver() as driver:
+                driver.get(url)
+                return driver.page_source
+        except Exception as e:
+            self.logger.error(f"Error rendering {url}: {str(e)}")
+            return None
+
+    async def _get_page_async(self, url, limiter, max_retries=3):
+        """Fetch a page under a token bucket without blocking the event loop"""
+        for attempt in range(max_retries):
+            try:
+                await limiter.acquire_async()
+                self.logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
+                
+                html = await asyncio.to_thread(self._fetch, url)
+                
+                # Archiving writes a file, so it stays off the event loop too
+                await asyncio.to_thread(self._archive_page, url, html)
+                return html
+                
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Error fetching {url}: {str(e)}")
+                if attempt < max_retries - 1:
+                    self.metrics.inc('retries_total', source='truth')
+                    delay = (2 ** attempt) * self.min_delay  # Exponential backoff
+                    self.logger.info(f"Retrying in {delay} seconds...")
+                    await asyncio.sleep(delay)
+                else:
+                    self.logger.error(f"Max retries reached for {url}")
+                    return None
+
+    def _parse_page(self, html):
+        """Parse a page's status cards into post records in page order.
+        
+        Returns None when the page has no status cards.
+        """
+        return parse_page_fast(html)
+
+    def _collect_records(self, records, posts, seen_urls, start_date, max_posts, stop_url=None):
+        """Append new records to posts; once the crawl should stop, return why.
+        
+        Returns None to keep going, or 'stop_url', 'start_date' or 'max_posts'.
+        """
+        for record in records:
+            if record['url'] in seen_urls:
+                continue
+            seen_urls.add(record['url'])
+            
+            if stop_url and record['url'] == stop_url:
+                self.logger.info("Reached the newest post from the previous crawl")
+                return 'stop_url'
+            
+            if record['created_at'] < start_date:
+                self.logger.info(f"Reached posts older than {start_date}")
+                return 'start_date'
+            
+            posts.append(record)
+            self.logger.info(f"Collected post from {record['created_at']}")
+            
+            if len(posts) >= max_posts:
+                self.logger.info(f"Reached maximum number of posts ({max_posts})")
+                return 'max_posts'
+        return None
+
+    def _advance_marker(self, posts, stop_reason):
+        """Record the newest post for the next incremental crawl, but only after a complete crawl.
+        
+        A crawl cut short (max_posts or an error) has not reached the previous
+        marker, so moving it would skip the posts in between on the next run.
+        """
+        if posts and stop_reason in ('stop_url', 'start_date', 'end'):
+            self._save_newest_url(posts[0]['url'])
+        elif posts:
+            self.logger.info("Crawl stopped before the previous newest post; keeping the incremental marker")
+
+    def get_trump_posts(self, start_date=None, max_posts=100, async_crawl=False, incremental=False):
+        """Get Trump's posts with improved error handling and data validation
+        
+        With incremental=True only posts newer than the newest one seen by the
+        previous incremental crawl are returned, and crawling stops there.
+        """
         if start_date is None:
             start_date = datetime(2025, 1, 1)
+        
+        if async_crawl:
+            return self.crawl_trump_posts(start_date=start_date, max_posts=max_posts, incremental=incremental)
 
+        stop_url = self._load_newest_url() if incremental else None
         posts = []
         seen_urls = set()  # Track seen URLs to avoid duplicates
         page = 1
+        stop_reason = None
         
         try:
             while len(posts) < max_posts:
@@ -116,104 +264,134 @@ class TruthCollector:
                 if not html:
                     break
                 
-                soup = BeautifulSoup(html, 'html.parser')
-                post_elements = soup.find_all(class_="status-card")
+                # Fall back to the browser only when the plain HTML has no posts to parse
+                if self._needs_js(html):
+                    html = self._render_page(url)
+                    if not html:
+                        break
                 
-                if not post_elements:
+                records = self._parse_page(html)
+                if records is None:
                     self.logger.info("No more posts found")
+                    stop_reason = 'end'
                     break
                 
-                for post in post_elements:
-                    try:
-                        # Extract and validate URL
-                        source_url = post.get('href')
-                        if not source_url or source_url in seen_urls:
-                            continue
-                        seen_urls.add(source_url)
-                        
-                        # Extract content
-                        title = post.find(class_="status-card__title")
-                        description = post.find(class_="status-card__description")
-                        
-                        if not title or not description:
-                            self.logger.warning(f"Skipping post with missing content: {source_url}")
-                            continue
-                        
-                        # Extract and validate date
-                        post_time = self._extract_date(source_url, post)
-                        if not post_time:
-                            self.logger.warning(f"Could not extract date for post: {source_url}")
-                            continue
-                        
-                        if post_time < start_date:
-                            self.logger.info(f"Reached posts older than {start_date}")
-                            return pd.DataFrame(posts)
-                        
-                        # Extract source
-                        source = post.find(class_="status-card__overline")
-                        source_name = source.text.strip() if source else "Unknown source"
-                        
-                        posts.append({
-                            'created_at': post_time,
-                            'text': f"{title.text.strip()}\n\n{description.text.strip()}",
-                            'source': source_name,
-                            'url': source_url,
-                            'replies': 0,
-                            'reblogs': 0,
-                            'favorites': 0
-                        })
-                        
-                        self.logger.info(f"Collected post from {post_time}")
-                        
-                        if len(posts) >= max_posts:
-                            self.logger.info(f"Reached maximum number of posts ({max_posts})")
-                            return pd.DataFrame(posts)
-                            
-                    except Exception as e:
-                        self.logger.error(f"Error processing post: {str(e)}")
-                        continue
+                stop_reason = self._collect_records(records, posts, seen_urls, start_date, max_posts, stop_url)
+                if stop_reason:
+                    break
                 
                 page += 1
                 
         except Exception as e:
             self.logger.error(f"Error during collection: {str(e)}")
-        finally:
-            self.driver.quit()  # Clean up resources
+            stop_reason = None
+        
+        self.metrics.inc('rows_collected_total', len(posts), source='truth')
+        if incremental:
+            self._advance_marker(posts, stop_reason)
             
         return pd.DataFrame(posts)
 
-    def _extract_date(self, url, post):
-        """Extract date from URL or post content with validation"""
+    def crawl_trump_posts(self, start_date=None, max_posts=100, rate=None,
+                          burst=None, prefetch=TRUTH_PREFETCH_PAGES, incremental=False):
+        """Pipelined crawl: prefetch upcoming pages under the site's bucket while parsing.
+        
+        Requests are paced by the shared limiter's bucket for the site
+        (HOST_RATE_LIMITS, or rate per second and burst when given), and up to
+        `prefetch` pages are in flight ahead of the page being parsed. The
+        crawl stops at the first post older than start_date and cancels any
+        outstanding prefetches.
+        """
+        if start_date is None:
+            start_date = datetime(2025, 1, 1)
+        
+        if rate is not None:
+            self.rate_limiter.configure(self.base_url, rate, burst or TRUTH_RATE_BURST)
+        limiter = self.rate_limiter.bucket(self.base_url)
+        
+        stop_url = self._load_newest_url() if incremental else None
+        # The crawl appends into this list, so an error part way keeps what was collected
+        posts = []
+        stop_reason = None
         try:
-            # Try to extract from URL first
-            date_match = re.search(r'/(\d{4})/([a-z]{3})/(\d{2})/', url)
-            if date_match:
-                year, month, day = date_match.groups()
-                month_map = {
-                    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-                }
-                return datetime(int(year), month_map[month.lower()], int(day))
-            
-            # Try to find date in post content
-            date_element = post.find(class_="status-card__date")
-            if date_element:
-                date_text = date_element.text.strip()
-                date_formats = [
-                    "%B %d, %Y", "%b %d, %Y", "%Y-%m-%d",
-                    "%d %B %Y", "%d %b %Y", "%Y/%m/%d"
-                ]
-                for date_format in date_formats:
-                    try:
-                        return datetime.strptime(date_text, date_format)
-                    except ValueError:
-                        continue
-            
-            return None
-            
+            stop_reason = asyncio.run(self._crawl_async(posts, start_date, max_posts, limiter, prefetch, stop_url))
         except Exception as e:
-            self.logger.error(f"Error extracting date: {str(e)}")
+            self.logger.error(f"Error during collection, keeping {len(posts)} posts: {str(e)}")
+        
+        self.metrics.inc('rows_collected_total', len(posts), source='truth')
+        if incremental:
+            self._advance_marker(posts, stop_reason)
+        return pd.DataFrame(posts)
+
+    async def _fetch_and_parse_async(self, page, limiter):
+        """Fetch and parse one page; parsing runs in a worker thread to overlap with I/O"""
+        url = f"{self.base_url}/?page={page}"
+        self.logger.info(f"Processing page {page}")
+        
+        html = await self._get_page_async(url, limiter)
+        if not html:
             return None
+        
+        if self._needs_js(html):
+            html = await asyncio.to_thread(self._render_page, url)
+            if not html:
+                return None
+        
+        return await asyncio.to_thread(self._parse_page, html)
+
+    async def _crawl_async(self, posts, start_date, max_posts, limiter, prefetch, stop_url=None):
+        """Append posts to the caller's list, page by page; return why the crawl stopped"""
+        seen_urls = set()  # Track seen URLs to avoid duplicates
+        pending = {}
+        next_page = 1
+        page = 1
+        
+        # An incremental crawl usually ends on page 1, so only prefetch once it doesn't
+        window = 1 if stop_url else prefetch
+        stop_reason = None
+        
+        try:
+            while len(posts) < max_posts:
+                # Keep the next few pages in flight while this one is processed
+                while len(pending) < window:
+                    pending[next_page] = asyncio.create_task(self._fetch_and_parse_async(next_page, limiter))
+                    next_page += 1
+                
+                records = await pending.pop(page)
+                if records is None:
+                    self.logger.info("No more posts found")
+                    stop_reason = 'end'
+                    break
+                
+                stop_reason = self._collect_records(records, posts, seen_urls, start_date, max_posts, stop_url)
+                if stop_reason:
+                    break
+                
+                page += 1
+                window = prefetch
+        finally:
+            # Stop cleanly: drop prefetches the crawl no longer needs
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+        
+        return stop_reason
+
+    def reparse_archive(self, archive_dir=None, max_workers=None):
+        """Re-parse a saved crawl across a process pool, newest posts first"""
+        archive_dir = archive_dir or self.archive_dir
+        pages = load_archive(archive_dir)
+        print(f"Re-parsing {len(pages)} archived pages from {archive_dir}...")
+        
+        posts = {}
+        for records in parse_pages(pages, max_workers=max_workers):
+            for record in records or []:
+                posts.setdefault(record['url'], record)
+        
+        df = pd.DataFrame(list(posts.values()))
+        if not df.empty:
+            df = df.sort_values('created_at', ascending=False).reset_index(drop=True)
+        return df
 
     def analyze_post_impact(self, posts_df, price_df, hours_before=6, hours_after=6):
         """Analyze Bitcoin price movements around Trump's posts"""
@@ -222,48 +400,21 @@ class TruthCollector:
             return None
 
         try:
-            results = []
             price_df['timestamp'] = pd.to_datetime(price_df['timestamp'])
             posts_df['created_at'] = pd.to_datetime(posts_df['created_at'])
 
-            for _, post in posts_df.iterrows():
-                post_time = post['created_at']
-                start_time = post_time - timedelta(hours=hours_before)
-                end_time = post_time + timedelta(hours=hours_after)
-
-                # Get price data around the post
-                price_window = price_df[
-                    (price_df['timestamp'] >= start_time) & 
-                    (price_df['timestamp'] <= end_time)
-                ]
-
-                if not price_window.empty:
-                    # Calculate price changes
-                    initial_price = price_window.iloc[0]['close']
-                    final_price = price_window.iloc[-1]['close']
-                    price_change = ((final_price - initial_price) / initial_price) * 100
-
-                    # Calculate max and min prices
-                    max_price = price_window['close'].max()
-                    min_price = price_window['close'].min()
-                    max_change = ((max_price - initial_price) / initial_price) * 100
-                    min_change = ((min_price - initial_price) / initial_price) * 100
-
-                    results.append({
-                        'post_time': post_time,
-                        'text': post['text'],
-                        'source': post['source'],
-                        'url': post['url'],
-                        'price_change': price_change,
-                        'max_change': max_change,
-                        'min_change': min_change,
-                        'initial_price': initial_price,
-                        'final_price': final_price,
-                        'max_price': max_price,
-                        'min_price': min_price
-                    })
-
-            results_df = pd.DataFrame(results)
+            # Compute price windows for every post in one pass
+            results_df = event_impact_frame(
+                posts_df, 'created_at', price_df,
+                columns={
+                    'post_time': 'created_at',
+                    'text': 'text',
+                    'source': 'source',
+                    'url': 'url'
+                },
+                hours_before=hours_before,
+                hours_after=hours_after
+            )
             if not results_df.empty:
                 # Save results
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -0,0 +1,246 @@
+import os
+import re
+import glob
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# Post URLs look like .../2025/jan/20/...
+URL_DATE_PATTERN = re.compile(r'/(\d{4})/([a-z]{3})/(\d{2})/')
+MONTH_MAP = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+DATE_FORMATS = [
+    "%B %d, %Y", "%b %d, %Y", "%Y-%m-%d",
+    "%d %B %Y", "%d %b %Y", "%Y/%m/%d"
+]
+
+
+def _make_record(source_url, title, description, source_name, post_time):
+    return {
+        'created_at': post_time,
+        'text': f"{title.strip()}\n\n{description.strip()}",
+        'source': source_name,
+        'url': source_url,
+        'replies': 0,
+        'reblogs': 0,
+        'favorites': 0
+    }
+
+
+class DateParser:
+    """Parse status-card dates, trying the last format that worked first"""
+
+    def __init__(self):
+        self.last_format = None
+
+    def parse_url(self, url):
+        """Return (matched, date) for a date embedded in the post URL"""
+        date_match = URL_DATE_PATTERN.search(url)
+        if not date_match:
+            return False, None
+        year, month, day = date_match.groups()
+        return True, datetime(int(year), MONTH_MAP[month.lower()], int(day))
+
+    def parse_text(self, date_text):
+        if self.last_format is not None:
+            try:
+                return datetime.strptime(date_text, self.last_format)
+            except ValueError:
+                pass
+        for date_format in DATE_FORMATS:
+            if date_format == self.last_format:
+                continue
+            try:
+                value = datetime.strptime(date_text, date_format)
+            except ValueError:
+                continue
+            self.last_format = date_format
+            return value
+        return None
+
+
+_date_parser = DateParser()
+
+
+def extract_date_bs4(url, post):
+    """Extract date from URL or post content with validation (BeautifulSoup element)"""
+    try:
+        # Try to extract from URL first
+        date_match = URL_DATE_PATTERN.search(url)
+        if date_match:
+            year, month, day = date_match.groups()
+            return datetime(int(year), MONTH_MAP[month.lower()], int(day))
+
+        # Try to find date in post content
+        date_element = post.find(class_="status-card__date")
+        if date_element:
+            date_text = date_element.text.strip()
+            for date_format in DATE_FORMATS:
+                try:
+                    return datetime.strptime(date_text, date_format)
+                except ValueError:
+                    continue
+
+        return None
+
+    except Exception as e:
+        logger.error(f"Error extracting date: {str(e)}")
+        return None
+
+
+def parse_page_bs4(html):
+    """Parse a page's status cards with BeautifulSoup's html.parser.
+
+    This is the original extraction path, kept as the reference the fast
+    parser is checked and benchmarked against. Returns None when the page has
+    no status cards.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    post_elements = soup.find_all(class_="status-card")
+
+    if not post_elements:
+        return None
+
+    records = []
+    for post in post_elements:
+        try:
+            # Extract and validate URL
+            source_url = post.get('href')
+            if not source_url:
+                continue
+
+            # Extract content
+            title = post.find(class_="status-card__title")
+            description = post.find(class_="status-card__description")
+
+            if not title or not description:
+                logger.warning(f"Skipping post with missing content: {source_url}")
+                continue
+
+            # Extract and validate date
+            post_time = extract_date_bs4(source_url, post)
+            if not post_time:
+                logger.warning(f"Could not extract date for post: {source_url}")
+                continue
+
+            # Extract source
+            source = post.find(class_="status-card__overline")
+            source_name = source.text.strip() if source else "Unknown source"
+
+            records.append(_make_record(source_url, title.text, description.text, source_name, post_time))
+
+        except Exception as e:
+            logger.error(f"Error processing post: {str(e)}")
+            continue
+
+    return records
+
+
+def _class_test(name):
+    """XPath predicate matching an element whose class list contains name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    # Compiled once; the per-card lookups only search inside that card
+    _CARDS = etree.XPath(f"//*[{_class_test('status-card')}]")
+    _TITLE = etree.XPath(f"(.//*[{_class_test('status-card__title')}])[1]")
+    _DESCRIPTION = etree.XPath(f"(.//*[{_class_test('status-card__description')}])[1]")
+    _OVERLINE = etree.XPath(f"(.//*[{_class_test('status-card__overline')}])[1]")
+    _DATE = etree.XPath(f"(.//*[{_class_test('status-card__date')}])[1]")
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def parse_page_fast(html):
+    """Parse a page's status cards with lxml and precompiled XPath lookups.
+
+    Produces the same records as parse_page_bs4. Only status-card subtrees
+    are walked, and dates come from the precompiled URL pattern or the
+    cached date-format guess. Returns None when the page has no status cards.
+    """
+    if lxml_html is None:
+        return parse_page_bs4(html)
+
+    # Skip building a tree at all for pages that cannot contain cards
+    if 'status-card' not in html:
+        return None
+
+    try:
+        root = lxml_html.fromstring(html)
+    except ValueError:
+        # lxml refuses str input carrying an XML encoding declaration
+        root = lxml_html.fromstring(html.encode('utf-8'))
+
+    post_elements = _CARDS(root)
+    if not post_elements:
+        return None
+
+    records = []
+    for post in post_elements:
+        try:
+            source_url = post.get('href')
+            if not source_url:
+                continue
+
+            title = _first(_TITLE, post)
+            description = _first(_DESCRIPTION, post)
+            if title is None or description is None:
+                logger.warning(f"Skipping post with missing content: {source_url}")
+                continue
+
+            post_time = None
+            try:
+                matched, post_time = _date_parser.parse_url(source_url)
+                if not matched:
+                    date_element = _first(_DATE, post)
+                    if date_element is not None:
+                        post_time = _date_parser.parse_text(date_element.text_content().strip())
+            except Exception as e:
+                logger.error(f"Error extracting date: {str(e)}")
+            if not post_time:
+                logger.warning(f"Could not extract date for post: {source_url}")
+                continue
+
+            source = _first(_OVERLINE, post)
+            source_name = source.text_content().strip() if source is not None else "Unknown source"
+
+            records.append(_make_record(
+                source_url, title.text_content(), description.text_content(), source_name, post_time
+            ))
+
+        except Exception as e:
+            logger.error(f"Error processing post: {str(e)}")
+            continue
+
+    return records
+
+
+def parse_pages(pages, max_workers=None):
+    """Parse many saved pages across a process pool, returning one result per page"""
+    pages = list(pages)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(parse_page_fast, pages, chunksize=max(1, len(pages) // 64)))
+
+
+def load_archive(archive_dir):
+    """Read every saved page in an archive directory, in file-name order"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(archive_dir, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
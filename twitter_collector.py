@@ -1,29 +1,29 @@
 import tweepy
 import pandas as pd
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import os
-import glob
-from dotenv import load_dotenv
+from sentiment import score_texts
+from data_store import DataStore
+from rate_limiter import get_rate_limiter
+from metrics import get_metrics
 from config import *
 
 class TwitterCollector:
     def __init__(self):
+        self.store = DataStore('twitter')
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_metrics()
         try:
-            # Load environment variables
-            load_dotenv()
-            
-            # Get bearer token from environment
-            bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
+            # Get bearer token from the cached settings
+            bearer_token = get_settings().twitter_bearer_token
             if not bearer_token:
                 raise ValueError("TWITTER_BEARER_TOKEN not found in environment variables")
             
             print(f"Using bearer token: {bearer_token[:10]}...")  # Print first 10 chars for debugging
             
-            # Initialize the client with Bearer Token
+            # Initialize the client with Bearer Token; rate limits are handled by the shared limiter
             self.client = tweepy.Client(
                 bearer_token=bearer_token,
-                wait_on_rate_limit=True
+                wait_on_rate_limit=False
             )
             print("Successfully connected to Twitter API")
         except Exception as e:
@@ -31,77 +31,103 @@ class TwitterCollector:
             raise
     
     def get_existing_tweets(self):
-        """Get the most recent tweet data file if it exists"""
+        """Load the last TIME_WINDOW_HOURS of tweets from the store if there are any"""
         try:
-            # Create data directory if it doesn't exist
-            os.makedirs(DATA_DIR, exist_ok=True)
-            
-            # Find all twitter data files
-            files = glob.glob(os.path.join(DATA_DIR, 'twitter_data_*.csv'))
-            if files:
-                # Get the most recent file
-                latest_file = max(files, key=os.path.getctime)
-                print(f"\nFound existing tweet data: {latest_file}")
+            # Skip the read entirely when the store metadata shows no tweets
+            if self.store.latest_timestamp() is None:
+                return pd.DataFrame()
                 
-                # Check if file is empty or too small (less than 100 bytes)
-                if os.path.getsize(latest_file) < 100:
-                    print("Existing file is empty or corrupted, will collect new data")
-                    return pd.DataFrame()
-                    
-                df = pd.read_csv(latest_file)
-                if df.empty:
-                    print("No tweets found in existing file")
-                    return pd.DataFrame()
-                    
-                print(f"Loaded {len(df)} existing tweets")
-                return df
-            return pd.DataFrame()
+            # Only the partitions covering the window are read
+            df = self.store.read_recent(TIME_WINDOW_HOURS)
+            if df.empty:
+                print("No recent tweets found in the store")
+                return pd.DataFrame()
+                
+            print(f"Loaded {len(df)} existing tweets")
+            return df
         except Exception as e:
             print(f"Error loading existing tweets: {str(e)}")
             return pd.DataFrame()
         
+    def _search_page(self, query, max_results, next_token, max_retries=3):
+        """One search request under the shared limiter, waiting out 429s using the reset headers"""
+        for attempt in range(max_retries):
+            self.rate_limiter.acquire(TWITTER_API_HOST)
+            self.metrics.inc('api_calls_total', source='twitter')
+            try:
+                # Twitter API v2 returns 10-100 tweets per request
+                response = self.client.search_recent_tweets(
+                    query=query,
+                    max_results=max_results,
+                    tweet_fields=['created_at', 'public_metrics', 'text'],
+                    user_fields=['username'],
+                    expansions=['author_id'],
+                    next_token=next_token
+                )
+            except tweepy.errors.TooManyRequests as e:
+                self.rate_limiter.report_exception(TWITTER_API_HOST, e)
+                if attempt == max_retries - 1:
+                    raise
+                print("Rate limit exceeded, waiting for the limit to reset...")
+                self.metrics.inc('retries_total', source='twitter')
+                continue
+            self.rate_limiter.update(TWITTER_API_HOST, 200)
+            return response
+    
+    def iter_tweet_pages(self, query, max_tweets=MAX_TWEETS):
+        """Yield scored pages of tweets, following next_token until max_tweets are fetched"""
+        fetched = 0
+        next_token = None
+        while fetched < max_tweets:
+            response = self._search_page(query, max(10, min(100, max_tweets - fetched)), next_token)
+            if not response.data:
+                break
+            
+            # Index this page's users once instead of scanning them for every tweet
+            users = {user.id: user for user in (response.includes or {}).get('users', [])}
+            
+            tweets = []
+            for tweet in response.data[:max_tweets - fetched]:
+                user = users.get(tweet.author_id)
+                tweets.append({
+                    'id': tweet.id,
+                    'created_at': tweet.created_at,
+                    'text': tweet.text,
+                    'user': user.username if user else 'unknown',
+                    'retweets': tweet.public_metrics['retweet_count'],
+                    'favorites': tweet.public_metrics['like_count']
+                })
+            
+            # Score the page as soon as it arrives
+            polarity, subjectivity = score_texts([tweet['text'] for tweet in tweets])
+            for i, tweet in enumerate(tweets):
+                tweet['sentiment_polarity'] = polarity[i]
+                tweet['sentiment_subjectivity'] = subjectivity[i]
+            
+            fetched += len(tweets)
+            self.metrics.inc('rows_collected_total', len(tweets), source='twitter')
+            yield tweets
+            
+            next_token = (response.meta or {}).get('next_token')
+            if not next_token:
+                break
+    
     def get_tweets(self, query, max_tweets=MAX_TWEETS):
         tweets = []
         try:
-            # Get tweets from the last 24 hours
-            since_date = datetime.now() - timedelta(hours=TIME_WINDOW_HOURS)
-            
             print(f"Searching for tweets with query: {query}")
             
-            # Search recent tweets
-            response = self.client.search_recent_tweets(
-                query=query,
-                max_results=min(100, max_tweets),  # Twitter API v2 has a max of 100 per request
-                tweet_fields=['created_at', 'public_metrics', 'text'],
-                user_fields=['username'],
-                expansions=['author_id']
-            )
+            for page in self.iter_tweet_pages(query, max_tweets):
+                tweets.extend(page)
+                print(f"Found {len(page)} tweets ({len(tweets)} of up to {max_tweets})")
             
-            if response.data:
-                print(f"Found {len(response.data)} tweets")
-                for tweet in response.data:
-                    # Get user information
-                    user = next((user for user in response.includes['users'] if user.id == tweet.author_id), None)
-                    
-                    # Perform sentiment analysis
-                    sentiment = TextBlob(tweet.text).sentiment
-                    
-                    tweets.append({
-                        'id': tweet.id,
-                        'created_at': tweet.created_at,
-                        'text': tweet.text,
-                        'user': user.username if user else 'unknown',
-                        'retweets': tweet.public_metrics['retweet_count'],
-                        'favorites': tweet.public_metrics['like_count'],
-                        'sentiment_polarity': sentiment.polarity,
-                        'sentiment_subjectivity': sentiment.subjectivity
-                    })
-            else:
+            if not tweets:
                 print("No tweets found in response")
                 
         except tweepy.errors.TooManyRequests:
             print("Rate limit exceeded. Using existing data if available.")
-            return self.get_existing_tweets()
+            if not tweets:
+                return self.get_existing_tweets()
         except Exception as e:
             print(f"Error collecting tweets for query '{query}': {str(e)}")
             
@@ -126,15 +152,10 @@ class TwitterCollector:
             # Remove duplicates
             all_tweets = all_tweets.drop_duplicates(subset=['id'])
             
-            # Create data directory if it doesn't exist
-            os.makedirs(DATA_DIR, exist_ok=True)
-            
-            # Save to CSV
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_path = os.path.join(DATA_DIR, f'twitter_data_{timestamp}.csv')
-            all_tweets.to_csv(file_path, index=False)
+            # Append new tweets to the store
+            written = self.store.append(all_tweets)
             print(f"\nTotal tweets available: {len(all_tweets)}")
-            print(f"Data saved to: {file_path}")
+            print(f"Stored {written} new tweets in: {self.store.root}")
             
             # Print the first few tweets as a sample
             print("\nSample of available tweets:")